@@ -3,6 +3,10 @@ ASGI config for sdc project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Las vistas async (p. ej. ``api/login/async/``) corren directamente en el
+event loop; la verificación de contraseñas se delega a un pool acotado
+(ver sdc_client/login_executor.py).
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
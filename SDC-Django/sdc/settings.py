@@ -17,6 +17,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -28,9 +30,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = 'django-insecure-g!#etf=(had@qxkb)##bxct6m#fzu)&$r-is*z8&+#a#5)g%*0'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv('DEBUG', 'True') == 'True'
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [host for host in os.getenv('ALLOWED_HOSTS', '').split(',') if host]
 
 
 # Application definition
@@ -41,6 +43,8 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
+    # runserver sirve los estáticos con WhiteNoise, igual que en producción
+    'whitenoise.runserver_nostatic',
     'django.contrib.staticfiles',
     'sdc_client',
     'rest_framework',
@@ -48,8 +52,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Primero, para medir también al resto del middleware
+    'sdc_client.middleware.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    # Estáticos (comprimidos, con caché inmutable) sin llegar a las vistas
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # SessionMiddleware que se salta las rutas api/ con API_STATELESS=True
+    'sdc_client.middleware.StatelessAPISessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -61,25 +70,67 @@ ROOT_URLCONF = 'sdc.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates + tiempo de render por petición (Server-Timing, /metrics)
+        'BACKEND': 'sdc_client.template_backends.TimedDjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Cada plantilla se compila una vez por proceso. Con DEBUG,
+            # runserver limpia esta caché cuando cambia un archivo
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+            # Información de depuración de plantillas sólo con DEBUG
+            'debug': DEBUG,
         },
     },
 ]
 
+# Métricas por petición (ver sdc_client/metrics.py)
+# Con varios workers, METRICS_DIR debe ser un directorio compartido por todos
+# (p. ej. un tmpfs vacío al arrancar) para que /metrics reporte el total.
+# Server-Timing (queries y tiempo de BBDD) sólo en desarrollo por defecto:
+# en producción cualquier visitante lo vería
+REQUEST_TIMING_HEADER = os.getenv('REQUEST_TIMING_HEADER', str(DEBUG)) == 'True'
+METRICS_DIR = os.getenv('METRICS_DIR') or None
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 5)) # segundos
+# /metrics: con token se exige 'Bearer <token>'; sin token sólo staff (404 al resto)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN') or None
+
+# Queries lentas (opt-in): con SLOW_QUERY_THRESHOLD_MS se registran en
+# SLOW_QUERY_LOG (JSONL) las queries que tarden al menos ese umbral, con su
+# plan EXPLAIN. Resumen: python manage.py slow_queries_report
+SLOW_QUERY_THRESHOLD_MS = (
+    float(os.getenv('SLOW_QUERY_THRESHOLD_MS')) if os.getenv('SLOW_QUERY_THRESHOLD_MS') else None
+)
+SLOW_QUERY_LOG = os.getenv('SLOW_QUERY_LOG', str(BASE_DIR / 'slow_queries.jsonl'))
+SLOW_QUERY_EXPLAIN_INTERVAL = int(os.getenv('SLOW_QUERY_EXPLAIN_INTERVAL', 300)) # segundos por huella
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(os.getenv('SLOW_QUERY_EXPLAIN_TIMEOUT_MS', 5000))
+SLOW_QUERY_EXPLAIN_MAX_FINGERPRINTS = int(os.getenv('SLOW_QUERY_EXPLAIN_MAX_FINGERPRINTS', 1000))
+
 WSGI_APPLICATION = 'sdc.wsgi.application'
+ASGI_APPLICATION = 'sdc.asgi.application'
+
+# Usar las vistas async de feeds y create_post (sólo tiene sentido bajo ASGI)
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'False') == 'True'
 
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Conexiones: con DB_POOL=True se usa el pool de psycopg 3 (un pool por
+# proceso; recomendado con ASGI). Sin pool, cada conexión se reutiliza durante
+# DB_CONN_MAX_AGE segundos y se verifica antes de reutilizarla
+# (DB_CONN_HEALTH_CHECKS). Django no permite combinar el pool con CONN_MAX_AGE.
+DB_POOL = os.getenv('DB_POOL', 'False') == 'True'
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -88,9 +139,21 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
         'PORT': os.getenv('DB_PORT'),
+        # Bajo ASGI las conexiones persistentes no se reutilizan entre peticiones
+        'CONN_MAX_AGE': 0 if DB_POOL else int(os.getenv('DB_CONN_MAX_AGE', 0 if ASYNC_VIEWS else 60)),
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True',
     }
 }
 
+if DB_POOL:
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+            'timeout': int(os.getenv('DB_POOL_TIMEOUT', 10)), # segundos esperando una conexión libre
+        },
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -111,6 +174,55 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Hashers de contraseñas
+# https://docs.djangoproject.com/en/5.2/topics/auth/passwords/
+# El primero de la lista se usa para hashear; los demás sólo para verificar.
+# Se usa Argon2id (verifica más rápido que PBKDF2 con costo de memoria) y los
+# hashes PBKDF2 existentes se actualizan solos en el siguiente login exitoso.
+
+# Sin argon2-cffi los hashes argon2 ya guardados no se podrían verificar y esos
+# logins fallarían sin aviso: mejor no arrancar
+try:
+    import argon2  # noqa: F401
+except ImportError as e:
+    raise ImproperlyConfigured('Falta argon2-cffi (requirements.txt): se usa para las contraseñas.') from e
+
+PASSWORD_HASHERS = [
+    'sdc_client.hashers.TunedArgon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+ARGON2_TIME_COST = int(os.getenv('ARGON2_TIME_COST', 2))
+ARGON2_MEMORY_COST = int(os.getenv('ARGON2_MEMORY_COST', 65536)) # KiB
+ARGON2_PARALLELISM = int(os.getenv('ARGON2_PARALLELISM', 2))
+
+
+# Login
+# Verificación de credenciales: hilos dedicados y máximo de logins en curso
+# (los que excedan el máximo reciben 429 en lugar de esperar)
+LOGIN_HASH_WORKERS = int(os.getenv('LOGIN_HASH_WORKERS', 4))
+LOGIN_MAX_CONCURRENCY = int(os.getenv('LOGIN_MAX_CONCURRENCY', 8))
+
+# Throttling de login: (capacidad, intentos por minuto). Se admiten
+# 'capacidad' intentos en cualquier lapso de capacidad/por minuto minutos
+# (ventana deslizante, ver sdc_client/throttles.py)
+LOGIN_THROTTLE_BUCKETS = {
+    'login_ip': (int(os.getenv('LOGIN_THROTTLE_IP_CAPACITY', 20)),
+                 int(os.getenv('LOGIN_THROTTLE_IP_PER_MINUTE', 10))),
+    'login_email': (int(os.getenv('LOGIN_THROTTLE_EMAIL_CAPACITY', 5)),
+                    int(os.getenv('LOGIN_THROTTLE_EMAIL_PER_MINUTE', 1))),
+    # Disponibilidad de email/CURP/RFC mientras se llena el registro
+    'availability_ip': (int(os.getenv('AVAILABILITY_THROTTLE_CAPACITY', 60)),
+                        int(os.getenv('AVAILABILITY_THROTTLE_PER_MINUTE', 30))),
+}
+LOGIN_THROTTLE_CACHE_ALIAS = 'default'
+
+# Segundos que se guarda en caché cada respuesta de api/register/availability/
+REGISTRATION_AVAILABILITY_TIMEOUT = int(os.getenv('REGISTRATION_AVAILABILITY_TIMEOUT', 30))
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -127,6 +239,31 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = os.getenv('STATIC_ROOT', str(BASE_DIR / 'staticfiles'))
+
+# Con STATIC_MANIFEST=True, collectstatic genera nombres con hash del
+# contenido (app.3f2a1c.js) más copias .gz y .br, y {% static %} usa esos
+# nombres. WhiteNoise los sirve con 'Cache-Control: immutable' y elige la
+# versión comprimida según Accept-Encoding. Requiere correr collectstatic.
+STATIC_MANIFEST = os.getenv('STATIC_MANIFEST', 'False' if DEBUG else 'True') == 'True'
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'whitenoise.storage.CompressedManifestStaticFilesStorage' if STATIC_MANIFEST
+            else 'django.contrib.staticfiles.storage.StaticFilesStorage'
+        ),
+    },
+}
+
+# Sin manifest (desarrollo) WhiteNoise lee directo de los directorios static/
+WHITENOISE_USE_FINDERS = not STATIC_MANIFEST
+WHITENOISE_AUTOREFRESH = DEBUG
+# Archivos sin hash en el nombre (p. ej. favicon): caché corta
+WHITENOISE_MAX_AGE = int(os.getenv('STATIC_MAX_AGE', 0 if DEBUG else 3600))
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -137,11 +274,59 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'sdc_client.CustomUser'
 
+# Número de publicaciones por página en los feeds (paginación por cursor)
+FEED_PAGE_SIZE = int(os.getenv('FEED_PAGE_SIZE', 20))
+
+# Ciclo de vida de publicaciones (comando post_lifecycle): días sin cambios
+# para cerrar un post ACTIVO y para archivar uno COMPLETADO/CANCELADO
+POST_STALE_DAYS = int(os.getenv('POST_STALE_DAYS', 90))
+POST_ARCHIVE_DAYS = int(os.getenv('POST_ARCHIVE_DAYS', 180))
+POST_LIFECYCLE_BATCH_SIZE = int(os.getenv('POST_LIFECYCLE_BATCH_SIZE', 500))
+
+# Caché
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local: memoria del proceso (o FileBasedCache con CACHE_LOCATION=/ruta).
+# Producción: un backend compartido entre workers, por ejemplo
+#   CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+#   CACHE_LOCATION=redis://127.0.0.1:6379/1
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'sdc-cache'),
+    }
+}
+
+# Caché de feeds: alias usado, segundos de vida y tamaño de la ventana compartida
+FEED_CACHE_ALIAS = 'default'
+FEED_CACHE_TIMEOUT = int(os.getenv('FEED_CACHE_TIMEOUT', 300))
+FEED_CACHE_WINDOW = int(os.getenv('FEED_CACHE_WINDOW', 200))
+# Usuario de las llamadas JWT a la API (authentication.py), en segundos
+JWT_USER_CACHE_ALIAS = 'default'
+JWT_USER_CACHE_TIMEOUT = int(os.getenv('JWT_USER_CACHE_TIMEOUT', 300))
+# Fragmentos HTML de cada tarjeta de post (card_cache.py), en segundos
+CARD_CACHE_TIMEOUT = int(os.getenv('CARD_CACHE_TIMEOUT', 86400))
+
+# Modo API sin estado: el login de la API sólo emite tokens JWT (la página
+# web pide sesión con "session": true) y las rutas api/ no leen ni escriben
+# sesiones. Las sesiones de las páginas HTML van por defecto en una cookie
+# firmada, sin filas en django_session; con una caché compartida (Redis) se
+# puede usar SESSION_ENGINE=django.contrib.sessions.backends.cache.
+API_STATELESS = os.getenv('API_STATELESS', 'False') == 'True'
+SESSION_ENGINE = os.getenv('SESSION_ENGINE', (
+    'django.contrib.sessions.backends.signed_cookies' if API_STATELESS
+    else 'django.contrib.sessions.backends.db'
+))
+
 # Configuración de Django Rest Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+        # JWTAuthentication sin el SELECT del usuario en cada llamada
+        'sdc_client.authentication.CachedJWTAuthentication',
+    ),
+    # Proxies delante de Django (p. ej. 1 con nginx). Con 0 se usa
+    # REMOTE_ADDR y se ignora X-Forwarded-For, que el cliente puede falsear
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
 }
 
 # Configuración de Simple JWT
@@ -150,6 +335,14 @@ from datetime import timedelta
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60), # Duración del token de acceso
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),   # Duración del token de refresco
-    'ROTATE_REFRESH_TOKENS': False,
+    # Cada refresh entrega un refresh nuevo y revoca el usado. La revocación
+    # es la de sdc_client/token_revocation.py, no la app token_blacklist
+    'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
+    'TOKEN_REFRESH_SERIALIZER': 'sdc_client.serializers.RotatingTokenRefreshSerializer',
 }
+
+# jti revocados que cada proceso recuerda en memoria y cada cuántos segundos
+# se borran de la BBDD las revocaciones de tokens vencidos
+TOKEN_REVOCATION_MEMORY_MAX = int(os.getenv('TOKEN_REVOCATION_MEMORY_MAX', 100000))
+TOKEN_REVOCATION_PRUNE_INTERVAL = int(os.getenv('TOKEN_REVOCATION_PRUNE_INTERVAL', 3600))
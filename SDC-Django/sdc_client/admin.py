@@ -1,3 +1,27 @@
 from django.contrib import admin
 
+from .models import Warehouse, WarehouseStock
+
 # Register your models here.
+
+
+# --- Almacenes (los registran los administradores) ---
+
+class WarehouseStockInline(admin.TabularInline):
+    # Sólo lectura: la existencia cambia con movimientos (ver inventory.py)
+    model = WarehouseStock
+    fields = ('category', 'quantity', 'updated_at')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Warehouse)
+class WarehouseAdmin(admin.ModelAdmin):
+    list_display = ('name', 'city', 'state', 'institution', 'is_active')
+    list_filter = ('is_active', 'state')
+    search_fields = ('name', 'city')
+    inlines = [WarehouseStockInline]
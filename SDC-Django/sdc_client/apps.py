@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SdcClientConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'sdc_client'
+
+    def ready(self):
+        # Registra los receptores de señales (rol de usuario, etc.)
+        from . import checks, signals  # noqa: F401
@@ -0,0 +1,92 @@
+# SDC-Django/sdc_client/authentication.py
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .checks import cache_is_process_local
+from .models import CustomUser
+
+
+# --- Autenticación JWT con el usuario en caché ---
+#
+# JWTAuthentication hace un SELECT de CustomUser en cada llamada a la API.
+# Aquí los campos que usan las vistas y los permisos (rol, activo, staff...)
+# se guardan en la caché JWT_USER_CACHE_TIMEOUT segundos y el usuario se
+# arma con CustomUser.from_db: cualquier otro campo se carga de la BBDD sólo
+# si alguien lo lee. Guardar o borrar un usuario (y el cambio de rol de
+# signals.py) invalida su entrada, así que desactivar una cuenta corta su
+# acceso en la siguiente llamada.
+#
+# La invalidación sólo llega a los demás workers si la caché es compartida:
+# con LocMemCache y DEBUG=False se consulta siempre la BBDD (ver checks.py).
+
+CACHED_FIELDS = (
+    'id', 'email', 'phone', 'status_id', 'role', 'is_active', 'is_staff', 'is_superuser',
+)
+
+
+def _alias():
+    return getattr(settings, 'JWT_USER_CACHE_ALIAS', 'default')
+
+
+def _cache():
+    return caches[_alias()]
+
+
+def _cache_key(user_id):
+    return f'jwt-user:{user_id}'
+
+
+def _build(data):
+    # Campos en el orden de concrete_fields; los demás quedan diferidos
+    field_names = [
+        field.attname for field in CustomUser._meta.concrete_fields if field.attname in data
+    ]
+    return CustomUser.from_db('default', field_names, [data[name] for name in field_names])
+
+
+def get_cached_user(user_id):
+    """Usuario con los campos de CACHED_FIELDS, o None si no existe."""
+    if cache_is_process_local(_alias()):
+        data = CustomUser.objects.filter(pk=user_id).values(*CACHED_FIELDS).first()
+        return None if data is None else _build(data)
+
+    cache = _cache()
+    data = cache.get(_cache_key(user_id))
+    if data is None:
+        data = CustomUser.objects.filter(pk=user_id).values(*CACHED_FIELDS).first()
+        if data is None:
+            return None
+        cache.set(_cache_key(user_id), data, getattr(settings, 'JWT_USER_CACHE_TIMEOUT', 300))
+    return _build(data)
+
+
+def invalidate_user(user_id):
+    """Se borra de inmediato y otra vez al confirmar (igual que feed_cache)."""
+    def delete():
+        _cache().delete(_cache_key(user_id))
+
+    delete()
+    transaction.on_commit(delete)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication que lee el usuario de la caché en vez de la BBDD."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from e
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return user
@@ -0,0 +1,97 @@
+# SDC-Django/sdc_client/availability.py
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import CharField, Value
+
+from .models import CustomUser, Donee, Donor, Institution
+
+
+# --- Disponibilidad de datos únicos para el registro ---
+#
+# Email, teléfono, CURP, RFC y nombre de institución se revisan en una sola
+# query (UNION de búsquedas por índice único), tanto en la API que consulta
+# register-validation.js mientras se escribe como en los formularios antes
+# de calcular el hash de la contraseña. Las respuestas de la API se guardan
+# REGISTRATION_AVAILABILITY_TIMEOUT segundos; al registrar una cuenta sus
+# valores se marcan como ocupados en la caché.
+
+FIELDS = ('email', 'phone', 'curp', 'rfc', 'name')
+FIELD_MAX_LENGTH = 255
+
+
+def normalize(field, value):
+    value = (value or '').strip()
+    if field == 'email':
+        return CustomUser.objects.normalize_email(value)
+    if field in ('curp', 'rfc'):
+        return value.upper()
+    return value
+
+
+def _lookups(field, value):
+    if field == 'email':
+        return [CustomUser.objects.filter(email=value)]
+    if field == 'phone':
+        return [CustomUser.objects.filter(phone=value)]
+    if field == 'curp':
+        return [Donee.objects.filter(curp=value), Donor.objects.filter(curp=value)]
+    if field == 'rfc':
+        # El registro de instituciones usa el RFC como teléfono del usuario
+        return [Institution.objects.filter(rfc=value), CustomUser.objects.filter(phone=value)]
+    if field == 'name':
+        return [Institution.objects.filter(name=value)]
+    raise ValueError(f'Campo desconocido: {field}')
+
+
+def taken_fields(values):
+    """Campos de {campo: valor} que ya están registrados (una sola query)."""
+    queries = [
+        queryset.order_by().values_list(Value(field, output_field=CharField()))
+        for field, value in values.items()
+        for queryset in _lookups(field, value)
+    ]
+    if not queries:
+        return set()
+    first, *rest = queries
+    return {row[0] for row in first.union(*rest)}
+
+
+def _cache_key(field, value):
+    return f'availability:{field}:{hashlib.sha256(value.encode()).hexdigest()}'
+
+
+def check(values, use_cache=True):
+    """
+    {campo: valor} -> {campo: disponible}. Con use_cache sólo se consulta la
+    BBDD por los valores que no están en la caché.
+    """
+    values = {field: normalize(field, value) for field, value in values.items() if value}
+    if not use_cache:
+        taken = taken_fields(values)
+        return {field: field not in taken for field in values}
+
+    keys = {field: _cache_key(field, value) for field, value in values.items()}
+    cached = cache.get_many(keys.values())
+    result = {field: cached[key] for field, key in keys.items() if key in cached}
+
+    missing = {field: value for field, value in values.items() if field not in result}
+    if missing:
+        taken = taken_fields(missing)
+        fresh = {field: field not in taken for field in missing}
+        cache.set_many(
+            {keys[field]: available for field, available in fresh.items()},
+            getattr(settings, 'REGISTRATION_AVAILABILITY_TIMEOUT', 30),
+        )
+        result.update(fresh)
+    return result
+
+
+def mark_taken(values):
+    """Tras un registro exitoso: la caché no debe seguir diciendo 'disponible'."""
+    cache.set_many(
+        {_cache_key(field, normalize(field, value)): False for field, value in values.items() if value},
+        getattr(settings, 'REGISTRATION_AVAILABILITY_TIMEOUT', 30),
+    )
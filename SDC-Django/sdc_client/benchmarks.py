@@ -0,0 +1,287 @@
+# SDC-Django/sdc_client/benchmarks.py
+
+import random
+import statistics
+import time
+from collections import Counter
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Max
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from . import feed_cache
+from .reports import rebuild_rollups
+from .models import (
+    Category, CustomUser, Donee, Donor, Institution, Post, Status, Transaction,
+)
+
+
+# --- Benchmarks de las rutas más usadas ---
+#
+# Se siembra un conjunto de datos sintético (usuarios de los tres roles,
+# posts y transacciones) y se miden las vistas con el cliente de pruebas de
+# Django: pasan por middleware, sesión, plantillas y ORM como en producción,
+# pero sin servidor HTTP. Ver el comando bench_hot_paths.
+
+BENCH_PASSWORD = 'Benchmark123'
+CATEGORY_NAMES = ('Comida', 'Ropa', 'Medicinas', 'Higiene', 'Útiles escolares')
+LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+class BenchmarkError(Exception):
+    """Una vista respondió con un código inesperado durante el benchmark."""
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def _letters(number, length=4):
+    # Número -> letras (base 26) para CURP/RFC únicos y válidos
+    chars = []
+    for _ in range(length):
+        number, digit = divmod(number, len(LETTERS))
+        chars.append(LETTERS[digit])
+    return ''.join(reversed(chars))
+
+
+def _curp(number):
+    return f'{_letters(number)}900101HDFXXX00'
+
+
+def _rfc(number):
+    return f'{_letters(number)}900101AB1'
+
+
+# --- Datos sintéticos ---
+
+def seed_dataset(users, posts, transactions, seed=0):
+    """
+    Crea 'users' usuarios repartidos entre Donatarios, Donadores e
+    Instituciones, 'posts' publicaciones y 'transactions' compromisos.
+    Devuelve un dict con un usuario de cada rol para las mediciones.
+    """
+    rng = random.Random(seed)
+    Status.objects.get_or_create(id=1, defaults={'name': 'Activo', 'description': 'Usuario activo'})
+    categories = [Category.objects.get_or_create(name=name)[0] for name in CATEGORY_NAMES]
+
+    # Desplazamiento para no chocar con datos de corridas anteriores
+    offset = (CustomUser.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+    roles = [CustomUser.Role.DONEE, CustomUser.Role.DONOR, CustomUser.Role.INSTITUTION]
+    # Un solo hash para todos: sembrar no debe costar un hash por usuario
+    password = make_password(BENCH_PASSWORD)
+
+    with transaction.atomic():
+        new_users = []
+        for i in range(max(users, len(roles))):
+            number = offset + i
+            role = roles[i % len(roles)]
+            new_users.append(CustomUser(
+                email=f'bench-{role}-{number}@sdc.mx',
+                phone=_rfc(number) if role == CustomUser.Role.INSTITUTION else f'{number:010d}',
+                password=password,
+                status_id=1,
+                # bulk_create no dispara las señales que sincronizan el rol
+                role=role,
+            ))
+        CustomUser.objects.bulk_create(new_users)
+
+        profiles = {Donee: [], Donor: [], Institution: []}
+        for i, user in enumerate(new_users):
+            number = offset + i
+            if user.role == CustomUser.Role.INSTITUTION:
+                profiles[Institution].append(Institution(
+                    user=user, name=f'Institución {number}', rfc=user.phone,
+                    city='Tijuana', state='Baja California', address=f'Calle {number}',
+                ))
+            else:
+                model = Donee if user.role == CustomUser.Role.DONEE else Donor
+                profiles[model].append(model(
+                    user=user, first_name='Prueba', first_surname='Carga',
+                    second_surname='Sintética', curp=_curp(number),
+                    city='Tijuana', state='Baja California',
+                ))
+        for model, objects in profiles.items():
+            model.objects.bulk_create(objects)
+
+        new_posts = []
+        for i in range(posts):
+            author = rng.choice(new_users)
+            if author.role == CustomUser.Role.DONEE:
+                post_type = Post.PostType.REQUEST
+            elif author.role == CustomUser.Role.DONOR:
+                post_type = Post.PostType.OFFER
+            else:
+                post_type = rng.choice(Post.PostType.values)
+            new_posts.append(Post(
+                author=author,
+                title=f'Publicación {i}',
+                description=f'Descripción de la publicación {i}',
+                category=rng.choice(categories),
+                quantity=Decimal(rng.randint(10, 100)),
+                post_type=post_type,
+                status=rng.choices(
+                    [Post.PostStatus.ACTIVE, Post.PostStatus.IN_PROGRESS, Post.PostStatus.COMPLETED],
+                    weights=[8, 1, 1],
+                )[0],
+            ))
+        Post.objects.bulk_create(new_posts)
+
+        committed = Counter()
+        new_transactions = []
+        for _ in range(transactions if new_posts else 0):
+            post = rng.choice(new_posts)
+            participant = rng.choice(new_users)
+            committed[post.pk] += 1
+            new_transactions.append(Transaction(
+                post=post, participant=participant, quantity_committed=Decimal(1),
+            ))
+        Transaction.objects.bulk_create(new_transactions)
+
+        for post in new_posts:
+            post.quantity_committed = Decimal(committed[post.pk])
+        Post.objects.bulk_update(new_posts, ['quantity_committed'], batch_size=500)
+
+    # bulk_create no dispara señales: caché de feeds y rollups se actualizan aparte
+    feed_cache.invalidate_feeds(Post.PostType.OFFER)
+    feed_cache.invalidate_feeds(Post.PostType.REQUEST)
+    rebuild_rollups()
+
+    return {
+        'donee': new_users[0],
+        'donor': new_users[1],
+        'institution': new_users[2],
+        'category': categories[0],
+        'offset': offset + len(new_users),
+    }
+
+
+# --- Escenarios ---
+
+def _logged_client(user):
+    client = Client()
+    client.force_login(user)
+    return client
+
+
+def _feed_scenario(url_name, role):
+    def build(context):
+        client = _logged_client(context[role])
+        return lambda i: (client.get(reverse(url_name)), 200)
+    return build
+
+
+def _create_post_scenario(context):
+    client = _logged_client(context['donor'])
+
+    def run(i):
+        response = client.post(reverse('create_post'), {
+            'title': f'Oferta benchmark {i}',
+            'description': 'Creada por el benchmark',
+            'category': context['category'].pk,
+            'quantity': '5',
+        })
+        return response, 302
+    return run
+
+
+def _register_scenario(context):
+    client = Client()
+
+    def run(i):
+        number = context['offset'] + 100000 + i
+        response = client.post(reverse('register'), {
+            'person_first_name': 'Nueva',
+            'person_first_surname': 'Cuenta',
+            'person_second_surname': 'Benchmark',
+            'person_curp': _curp(number),
+            'person_city': 'Tijuana',
+            'person_state': 'Baja California',
+            'person_email': f'bench-register-{number}@sdc.mx',
+            'person_phone': f'{number:010d}',
+            'person_password': BENCH_PASSWORD,
+            'confirm_person_password': BENCH_PASSWORD,
+            'user_type': 'donee',
+        })
+        return response, 302
+    return run
+
+
+def _api_login_scenario(context):
+    client = Client()
+    payload = {'email': context['donee'].email, 'password': BENCH_PASSWORD}
+    return lambda i: (
+        client.post(reverse('api_login'), payload, content_type='application/json'), 200
+    )
+
+
+SCENARIOS = {
+    'donee_feed': _feed_scenario('donee_feed', 'donee'),
+    'donor_feed': _feed_scenario('donor_feed', 'donor'),
+    'institution_feed': _feed_scenario('institution_feed', 'institution'),
+    'create_post': _create_post_scenario,
+    'register': _register_scenario,
+    'api_login': _api_login_scenario,
+}
+
+
+def run_scenarios(context, iterations, warmup=2, names=None):
+    """
+    Ejecuta cada escenario 'iterations' veces (tras 'warmup' corridas sin
+    medir) y devuelve {escenario: métricas}. Un cliente a la vez, así que
+    'throughput_rps' es el de un solo worker.
+    """
+    results = {}
+    # El throttle de login rechazaría las corridas repetidas del mismo email
+    with override_settings(
+        LOGIN_THROTTLE_BUCKETS={},
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+    ):
+        counter = 0
+        for name in names or SCENARIOS:
+            run = SCENARIOS[name](context)
+            timings = []
+            for i in range(warmup + iterations):
+                counter += 1
+                start = time.perf_counter()
+                response, expected_status = run(counter)
+                elapsed = time.perf_counter() - start
+                if response.status_code != expected_status:
+                    raise BenchmarkError(
+                        f'{name}: se esperaba {expected_status} y se obtuvo {response.status_code}.'
+                    )
+                if i >= warmup:
+                    timings.append(elapsed * 1000)
+
+            results[name] = {
+                'iterations': iterations,
+                'mean_ms': round(statistics.mean(timings), 3),
+                'p50_ms': round(statistics.median(timings), 3),
+                'p99_ms': round(percentile(timings, 99), 3),
+                'throughput_rps': round(1000 * len(timings) / sum(timings), 1),
+            }
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """
+    Compara p50/p99 contra la línea base. Devuelve una lista de
+    (escenario, métrica, actual, base) para las que empeoraron más que
+    'tolerance' (0.2 = 20 %).
+    """
+    regressions = []
+    for name, metrics in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric in ('p50_ms', 'p99_ms'):
+            if base.get(metric) and metrics[metric] > base[metric] * (1 + tolerance):
+                regressions.append((name, metric, metrics[metric], base[metric]))
+    return regressions
@@ -0,0 +1,78 @@
+# SDC-Django/sdc_client/card_cache.py
+
+import hashlib
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template import Context
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+
+# --- Caché de fragmentos: una tarjeta por post ---
+#
+# El HTML de cada tarjeta se guarda con llave (plantilla, opciones, id,
+# updated_at, autor y categoría): cualquier cambio del post (un compromiso,
+# un cambio de estatus) mueve updated_at y deja la llave anterior sin uso;
+# lo mismo al cambiar el correo del autor o el nombre de la categoría, que
+# la tarjeta también muestra. Una página
+# del feed hace un solo get_many y sólo renderiza las tarjetas que faltan.
+# Lo que depende del usuario (formularios con csrf_token) queda fuera del
+# fragmento, en la plantilla del feed.
+
+def _cache():
+    return caches[getattr(settings, 'FEED_CACHE_ALIAS', 'default')]
+
+
+@lru_cache(maxsize=None)
+def _template_digest(template_name):
+    # Cambiar la plantilla (un despliegue) invalida sus fragmentos
+    source = get_template(template_name).template.source
+    return hashlib.sha1(source.encode()).hexdigest()[:8]
+
+
+def _options_digest(options):
+    raw = '|'.join(f'{key}={value}' for key, value in sorted(options.items()))
+    return hashlib.sha1(raw.encode()).hexdigest()[:8]
+
+
+def _related_digest(post):
+    # Valores de otras tablas que se renderizan (for_cards ya los trae)
+    raw = f'{post.author.email}|{post.category.name}'
+    return hashlib.sha1(raw.encode()).hexdigest()[:8]
+
+
+def card_key(template_name, options, post):
+    return (
+        f'card:{template_name}:{_template_digest(template_name)}:{_options_digest(options)}:'
+        f'{post.pk}:{post.updated_at.timestamp()}:{_related_digest(post)}'
+    )
+
+
+def render_cards(posts, template_name, **options):
+    """
+    [(post, html)] para los posts dados. 'options' llega al contexto de la
+    tarjeta (p. ej. etiquetas del feed) y forma parte de la llave.
+    """
+    posts = list(posts)
+    if not posts:
+        return []
+
+    cache = _cache()
+    keys = [card_key(template_name, options, post) for post in posts]
+    cached = cache.get_many(keys)
+
+    # La plantilla interna: el render ocurre dentro del de la página, que
+    # ya se mide completo (TimedTemplate lo contaría dos veces)
+    template = get_template(template_name).template
+    cards, missing = [], {}
+    for post, key in zip(posts, keys):
+        html = cached.get(key)
+        if html is None:
+            html = missing[key] = template.render(Context({'post': post, **options}))
+        cards.append((post, mark_safe(html)))
+
+    if missing:
+        cache.set_many(missing, getattr(settings, 'CARD_CACHE_TIMEOUT', 86400))
+    return cards
@@ -0,0 +1,41 @@
+# SDC-Django/sdc_client/checks.py
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Warning, register
+
+
+# --- Cachés compartidas entre procesos ---
+#
+# LocMemCache vive en la memoria de cada worker: lo que un proceso invalida
+# (usuario JWT, feeds) o cuenta (throttle de login) no lo ven los demás.
+# Sirve en desarrollo; en producción hay que apuntar CACHE_BACKEND a Redis o
+# memcached.
+
+SHARED_CACHE_SETTINGS = (
+    'FEED_CACHE_ALIAS', 'JWT_USER_CACHE_ALIAS', 'LOGIN_THROTTLE_CACHE_ALIAS',
+)
+
+
+def cache_is_process_local(alias):
+    """True si la caché no se comparte entre workers y DEBUG está apagado."""
+    return not settings.DEBUG and isinstance(caches[alias], LocMemCache)
+
+
+@register()
+def check_shared_caches(app_configs, **kwargs):
+    aliases = {getattr(settings, name, 'default') for name in SHARED_CACHE_SETTINGS}
+    return [
+        Warning(
+            f'La caché "{alias}" es LocMemCache con DEBUG=False.',
+            hint=(
+                'Cada worker tendrá su propia copia: las invalidaciones de feeds y el '
+                'throttle de login no se comparten y la API no usará la caché de '
+                'usuarios JWT. Defina CACHE_BACKEND (Redis o memcached).'
+            ),
+            id='sdc_client.W001',
+        )
+        for alias in sorted(aliases)
+        if cache_is_process_local(alias)
+    ]
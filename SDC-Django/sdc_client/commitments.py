@@ -0,0 +1,111 @@
+# SDC-Django/sdc_client/commitments.py
+
+from django.db import transaction
+
+from .models import Post, Transaction
+
+
+# --- Compromisos (Transaction) sobre publicaciones ---
+
+class CommitmentError(Exception):
+    """El compromiso no es válido (post cerrado, cantidad excedida, etc.)."""
+
+
+def commit_to_post(post_id, participant, quantity):
+    """
+    Registra que 'participant' se compromete con 'quantity' unidades del post.
+
+    La fila del Post se bloquea (SELECT ... FOR UPDATE) durante la
+    transacción, así que los compromisos concurrentes sobre el mismo post se
+    serializan y nunca superan la cantidad publicada. La cantidad comprometida
+    y el estado del post se actualizan en la misma transacción.
+    """
+    if quantity <= 0:
+        raise CommitmentError('La cantidad debe ser mayor a cero.')
+
+    with transaction.atomic():
+        try:
+            post = Post.objects.select_for_update().get(pk=post_id)
+        except Post.DoesNotExist:
+            raise CommitmentError('La publicación no existe.')
+
+        if post.author_id == participant.pk:
+            raise CommitmentError('No puedes comprometerte con tu propia publicación.')
+        if post.status not in (Post.PostStatus.ACTIVE, Post.PostStatus.IN_PROGRESS):
+            raise CommitmentError('La publicación ya no acepta compromisos.')
+        if quantity > post.remaining_quantity:
+            raise CommitmentError(
+                f'Sólo quedan {post.remaining_quantity} unidades disponibles.'
+            )
+
+        commitment = Transaction.objects.create(
+            post=post,
+            participant=participant,
+            quantity_committed=quantity,
+        )
+
+        post.quantity_committed += quantity
+        post.status = _open_status(post)
+        post.save(update_fields=['quantity_committed', 'status', 'updated_at'])
+
+    return commitment
+
+
+def _open_status(post):
+    if post.remaining_quantity <= 0:
+        return Post.PostStatus.COMPLETED
+    if post.is_campaign or post.quantity_committed <= 0:
+        # Las campañas siguen ACTIVAS (visibles en los feeds) hasta llenarse
+        return Post.PostStatus.ACTIVE
+    return Post.PostStatus.IN_PROGRESS
+
+
+# --- Cambios de estatus de un compromiso ---
+#
+# Post.quantity_committed suma los compromisos no RECHAZADOS (igual que el
+# backfill de la migración 0004). Rechazar una Transaction (o quitarle el
+# rechazo, o cambiar su cantidad o su post) mueve la columna con la fila del
+# Post bloqueada, como commit_to_post; un post lleno que recupera unidades
+# vuelve a aceptar compromisos.
+
+def _counted(status, quantity):
+    return 0 if status == Transaction.TransactionStatus.REJECTED else quantity
+
+
+def commitment_before_save(instance):
+    instance._commitment_old = None if instance._state.adding else (
+        Transaction.objects.filter(pk=instance.pk)
+        .values('post_id', 'status', 'quantity_committed').first()
+    )
+
+
+def commitment_after_save(instance):
+    old, instance._commitment_old = getattr(instance, '_commitment_old', None), None
+    # Los compromisos nuevos los cuenta commit_to_post
+    if old is None:
+        return
+
+    deltas = {old['post_id']: -_counted(old['status'], old['quantity_committed'])}
+    deltas[instance.post_id] = (
+        deltas.get(instance.post_id, 0) + _counted(instance.status, instance.quantity_committed)
+    )
+    with transaction.atomic():
+        # Orden fijo de bloqueo si el compromiso cambió de post
+        for post_id, delta in sorted(deltas.items()):
+            if delta:
+                _adjust_committed(post_id, delta)
+
+
+def _adjust_committed(post_id, delta):
+    post = Post.objects.select_for_update().filter(pk=post_id).first()
+    if post is None:
+        return
+
+    was_full = post.remaining_quantity <= 0
+    post.quantity_committed += delta
+    # Los posts cerrados por otra causa (cancelados, caducados) no se reabren
+    if post.status in (Post.PostStatus.ACTIVE, Post.PostStatus.IN_PROGRESS) or (
+        post.status == Post.PostStatus.COMPLETED and was_full
+    ):
+        post.status = _open_status(post)
+    post.save(update_fields=['quantity_committed', 'status', 'updated_at'])
@@ -0,0 +1,151 @@
+# SDC-Django/sdc_client/feed_cache.py
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .models import Post
+from .pagination import (
+    apaginate_by_cursor, decode_cursor, encode_cursor, get_page_size, paginate_by_cursor,
+)
+
+
+# --- Caché compartida de feeds con invalidación por versión ---
+#
+# Las listas de posts ACTIVOS son iguales para todos los usuarios salvo por la
+# exclusión de sus propios posts. Se guarda en caché una "ventana" con los
+# primeros FEED_CACHE_WINDOW posts por tipo (o todos, para instituciones) y la
+# exclusión + paginación se aplican en memoria. Cada guardado/borrado de un
+# Post incrementa la versión de su lista, lo que deja obsoletas las llaves
+# anteriores sin tener que borrarlas.
+
+ALL_TYPES = 'ALL'
+
+
+def _cache():
+    return caches[getattr(settings, 'FEED_CACHE_ALIAS', 'default')]
+
+
+def _version_key(post_type):
+    return f'feed:version:{post_type}'
+
+
+def _get_version(post_type):
+    cache = _cache()
+    version = cache.get(_version_key(post_type))
+    if version is None:
+        cache.add(_version_key(post_type), 1, timeout=None)
+        version = cache.get(_version_key(post_type), 1)
+    return version
+
+
+def _bump_version(post_type):
+    cache = _cache()
+    try:
+        cache.incr(_version_key(post_type))
+    except ValueError:
+        # La llave no existía (caché vacía o reiniciada)
+        cache.add(_version_key(post_type), 1, timeout=None)
+
+
+def invalidate_feeds(post_type):
+    """
+    Invalida la lista del tipo dado y la lista general de instituciones.
+    Se invalida de inmediato y otra vez al confirmar la transacción, por si
+    otra petición repobló la caché con datos previos mientras tanto.
+    """
+    def bump():
+        _bump_version(post_type)
+        _bump_version(ALL_TYPES)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def active_posts(post_type):
+    """Posts ACTIVOS de un tipo (o de todos, con ALL_TYPES), sin caché."""
+    queryset = Post.objects.filter(status=Post.PostStatus.ACTIVE)
+    if post_type != ALL_TYPES:
+        queryset = queryset.filter(post_type=post_type)
+    return queryset
+
+
+def _window_queryset(post_type):
+    window_size = getattr(settings, 'FEED_CACHE_WINDOW', 200)
+    return active_posts(post_type).for_cards().order_by('-created_at', '-id')[:window_size]
+
+
+def get_active_window(post_type):
+    """Ventana compartida de posts ACTIVOS más recientes (lista ordenada)."""
+    key = f'feed:{post_type}:v{_get_version(post_type)}'
+
+    posts = _cache().get(key)
+    if posts is None:
+        posts = list(_window_queryset(post_type))
+        _cache().set(key, posts, getattr(settings, 'FEED_CACHE_TIMEOUT', 300))
+    return posts
+
+
+async def aget_active_window(post_type):
+    """Versión async de get_active_window."""
+    cache = _cache()
+    version = await cache.aget(_version_key(post_type))
+    if version is None:
+        await cache.aadd(_version_key(post_type), 1, timeout=None)
+        version = await cache.aget(_version_key(post_type), 1)
+    key = f'feed:{post_type}:v{version}'
+
+    posts = await cache.aget(key)
+    if posts is None:
+        posts = [post async for post in _window_queryset(post_type)]
+        await cache.aset(key, posts, getattr(settings, 'FEED_CACHE_TIMEOUT', 300))
+    return posts
+
+
+def _page_from_window(window, user, cursor):
+    """
+    Arma la página desde la ventana en memoria, o devuelve None si la página
+    pedida sale de la ventana y hay que ir a la base de datos.
+    """
+    page_size = get_page_size()
+    window_size = getattr(settings, 'FEED_CACHE_WINDOW', 200)
+    position = decode_cursor(cursor)
+
+    candidates = [
+        post for post in window
+        if post.author_id != user.pk
+        and (position is None or (post.created_at, post.pk) < position)
+    ]
+
+    # La ventana contiene todos los posts activos, o alcanza para la página
+    if len(window) < window_size or len(candidates) > page_size:
+        page = candidates[:page_size]
+        next_cursor = encode_cursor(page[-1]) if len(candidates) > page_size else None
+        return page, next_cursor
+    return None
+
+
+def get_feed_page(post_type, user, cursor=None):
+    """
+    Devuelve (posts, next_cursor) del feed de posts ACTIVOS de 'post_type'
+    (ALL_TYPES para todos) excluyendo los del usuario.
+
+    Se sirve desde la ventana en caché; sólo si la página pedida sale de
+    la ventana se consulta la base de datos.
+    """
+    page = _page_from_window(get_active_window(post_type), user, cursor)
+    if page is not None:
+        return page
+
+    queryset = active_posts(post_type).exclude(author=user).for_cards()
+    return paginate_by_cursor(queryset, cursor)
+
+
+async def aget_feed_page(post_type, user, cursor=None):
+    """Versión async de get_feed_page."""
+    page = _page_from_window(await aget_active_window(post_type), user, cursor)
+    if page is not None:
+        return page
+
+    queryset = active_posts(post_type).exclude(author=user).for_cards()
+    return await apaginate_by_cursor(queryset, cursor)
@@ -1,7 +1,9 @@
 import re
+from decimal import Decimal
 from django import forms
 from django.core.exceptions import ValidationError
-from .models import Post, Category
+from .models import CustomUser, Post, Category
+from .availability import check as check_availability
 
 # --- Funciones de Validación Reutilizables ---
 
@@ -29,6 +31,30 @@ def validate_rfc(value):
 
 # --- Formularios de Registro ---
 
+TAKEN_MESSAGES = {
+    'email': 'Este correo ya está registrado.',
+    'phone': 'Este teléfono ya está registrado.',
+    'curp': 'Este CURP ya está registrado.',
+    'rfc': 'Este RFC ya está registrado.',
+    'name': 'Ya existe una institución con este nombre.',
+}
+
+
+def add_taken_errors(form, fields):
+    """
+    Revisa en una sola query que los datos únicos no estén registrados
+    ({campo de disponibilidad: campo del form}). Así un duplicado se rechaza
+    antes del hash de la contraseña y del INSERT.
+    """
+    values = {
+        field: form.cleaned_data[form_field]
+        for field, form_field in fields.items()
+        if form.cleaned_data.get(form_field)
+    }
+    for field, available in check_availability(values, use_cache=False).items():
+        if not available:
+            form.add_error(fields[field], TAKEN_MESSAGES[field])
+
 class PersonRegistrationForm(forms.Form):
     person_first_name = forms.CharField(label='Primer nombre', max_length=100, validators=[validate_no_numbers])
     person_middle_name = forms.CharField(label='Segundo nombre', max_length=100, required=False, validators=[validate_no_numbers])
@@ -44,13 +70,19 @@ class PersonRegistrationForm(forms.Form):
     user_type = forms.ChoiceField(label='Tipo de usuario', choices=[('donee', 'Donatario'), ('donor', 'Donador')])
 
     def clean_person_email(self):
-        """Valida que el email no esté ya en uso."""
+        """Normaliza el email (la unicidad se revisa en clean())."""
         email = self.cleaned_data.get('person_email')
-        return email
+        return CustomUser.objects.normalize_email(email)
+
+    def clean_person_curp(self):
+        return self.cleaned_data.get('person_curp').upper()
 
     def clean(self):
-        """Valida que las contraseñas coincidan."""
+        """Valida que las contraseñas coincidan y que los datos únicos estén libres."""
         cleaned_data = super().clean()
+        add_taken_errors(self, {
+            'email': 'person_email', 'phone': 'person_phone', 'curp': 'person_curp',
+        })
         password = cleaned_data.get("person_password")
         confirm_password = cleaned_data.get("confirm_person_password")
 
@@ -79,13 +111,19 @@ class InstitutionRegistrationForm(forms.Form):
     confirm_institution_password = forms.CharField(label='Confirmar contraseña', widget=forms.PasswordInput)
 
     def clean_institution_email(self):
-        """Valida que el email no esté ya en uso."""
+        """Normaliza el email (la unicidad se revisa en clean())."""
         email = self.cleaned_data.get('institution_email')
-        return email
+        return CustomUser.objects.normalize_email(email)
+
+    def clean_institution_rfc(self):
+        return self.cleaned_data.get('institution_rfc').upper()
 
     def clean(self):
-        """Valida que las contraseñas coincidan."""
+        """Valida que las contraseñas coincidan y que los datos únicos estén libres."""
         cleaned_data = super().clean()
+        add_taken_errors(self, {
+            'email': 'institution_email', 'rfc': 'institution_rfc', 'name': 'institution_name',
+        })
         password = cleaned_data.get("institution_password")
         confirm_password = cleaned_data.get("confirm_institution_password")
 
@@ -170,10 +208,22 @@ class PostForm(forms.ModelForm):
 
         # --- Lógica de visibilidad por ROL ---
         is_institution = False
-        if user is not None and hasattr(user, 'institution'):
+        if user is not None and user.role == CustomUser.Role.INSTITUTION:
             is_institution = True
         
         # Si el usuario NO es una institución, eliminamos los campos
         if not is_institution:
             del self.fields['post_type']
             del self.fields['is_campaign']
+
+
+# --- Formulario de Compromisos ---
+
+class CommitmentForm(forms.Form):
+    """Cantidad con la que un usuario se compromete a una publicación."""
+    quantity_committed = forms.DecimalField(
+        label='Cantidad',
+        max_digits=10,
+        decimal_places=2,
+        min_value=Decimal('0.01'),
+    )
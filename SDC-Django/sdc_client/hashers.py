@@ -0,0 +1,26 @@
+# SDC-Django/sdc_client/hashers.py
+
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2id con parámetros configurables (ARGON2_* en settings).
+
+    Conserva el algoritmo 'argon2', así que los hashes son compatibles con
+    el hasher de Django. Si los parámetros cambian, must_update() hace que
+    la contraseña se vuelva a hashear en el siguiente login.
+    """
+
+    @property
+    def time_cost(self):
+        return getattr(settings, 'ARGON2_TIME_COST', 2)
+
+    @property
+    def memory_cost(self):
+        return getattr(settings, 'ARGON2_MEMORY_COST', 65536)
+
+    @property
+    def parallelism(self):
+        return getattr(settings, 'ARGON2_PARALLELISM', 2)
@@ -0,0 +1,201 @@
+# SDC-Django/sdc_client/inventory.py
+
+from django.db import transaction
+from django.db.models import DecimalField, Exists, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import StockMovement, Transaction, WarehouseStock
+
+
+# --- Inventario por almacén: libro de movimientos + existencia materializada ---
+#
+# Cada entrada, salida o ajuste agrega una fila a StockMovement y, en la
+# misma transacción, actualiza la fila de WarehouseStock del par
+# (almacén, categoría), bloqueada con SELECT ... FOR UPDATE. Así dos
+# movimientos concurrentes sobre el mismo producto se serializan, la
+# existencia nunca queda negativa y leerla es una búsqueda por llave única.
+# El comando reconcile_inventory compara periódicamente ambas tablas.
+
+Kind = StockMovement.MovementKind
+QUANTITY = DecimalField(max_digits=12, decimal_places=2)
+
+
+class InventoryError(Exception):
+    """El movimiento no es válido (cantidad, existencia insuficiente, etc.)."""
+
+
+def _locked_stock(warehouse_id, category_id):
+    # La fila se crea si no existe (INSERT ... ON CONFLICT DO NOTHING, sin
+    # carreras entre dos primeras entradas) y se bloquea hasta el COMMIT
+    WarehouseStock.objects.bulk_create(
+        [WarehouseStock(warehouse_id=warehouse_id, category_id=category_id)],
+        ignore_conflicts=True,
+    )
+    return WarehouseStock.objects.select_for_update().get(
+        warehouse_id=warehouse_id, category_id=category_id,
+    )
+
+
+def _append(stock, delta, kind, user=None, commitment=None, note=''):
+    """Agrega el movimiento y lo suma a la fila ya bloqueada."""
+    if stock.quantity + delta < 0:
+        raise InventoryError(f'Sólo hay {stock.quantity} unidades en existencia.')
+
+    movement = StockMovement.objects.create(
+        warehouse_id=stock.warehouse_id,
+        category_id=stock.category_id,
+        kind=kind,
+        quantity=delta,
+        transaction=commitment,
+        created_by=user,
+        note=note,
+    )
+    stock.quantity += delta
+    stock.last_movement = movement
+    stock.save(update_fields=['quantity', 'last_movement', 'updated_at'])
+    return movement
+
+
+def _resolve_category(category_id, commitment):
+    # Con un compromiso, la categoría es la de su publicación
+    if commitment is None:
+        if category_id is None:
+            raise InventoryError('Indica la categoría del movimiento.')
+        return category_id
+    post_category = (
+        Transaction.objects.filter(pk=commitment.pk)
+        .values_list('post__category_id', flat=True).first()
+    )
+    if post_category is None:
+        raise InventoryError('El compromiso no existe.')
+    if category_id is not None and category_id != post_category:
+        raise InventoryError('La categoría no coincide con la del compromiso.')
+    return post_category
+
+
+def _record(warehouse_id, category_id, delta, kind, user, commitment, note):
+    category_id = _resolve_category(category_id, commitment)
+    with transaction.atomic():
+        stock = _locked_stock(warehouse_id, category_id)
+        return _append(stock, delta, kind, user, commitment, note)
+
+
+def receive(warehouse_id, quantity, category_id=None, user=None, commitment=None, note=''):
+    """Entrada de 'quantity' unidades al almacén (p. ej. una donación entregada)."""
+    if quantity <= 0:
+        raise InventoryError('La cantidad debe ser mayor a cero.')
+    return _record(warehouse_id, category_id, quantity, Kind.RECEIPT, user, commitment, note)
+
+
+def dispatch(warehouse_id, quantity, category_id=None, user=None, commitment=None, note=''):
+    """Salida de 'quantity' unidades; falla si no hay existencia suficiente."""
+    if quantity <= 0:
+        raise InventoryError('La cantidad debe ser mayor a cero.')
+    return _record(warehouse_id, category_id, -quantity, Kind.DISPATCH, user, commitment, note)
+
+
+def adjust(warehouse_id, category_id, delta, user=None, note=''):
+    """Ajuste con signo (conteo físico, merma). Nunca deja la existencia negativa."""
+    if not delta:
+        raise InventoryError('El ajuste no puede ser cero.')
+    return _record(warehouse_id, category_id, delta, Kind.ADJUSTMENT, user, None, note)
+
+
+def transfer(from_warehouse_id, to_warehouse_id, category_id, quantity, user=None, note=''):
+    """Mueve existencia entre dos almacenes en una sola transacción."""
+    if quantity <= 0:
+        raise InventoryError('La cantidad debe ser mayor a cero.')
+    if from_warehouse_id == to_warehouse_id:
+        raise InventoryError('El almacén de origen y el de destino son el mismo.')
+
+    with transaction.atomic():
+        # Siempre se bloquea primero el almacén de id menor: dos
+        # transferencias cruzadas no se bloquean mutuamente (deadlock)
+        locked = {
+            warehouse_id: _locked_stock(warehouse_id, category_id)
+            for warehouse_id in sorted((from_warehouse_id, to_warehouse_id))
+        }
+        out = _append(locked[from_warehouse_id], -quantity, Kind.DISPATCH, user, note=note)
+        received = _append(locked[to_warehouse_id], quantity, Kind.RECEIPT, user, note=note)
+    return out, received
+
+
+# --- Lectura de existencias (sólo WarehouseStock) ---
+
+def current_stock(warehouse_id):
+    """Existencias de un almacén por categoría, sin tocar el historial."""
+    return list(
+        WarehouseStock.objects.filter(warehouse_id=warehouse_id, quantity__gt=0)
+        .values('category_id', 'quantity', 'updated_at', category_name=F('category__name'))
+        .order_by('category__name')
+    )
+
+
+def stock_of(warehouse_id, category_id):
+    """Existencia de una categoría en un almacén (0 si nunca hubo movimientos)."""
+    quantity = (
+        WarehouseStock.objects.filter(warehouse_id=warehouse_id, category_id=category_id)
+        .values_list('quantity', flat=True).first()
+    )
+    return quantity if quantity is not None else 0
+
+
+# --- Conciliación ---
+
+def reconcile(fix=False):
+    """
+    Compara cada fila de WarehouseStock con la suma de sus movimientos.
+    Devuelve [(almacén, categoría, existencia, suma del libro)] con las
+    diferencias; con fix=True corrige la existencia al valor del libro.
+
+    Sólo se suman los movimientos hasta last_movement: los de un mismo par
+    se insertan con la fila bloqueada, así que los que estén en curso
+    durante la conciliación no cuentan como diferencias.
+    """
+    ledger = (
+        StockMovement.objects
+        .filter(
+            warehouse_id=OuterRef('warehouse_id'),
+            category_id=OuterRef('category_id'),
+            id__lte=OuterRef('last_movement_id'),
+        )
+        .order_by()
+        .values('warehouse_id', 'category_id')
+        .annotate(total=Sum('quantity'))
+        .values('total')
+    )
+    rows = (
+        WarehouseStock.objects
+        .annotate(ledger=Coalesce(Subquery(ledger), Value(0), output_field=QUANTITY))
+        .exclude(quantity=F('ledger'))
+        .values_list('warehouse_id', 'category_id', 'quantity', 'ledger')
+    )
+    mismatches = list(rows)
+
+    # Movimientos de pares que no tienen fila de existencia
+    orphans = (
+        StockMovement.objects
+        .filter(~Exists(WarehouseStock.objects.filter(
+            warehouse_id=OuterRef('warehouse_id'), category_id=OuterRef('category_id'),
+        )))
+        .order_by()
+        .values('warehouse_id', 'category_id')
+        .annotate(total=Sum('quantity'))
+        .values_list('warehouse_id', 'category_id', Value(0), 'total')
+    )
+    mismatches.extend(orphans)
+
+    if fix:
+        for warehouse_id, category_id, _, _ in mismatches:
+            _resync(warehouse_id, category_id)
+    return mismatches
+
+
+def _resync(warehouse_id, category_id):
+    with transaction.atomic():
+        # Con la fila bloqueada no hay movimientos en curso para el par
+        stock = _locked_stock(warehouse_id, category_id)
+        movements = StockMovement.objects.filter(warehouse_id=warehouse_id, category_id=category_id)
+        stock.quantity = movements.aggregate(total=Sum('quantity'))['total'] or 0
+        stock.last_movement = movements.order_by('-id').first()
+        stock.save(update_fields=['quantity', 'last_movement', 'updated_at'])
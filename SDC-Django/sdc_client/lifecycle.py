@@ -0,0 +1,154 @@
+# SDC-Django/sdc_client/lifecycle.py
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import reports
+from .feed_cache import invalidate_feeds
+from .models import ArchivedPost, ArchivedTransaction, Post, PostMatch, Transaction
+
+
+# --- Ciclo de vida de las publicaciones ---
+#
+# 1. Caducidad: los posts ACTIVOS sin cambios en POST_STALE_DAYS pasan a
+#    COMPLETADOS (si alguien se comprometió) o CANCELADOS.
+# 2. Archivado: los COMPLETADOS/CANCELADOS sin cambios en POST_ARCHIVE_DAYS
+#    se copian a ArchivedPost/ArchivedTransaction y salen de Post, así que la
+#    tabla que leen los feeds sólo crece con publicaciones vigentes.
+#
+# Todo avanza por lotes de 'batch_size' ids (recorrido del índice
+# post_status_updated_idx). Cada lote es una transacción corta que bloquea
+# sólo sus filas con SKIP LOCKED: un post que en ese momento recibe un
+# compromiso se salta y se revisa en la siguiente corrida.
+
+CLOSED_STATUSES = (Post.PostStatus.COMPLETED, Post.PostStatus.CANCELLED)
+
+
+def _batches(queryset, batch_size):
+    """Ids de 'queryset' en lotes crecientes (keyset por id, sin OFFSET)."""
+    last_id = 0
+    while True:
+        ids = list(
+            queryset.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
+
+
+def _locked(queryset, ids):
+    return list(
+        queryset.filter(pk__in=ids).select_for_update(skip_locked=True).values_list('pk', flat=True)
+    )
+
+
+# --- Caducidad ---
+
+def stale_posts(stale_days=None):
+    stale_days = stale_days if stale_days is not None else settings.POST_STALE_DAYS
+    cutoff = timezone.now() - timedelta(days=stale_days)
+    return Post.objects.filter(status=Post.PostStatus.ACTIVE, updated_at__lt=cutoff)
+
+
+def expire_stale_posts(stale_days=None, batch_size=None, pause=0):
+    """Cierra los posts ACTIVOS abandonados. Devuelve cuántos se cerraron."""
+    batch_size = batch_size or settings.POST_LIFECYCLE_BATCH_SIZE
+    queryset = stale_posts(stale_days)
+    expired = 0
+
+    for ids in _batches(queryset, batch_size):
+        with transaction.atomic():
+            locked = _locked(queryset, ids)
+            if not locked:
+                continue
+            batch = Post.objects.filter(pk__in=locked)
+            now = timezone.now()
+            for new_status, subset in (
+                (Post.PostStatus.COMPLETED, batch.filter(quantity_committed__gt=0)),
+                (Post.PostStatus.CANCELLED, batch.filter(quantity_committed__lte=0)),
+            ):
+                # update() no dispara señales: rollups y coincidencias se
+                # ajustan aquí, una vez por lote
+                reports.posts_status_changed(subset, new_status)
+                subset.update(status=new_status, updated_at=now)
+            PostMatch.objects.filter(Q(request_id__in=locked) | Q(offer_id__in=locked)).delete()
+            transaction.on_commit(_invalidate_feeds)
+        expired += len(locked)
+        if pause:
+            time.sleep(pause)
+    return expired
+
+
+def _invalidate_feeds():
+    invalidate_feeds(Post.PostType.OFFER)
+    invalidate_feeds(Post.PostType.REQUEST)
+
+
+# --- Archivado ---
+
+def archivable_posts(retention_days=None):
+    retention_days = retention_days if retention_days is not None else settings.POST_ARCHIVE_DAYS
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    return (
+        Post.objects
+        .filter(status__in=CLOSED_STATUSES, updated_at__lt=cutoff)
+        # El libro de inventario referencia sus transacciones: se quedan
+        .exclude(transactions__stock_movements__isnull=False)
+    )
+
+
+def _raw_delete(model, column, ids):
+    # Sin señales a propósito: pre_delete restaría el post de los rollups
+    table = connection.ops.quote_name(model._meta.db_table)
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE {column} IN ({placeholders})', ids)
+
+
+def archive_closed_posts(retention_days=None, batch_size=None, pause=0):
+    """Mueve los posts cerrados antiguos al archivo. Devuelve cuántos se movieron."""
+    batch_size = batch_size or settings.POST_LIFECYCLE_BATCH_SIZE
+    queryset = archivable_posts(retention_days)
+    archived = 0
+
+    for ids in _batches(queryset, batch_size):
+        with transaction.atomic():
+            locked = _locked(queryset, ids)
+            if not locked:
+                continue
+            posts = Post.objects.filter(pk__in=locked)
+            transactions = list(
+                Transaction.objects.filter(post_id__in=locked).select_for_update()
+            )
+            ArchivedPost.objects.bulk_create([
+                ArchivedPost(
+                    id=post.id, author_id=post.author_id, title=post.title,
+                    description=post.description, category_id=post.category_id,
+                    quantity=post.quantity, quantity_committed=post.quantity_committed,
+                    post_type=post.post_type, status=post.status, is_campaign=post.is_campaign,
+                    created_at=post.created_at, updated_at=post.updated_at,
+                )
+                for post in posts.defer('search_vector')
+            ])
+            ArchivedTransaction.objects.bulk_create([
+                ArchivedTransaction(
+                    id=item.id, post_id=item.post_id, participant_id=item.participant_id,
+                    quantity_committed=item.quantity_committed, status=item.status,
+                    created_at=item.created_at,
+                )
+                for item in transactions
+            ])
+            PostMatch.objects.filter(Q(request_id__in=locked) | Q(offer_id__in=locked)).delete()
+            if transactions:
+                _raw_delete(Transaction, 'post_id', locked)
+            _raw_delete(Post, 'id', locked)
+        archived += len(locked)
+        if pause:
+            time.sleep(pause)
+    return archived
@@ -0,0 +1,58 @@
+# SDC-Django/sdc_client/login_executor.py
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.db import close_old_connections
+
+
+# --- Verificación de credenciales acotada ---
+#
+# El hashing de contraseñas (Argon2 / PBKDF2) libera el GIL, así que un pool
+# de hilos pequeño verifica en paralelo sin bloquear el event loop de ASGI.
+# Un semáforo limita los logins en curso: si no hay lugar, se rechaza de
+# inmediato (429) en vez de encolar y dejar sin workers al resto del sitio.
+
+class LoginOverloaded(Exception):
+    """No hay capacidad para verificar más credenciales en este momento."""
+
+
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'LOGIN_HASH_WORKERS', 4),
+    thread_name_prefix='sdc-login',
+)
+_slots = threading.BoundedSemaphore(getattr(settings, 'LOGIN_MAX_CONCURRENCY', 8))
+
+
+def _authenticate(request, credentials):
+    # Los hilos del pool no pasan por el ciclo request/response de Django
+    close_old_connections()
+    try:
+        return authenticate(request, **credentials)
+    finally:
+        close_old_connections()
+
+
+def authenticate_bounded(request, **credentials):
+    """authenticate() síncrono (WSGI) con el mismo límite de concurrencia."""
+    if not _slots.acquire(blocking=False):
+        raise LoginOverloaded()
+    try:
+        return authenticate(request, **credentials)
+    finally:
+        _slots.release()
+
+
+async def aauthenticate_bounded(request, **credentials):
+    """authenticate() para vistas async: corre en el pool acotado de login."""
+    if not _slots.acquire(blocking=False):
+        raise LoginOverloaded()
+    try:
+        return await sync_to_async(
+            _authenticate, thread_sensitive=False, executor=_executor
+        )(request, credentials)
+    finally:
+        _slots.release()
@@ -0,0 +1,99 @@
+# SDC-Django/sdc_client/management/commands/bench_db_connections.py
+
+import copy
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.utils import ConnectionHandler
+
+from sdc_client.benchmarks import percentile
+
+
+# Cada modo simula el ciclo de una petición corta (p. ej. api/token/refresh/):
+# una query y luego lo que hace Django al terminar la petición
+# (close_if_unusable_or_obsolete). Así se mide el costo de abrir conexión
+# que pagan las peticiones según la configuración.
+MODES = {
+    'sin_persistencia': {'CONN_MAX_AGE': 0},
+    'persistente': {'CONN_MAX_AGE': 600, 'CONN_HEALTH_CHECKS': True},
+    'pool': {'CONN_MAX_AGE': 0, 'OPTIONS': {'pool': {'min_size': 1, 'max_size': 2}}},
+}
+
+
+def _pool_available(settings_dict):
+    if settings_dict['ENGINE'] != 'django.db.backends.postgresql':
+        return False
+    try:
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide el costo por petición de abrir conexiones a la BBDD: sin persistencia, '
+        'con conexiones persistentes (CONN_MAX_AGE) y con el pool de psycopg.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations', type=int, default=200,
+            help='Peticiones simuladas por modo (default: 200).',
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='Alias de la BBDD a medir (default: "default").',
+        )
+
+    def handle(self, *args, **options):
+        base = connections[options['database']].settings_dict
+        self.stdout.write(f"BBDD: {base['ENGINE']} ({options['iterations']} peticiones por modo)")
+
+        results = {}
+        for mode, overrides in MODES.items():
+            if 'pool' in overrides.get('OPTIONS', {}) and not _pool_available(base):
+                self.stdout.write(f'{mode:>17}: omitido (requiere PostgreSQL y psycopg[pool])')
+                continue
+            results[mode] = self.run_mode(base, overrides, options['iterations'])
+
+        for mode, timings in results.items():
+            self.stdout.write(
+                f'{mode:>17}: media {statistics.mean(timings):.3f} ms, '
+                f'p50 {statistics.median(timings):.3f} ms, '
+                f'p99 {percentile(timings, 99):.3f} ms'
+            )
+
+        if 'sin_persistencia' in results and len(results) > 1:
+            baseline = statistics.mean(results['sin_persistencia'])
+            for mode, timings in results.items():
+                if mode != 'sin_persistencia':
+                    self.stdout.write(self.style.SUCCESS(
+                        f'{mode}: {baseline / statistics.mean(timings):.1f}x más rápido '
+                        'que abrir una conexión por petición'
+                    ))
+
+    def run_mode(self, base, overrides, iterations):
+        settings_dict = copy.deepcopy(base)
+        settings_dict.update(copy.deepcopy(overrides))
+        # Un ConnectionHandler propio para no tocar las conexiones del proceso
+        handler = ConnectionHandler({DEFAULT_DB_ALIAS: settings_dict})
+        connection = handler[DEFAULT_DB_ALIAS]
+
+        timings = []
+        try:
+            for _ in range(iterations):
+                start = time.perf_counter()
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                    cursor.fetchone()
+                # Lo mismo que hace Django al terminar cada petición
+                connection.close_if_unusable_or_obsolete()
+                timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            connection.close()
+            if hasattr(connection, 'close_pool'):
+                connection.close_pool()
+        return timings
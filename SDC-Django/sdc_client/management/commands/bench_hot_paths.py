@@ -0,0 +1,127 @@
+# SDC-Django/sdc_client/management/commands/bench_hot_paths.py
+
+import json
+import os
+import platform
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from sdc_client.benchmarks import (
+    SCENARIOS, BenchmarkError, compare_to_baseline, run_scenarios, seed_dataset,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Siembra un conjunto de datos sintético y mide p50/p99 y throughput de los '
+        'feeds, create_post, register y api_login. Escribe los resultados en JSON '
+        'y los compara con una línea base.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=300, help='Usuarios a sembrar (default: 300).')
+        parser.add_argument('--posts', type=int, default=2000, help='Posts a sembrar (default: 2000).')
+        parser.add_argument(
+            '--transactions', type=int, default=1000,
+            help='Transacciones a sembrar (default: 1000).',
+        )
+        parser.add_argument(
+            '--iterations', type=int, default=50,
+            help='Peticiones medidas por escenario (default: 50).',
+        )
+        parser.add_argument('--warmup', type=int, default=2, help='Peticiones sin medir (default: 2).')
+        parser.add_argument(
+            '--scenario', action='append', choices=list(SCENARIOS), dest='scenarios',
+            help='Escenario a medir (repetible; default: todos).',
+        )
+        parser.add_argument(
+            '--output', default='benchmark-results.json',
+            help='Archivo JSON de resultados (default: benchmark-results.json).',
+        )
+        parser.add_argument(
+            '--baseline', default=None,
+            help='JSON de una corrida anterior con el que comparar.',
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='Empeoramiento tolerado de p50/p99 respecto a la línea base (default: 0.2).',
+        )
+        parser.add_argument(
+            '--fail-on-regression', action='store_true',
+            help='Termina con error si hay regresiones (para CI).',
+        )
+        parser.add_argument(
+            '--current-db', action='store_true',
+            help='Siembra en la BBDD configurada en lugar de una BBDD temporal de pruebas.',
+        )
+
+    def handle(self, *args, **options):
+        if options['current_db']:
+            results = self.run(options)
+        else:
+            # BBDD temporal (como el test runner) para no ensuciar la BBDD local
+            old_name = connection.settings_dict['NAME']
+            connection.creation.create_test_db(verbosity=0, autoclobber=True)
+            try:
+                results = self.run(options)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report = {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'environment': {
+                'database': connection.vendor,
+                'python': platform.python_version(),
+            },
+            'dataset': {
+                'users': options['users'],
+                'posts': options['posts'],
+                'transactions': options['transactions'],
+            },
+            'results': results,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+
+        for name, metrics in results.items():
+            self.stdout.write(
+                f"{name:>17}: p50 {metrics['p50_ms']:.2f} ms, p99 {metrics['p99_ms']:.2f} ms, "
+                f"{metrics['throughput_rps']:.1f} req/s"
+            )
+        self.stdout.write(f"Resultados: {options['output']}")
+
+        if options['baseline']:
+            self.compare(results, options)
+
+    def run(self, options):
+        self.stdout.write(
+            f"Sembrando {options['users']} usuarios, {options['posts']} posts y "
+            f"{options['transactions']} transacciones..."
+        )
+        context = seed_dataset(options['users'], options['posts'], options['transactions'])
+        try:
+            return run_scenarios(
+                context, options['iterations'], options['warmup'], options['scenarios'],
+            )
+        except BenchmarkError as e:
+            raise CommandError(str(e))
+
+    def compare(self, results, options):
+        if not os.path.exists(options['baseline']):
+            raise CommandError(f"No existe la línea base {options['baseline']}.")
+        with open(options['baseline'], encoding='utf-8') as handle:
+            baseline = json.load(handle)['results']
+
+        regressions = compare_to_baseline(results, baseline, options['tolerance'])
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS('Sin regresiones respecto a la línea base.'))
+            return
+
+        for name, metric, current, base in regressions:
+            self.stdout.write(self.style.WARNING(
+                f'Regresión en {name} {metric}: {current:.2f} ms (base {base:.2f} ms)'
+            ))
+        if options['fail_on_regression']:
+            raise CommandError(f'{len(regressions)} regresiones respecto a la línea base.')
@@ -0,0 +1,285 @@
+# SDC-Django/sdc_client/management/commands/import_profiles.py
+
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+from sdc_client.forms import validate_curp, validate_no_numbers, validate_phone, validate_rfc
+from sdc_client.models import CustomUser, Donee, Donor, Institution
+
+
+# Campos requeridos por rol (las columnas extra se ignoran)
+PERSON_FIELDS = ('email', 'phone', 'first_name', 'first_surname', 'second_surname',
+                 'curp', 'city', 'state')
+INSTITUTION_FIELDS = ('email', 'name', 'rfc', 'city', 'state', 'address')
+
+PROFILE_MODELS = {
+    CustomUser.Role.DONEE: Donee,
+    CustomUser.Role.DONOR: Donor,
+    CustomUser.Role.INSTITUTION: Institution,
+}
+
+
+def _init_worker(settings_module):
+    # Con 'spawn' los procesos hijos no heredan la configuración de Django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+
+def _hash_password(password):
+    # make_password(None) genera una contraseña inutilizable (se restablece después)
+    return make_password(password or None)
+
+
+def read_rows(path):
+    """Lee el archivo fila por fila (CSV o JSONL) sin cargarlo completo."""
+    with open(path, encoding='utf-8-sig', newline='') as handle:
+        if path.endswith('.jsonl'):
+            for line_number, line in enumerate(handle, start=1):
+                if line.strip():
+                    try:
+                        yield line_number, json.loads(line)
+                    except json.JSONDecodeError as e:
+                        yield line_number, {'_error': f'JSON inválido: {e}'}
+        else:
+            # La línea 1 es el encabezado
+            for line_number, row in enumerate(csv.DictReader(handle), start=2):
+                yield line_number, row
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def clean_row(row):
+    """Normaliza y valida una fila. Devuelve el dict limpio o lanza ValidationError."""
+    if '_error' in row:
+        raise ValidationError(row['_error'])
+
+    data = {
+        key: str(value).strip() if value is not None else ''
+        for key, value in row.items() if key
+    }
+    role = data.get('role', '').lower()
+    if role not in PROFILE_MODELS:
+        raise ValidationError(f'Rol no válido: "{role}".')
+    data['role'] = role
+
+    is_institution = role == CustomUser.Role.INSTITUTION
+    required = INSTITUTION_FIELDS if is_institution else PERSON_FIELDS
+    missing = [field for field in required if not data.get(field)]
+    if missing:
+        raise ValidationError(f'Campos requeridos vacíos: {", ".join(missing)}.')
+
+    validate_email(data['email'])
+    data['email'] = CustomUser.objects.normalize_email(data['email'])
+
+    if is_institution:
+        validate_rfc(data['rfc'])
+        data['rfc'] = data['rfc'].upper()
+        # Igual que register(): el RFC funciona como teléfono temporal
+        data['phone'] = data['rfc']
+    else:
+        validate_phone(data['phone'])
+        validate_curp(data['curp'])
+        data['curp'] = data['curp'].upper()
+        for field in ('first_name', 'middle_name', 'first_surname', 'second_surname'):
+            if data.get(field):
+                validate_no_numbers(data[field])
+
+    return data
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa Donatarios, Donadores e Instituciones desde un archivo CSV o JSONL '
+        '(columna "role": donee/donor/institution) y escribe un reporte de errores por fila.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Archivo .csv o .jsonl a importar.')
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Filas por lote/transacción (default: 500).',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='Procesos para el hashing de contraseñas (default: núm. de CPUs).',
+        )
+        parser.add_argument(
+            '--report', default=None,
+            help='Ruta del reporte de errores (default: <archivo>.errors.csv).',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'No existe el archivo {path}.')
+
+        report_path = options['report'] or f'{path}.errors.csv'
+        created, failed = 0, 0
+
+        with open(report_path, 'w', encoding='utf-8', newline='') as report_file, \
+                ProcessPoolExecutor(
+                    max_workers=options['workers'],
+                    initializer=_init_worker,
+                    initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'sdc.settings'),),
+                ) as executor:
+            report = csv.writer(report_file)
+            report.writerow(['line', 'email', 'error'])
+
+            for chunk in chunked(read_rows(path), options['batch_size']):
+                valid, errors = self.validate_chunk(chunk)
+                chunk_created, import_errors = self.import_chunk(valid, executor)
+                created += chunk_created
+                errors += import_errors
+
+                for line_number, email, message in errors:
+                    report.writerow([line_number, email, message])
+                failed += len(errors)
+                self.stdout.write(f'{created} creados, {failed} con error...')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Importación terminada: {created} creados, {failed} con error. '
+            f'Reporte: {report_path}'
+        ))
+
+    def validate_chunk(self, chunk):
+        """
+        Valida formato y unicidad de un lote. La unicidad se revisa contra el
+        propio lote y contra la BBDD con una query por campo (no una por fila).
+        """
+        valid, errors = [], []
+        for line_number, row in chunk:
+            try:
+                valid.append((line_number, clean_row(row)))
+            except ValidationError as e:
+                errors.append((line_number, (row.get('email') or ''), ' '.join(e.messages)))
+
+        taken = {
+            'email': set(CustomUser.objects.filter(
+                email__in=[data['email'] for _, data in valid]
+            ).values_list('email', flat=True)),
+            'phone': set(CustomUser.objects.filter(
+                phone__in=[data['phone'] for _, data in valid]
+            ).values_list('phone', flat=True)),
+        }
+        curps = [data['curp'] for _, data in valid if data.get('curp')]
+        taken['curp'] = (
+            set(Donee.objects.filter(curp__in=curps).values_list('curp', flat=True))
+            | set(Donor.objects.filter(curp__in=curps).values_list('curp', flat=True))
+        )
+        institutions = [data for _, data in valid if data['role'] == CustomUser.Role.INSTITUTION]
+        taken['rfc'] = set(Institution.objects.filter(
+            rfc__in=[data['rfc'] for data in institutions]
+        ).values_list('rfc', flat=True))
+        taken['name'] = set(Institution.objects.filter(
+            name__in=[data['name'] for data in institutions]
+        ).values_list('name', flat=True))
+
+        unique_rows = []
+        for line_number, data in valid:
+            fields = ['email', 'phone']
+            if data['role'] == CustomUser.Role.INSTITUTION:
+                fields += ['rfc', 'name']
+            else:
+                fields.append('curp')
+
+            duplicated = [field for field in fields if data[field] in taken[field]]
+            if duplicated:
+                errors.append((
+                    line_number, data['email'],
+                    f'Ya registrado: {", ".join(duplicated)}.',
+                ))
+                continue
+
+            # Reservar los valores para detectar duplicados dentro del archivo
+            for field in fields:
+                taken[field].add(data[field])
+            unique_rows.append((line_number, data))
+
+        return unique_rows, errors
+
+    def import_chunk(self, rows, executor):
+        """
+        Crea usuarios y perfiles del lote en una sola transacción.
+        Devuelve (creados, errores del lote).
+        """
+        if not rows:
+            return 0, []
+
+        hashes = executor.map(
+            _hash_password,
+            [data.get('password', '') for _, data in rows],
+            chunksize=max(1, len(rows) // 16),
+        )
+        pending = list(zip(rows, hashes))
+
+        try:
+            self.insert_rows(pending)
+        except IntegrityError:
+            # Un registro concurrente ganó la carrera: se reintenta fila por
+            # fila para reportar sólo las que chocan
+            errors = []
+            for (line_number, data), password_hash in pending:
+                try:
+                    self.insert_rows([((line_number, data), password_hash)])
+                except IntegrityError as e:
+                    errors.append((line_number, data['email'], f'Ya registrado: {e}'))
+            return len(pending) - len(errors), errors
+
+        return len(pending), []
+
+    def insert_rows(self, pending):
+        """Inserta [((línea, datos), hash)] en una transacción (todo o nada)."""
+        users = [
+            CustomUser(
+                email=data['email'],
+                phone=data['phone'],
+                password=password_hash,
+                status_id=1,
+                # bulk_create no dispara las señales que sincronizan el rol
+                role=data['role'],
+            )
+            for (_, data), password_hash in pending
+        ]
+        with transaction.atomic():
+            CustomUser.objects.bulk_create(users)
+            profiles = {model: [] for model in PROFILE_MODELS.values()}
+            for ((_, data), _), user in zip(pending, users):
+                model = PROFILE_MODELS[data['role']]
+                profiles[model].append(self.build_profile(model, data, user))
+            for model, objects in profiles.items():
+                model.objects.bulk_create(objects)
+
+    def build_profile(self, model, data, user):
+        if model is Institution:
+            return Institution(
+                user=user,
+                name=data['name'],
+                rfc=data['rfc'],
+                city=data['city'],
+                state=data['state'],
+                address=data['address'],
+            )
+        return model(
+            user=user,
+            first_name=data['first_name'],
+            middle_name=data.get('middle_name') or None,
+            first_surname=data['first_surname'],
+            second_surname=data['second_surname'],
+            curp=data['curp'],
+            city=data['city'],
+            state=data['state'],
+        )
@@ -0,0 +1,53 @@
+# SDC-Django/sdc_client/management/commands/post_lifecycle.py
+
+from django.core.management.base import BaseCommand
+
+from sdc_client.lifecycle import (
+    archivable_posts, archive_closed_posts, expire_stale_posts, stale_posts,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Cierra las publicaciones ACTIVAS abandonadas y archiva las cerradas '
+        'antiguas, por lotes. Pensado para correr a diario (cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stale-days', type=int, default=None,
+            help='Días sin cambios para cerrar un post ACTIVO (default: settings.POST_STALE_DAYS).',
+        )
+        parser.add_argument(
+            '--retention-days', type=int, default=None,
+            help='Días sin cambios para archivar un post cerrado (default: settings.POST_ARCHIVE_DAYS).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Posts por transacción (default: settings.POST_LIFECYCLE_BATCH_SIZE).',
+        )
+        parser.add_argument(
+            '--pause', type=float, default=0,
+            help='Segundos de espera entre lotes para no saturar la BBDD.',
+        )
+        parser.add_argument('--skip-expire', action='store_true', help='No cierra posts abandonados.')
+        parser.add_argument('--skip-archive', action='store_true', help='No archiva posts cerrados.')
+        parser.add_argument(
+            '--dry-run', action='store_true', help='Sólo cuenta los posts afectados.',
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            self.stdout.write(
+                f"Por cerrar: {stale_posts(options['stale_days']).count()}, "
+                f"por archivar: {archivable_posts(options['retention_days']).count()}."
+            )
+            return
+
+        batch = {'batch_size': options['batch_size'], 'pause': options['pause']}
+        if not options['skip_expire']:
+            expired = expire_stale_posts(options['stale_days'], **batch)
+            self.stdout.write(self.style.SUCCESS(f'{expired} publicaciones abandonadas cerradas.'))
+        if not options['skip_archive']:
+            archived = archive_closed_posts(options['retention_days'], **batch)
+            self.stdout.write(self.style.SUCCESS(f'{archived} publicaciones archivadas.'))
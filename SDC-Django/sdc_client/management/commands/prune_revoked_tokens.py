@@ -0,0 +1,16 @@
+# SDC-Django/sdc_client/management/commands/prune_revoked_tokens.py
+
+from django.core.management.base import BaseCommand
+
+from sdc_client.token_revocation import prune
+
+
+class Command(BaseCommand):
+    help = (
+        'Borra las revocaciones de refresh tokens ya vencidos. La rotación '
+        'también lo hace sola cada TOKEN_REVOCATION_PRUNE_INTERVAL segundos.'
+    )
+
+    def handle(self, *args, **options):
+        deleted = prune()
+        self.stdout.write(self.style.SUCCESS(f'{deleted} revocaciones vencidas borradas.'))
@@ -0,0 +1,53 @@
+# SDC-Django/sdc_client/management/commands/rebuild_matches.py
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from sdc_client.matching import OPEN_STATUSES, update_matches_for
+from sdc_client.models import Post, PostMatch
+
+
+class Command(BaseCommand):
+    help = 'Recalcula la tabla de coincidencias (PostMatch) por lotes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Publicaciones procesadas por lote (default: 500).',
+        )
+        parser.add_argument(
+            '--clear', action='store_true',
+            help='Borra todas las coincidencias antes de recalcular.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        if options['clear']:
+            PostMatch.objects.all().delete()
+        else:
+            PostMatch.objects.filter(
+                ~Q(request__status__in=OPEN_STATUSES) | ~Q(offer__status__in=OPEN_STATUSES)
+            ).delete()
+
+        # Cada post abierto, solicitud u oferta, calcula sus pares igual que al
+        # guardarse: así el resultado coincide con el cálculo incremental.
+        # Se recorre por pk para no cargar toda la tabla ni usar OFFSET.
+        posts = Post.objects.filter(status__in=OPEN_STATUSES).order_by('pk')
+
+        last_pk, processed = 0, 0
+        while True:
+            batch = list(posts.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            with transaction.atomic():
+                for post in batch:
+                    update_matches_for(post)
+            last_pk = batch[-1].pk
+            processed += len(batch)
+            self.stdout.write(f'{processed} publicaciones procesadas...')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Coincidencias recalculadas para {processed} publicaciones.'
+        ))
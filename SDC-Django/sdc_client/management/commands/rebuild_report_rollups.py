@@ -0,0 +1,19 @@
+# SDC-Django/sdc_client/management/commands/rebuild_report_rollups.py
+
+from django.core.management.base import BaseCommand
+
+from sdc_client.reports import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula los rollups de reportes (PostDailyStats y TransactionDailyStats) '
+        'desde Post y Transaction. Usar tras cargas o cambios masivos.'
+    )
+
+    def handle(self, *args, **options):
+        post_rows, transaction_rows = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rollups recalculados: {post_rows} filas de publicaciones, '
+            f'{transaction_rows} de transacciones.'
+        ))
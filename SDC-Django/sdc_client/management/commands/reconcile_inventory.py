@@ -0,0 +1,38 @@
+# SDC-Django/sdc_client/management/commands/reconcile_inventory.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from sdc_client.inventory import reconcile
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara la existencia materializada (WarehouseStock) con la suma del '
+        'libro de movimientos (StockMovement). Pensado para correr periódicamente (cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix', action='store_true',
+            help='Corrige las existencias al valor del libro de movimientos.',
+        )
+        parser.add_argument(
+            '--fail-on-mismatch', action='store_true',
+            help='Termina con error si hay diferencias (útil para alertas).',
+        )
+
+    def handle(self, *args, **options):
+        mismatches = reconcile(fix=options['fix'])
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS('Inventario conciliado: sin diferencias.'))
+            return
+
+        for warehouse_id, category_id, stock, ledger in mismatches:
+            self.stdout.write(self.style.WARNING(
+                f'Almacén {warehouse_id}, categoría {category_id}: '
+                f'existencia {stock}, libro {ledger}.'
+            ))
+        if options['fix']:
+            self.stdout.write(self.style.SUCCESS(f'{len(mismatches)} existencias corregidas.'))
+        elif options['fail_on_mismatch']:
+            raise CommandError(f'{len(mismatches)} existencias no coinciden con el libro.')
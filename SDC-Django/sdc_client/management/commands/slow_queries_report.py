@@ -0,0 +1,93 @@
+# SDC-Django/sdc_client/management/commands/slow_queries_report.py
+
+import os
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from sdc_client.slow_queries import read_log
+
+
+ORDERINGS = {
+    'total': lambda group: group['total_ms'],
+    'count': lambda group: group['count'],
+    'max': lambda group: group['max_ms'],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Resume el log de queries lentas agrupando por huella (SQL normalizado): '
+        'veces, tiempo total/máximo, vistas de origen y el último plan EXPLAIN.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--log', default=None,
+            help='Archivo JSONL a leer (default: settings.SLOW_QUERY_LOG).',
+        )
+        parser.add_argument('--top', type=int, default=10, help='Huellas a mostrar (default: 10).')
+        parser.add_argument(
+            '--order', choices=list(ORDERINGS), default='total',
+            help='Orden: tiempo total, número de veces o máximo (default: total).',
+        )
+        parser.add_argument(
+            '--since-hours', type=float, default=None,
+            help='Sólo registros de las últimas N horas.',
+        )
+        parser.add_argument('--plans', action='store_true', help='Incluye el último plan de cada huella.')
+
+    def handle(self, *args, **options):
+        path = options['log'] or getattr(settings, 'SLOW_QUERY_LOG', None)
+        if not path or not os.path.exists(path):
+            raise CommandError(f'No existe el log de queries lentas {path}.')
+
+        since = None
+        if options['since_hours'] is not None:
+            since = datetime.now(timezone.utc) - timedelta(hours=options['since_hours'])
+
+        groups = {}
+        for record in read_log(path):
+            if since is not None and datetime.fromisoformat(record['time']) < since:
+                continue
+            group = groups.setdefault(record['fingerprint'], {
+                'normalized': record['normalized'],
+                'count': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'views': Counter(),
+                'frames': Counter(),
+                'plan': None,
+            })
+            group['count'] += 1
+            group['total_ms'] += record['duration_ms']
+            group['max_ms'] = max(group['max_ms'], record['duration_ms'])
+            group['views'][record.get('view') or '-'] += 1
+            if record.get('frame'):
+                group['frames'][record['frame']] += 1
+            if record.get('plan'):
+                group['plan'] = record['plan']
+
+        if not groups:
+            self.stdout.write('No hay queries lentas registradas.')
+            return
+
+        ranked = sorted(groups.items(), key=lambda item: ORDERINGS[options['order']](item[1]), reverse=True)
+        for position, (key, group) in enumerate(ranked[:options['top']], start=1):
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{position}. [{key}] {group['count']} veces, total {group['total_ms']:.1f} ms, "
+                f"media {group['total_ms'] / group['count']:.1f} ms, máx {group['max_ms']:.1f} ms"
+            ))
+            self.stdout.write(f"   {group['normalized'][:500]}")
+            views = ', '.join(f'{view} ({count})' for view, count in group['views'].most_common(3))
+            self.stdout.write(f'   Vistas: {views}')
+            if group['frames']:
+                self.stdout.write(f"   Origen: {group['frames'].most_common(1)[0][0]}")
+            if options['plans'] and group['plan']:
+                self.stdout.write('   Plan:')
+                for line in group['plan'].splitlines():
+                    self.stdout.write(f'     {line}')
+
+        self.stdout.write(f'{len(groups)} huellas distintas en {path}.')
@@ -0,0 +1,195 @@
+# SDC-Django/sdc_client/matching.py
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Donee, Donor, Institution, Post, PostMatch
+
+
+# --- Motor de coincidencias Solicitud <-> Oferta ---
+#
+# Cada vez que se guarda un Post se recalculan sólo sus coincidencias
+# (upsert en PostMatch), de modo que "mejores coincidencias" es una búsqueda
+# por índice y nadie tiene que recorrer los feeds completos.
+#
+# Puntaje (0-100):
+#   40  misma categoría (requisito para ser candidato)
+#   20  mismo estado del autor
+#   20  misma ciudad del autor (además del estado)
+#   20  ajuste de cantidad: min(restantes) / max(restantes)
+#
+# Candidatos: los MATCH_CANDIDATE_LIMIT más recientes de la categoría y los
+# MATCH_CANDIDATE_LIMIT más recientes de autores del mismo estado (ambos por
+# índice: post_category_type_created_idx y el de 'state' de los perfiles).
+# Se puntúan en Python y se guardan los MATCH_CANDIDATE_LIMIT mejores, así
+# que un par de la misma ciudad no se pierde por ser más antiguo que las
+# últimas publicaciones, sin recorrer toda la categoría.
+# Un par sólo se borra cuando deja de ser válido (cerrado, otra categoría),
+# no por quedar fuera de los mejores de un lado: el resultado no depende del
+# orden en que se guardaron los posts.
+# Un compromiso sólo cambia quantity_committed/status: ahí basta con
+# recalcular el puntaje de los pares existentes (rescore_matches_for).
+
+OPEN_STATUSES = (Post.PostStatus.ACTIVE, Post.PostStatus.IN_PROGRESS)
+
+# Relaciones inversas de perfil, para traer la ubicación del autor en el JOIN
+PROFILE_RELATIONS = ('author__donee', 'author__donor', 'author__institution')
+
+
+def _candidate_limit():
+    return getattr(settings, 'MATCH_CANDIDATE_LIMIT', 200)
+
+
+def _author_location(post):
+    """(ciudad, estado) del perfil del autor, según su rol."""
+    role = post.author.role
+    if not role:
+        return None, None
+    profile = getattr(post.author, role)
+    return profile.city.strip().lower(), profile.state.strip().lower()
+
+
+def score_pair(request, offer):
+    score = 40
+
+    request_city, request_state = _author_location(request)
+    offer_city, offer_state = _author_location(offer)
+    if request_state and request_state == offer_state:
+        score += 20
+        if request_city == offer_city:
+            score += 20
+
+    needed = request.remaining_quantity
+    available = offer.remaining_quantity
+    if needed > 0 and available > 0:
+        score += int(20 * min(needed, available) / max(needed, available))
+
+    return score
+
+
+def _author_state(post):
+    """Estado del perfil del autor tal como está guardado (para el índice)."""
+    role = post.author.role
+    return getattr(post.author, role).state if role else None
+
+
+def _same_state(state):
+    return (
+        Q(author_id__in=Donee.objects.filter(state=state).values('user_id'))
+        | Q(author_id__in=Donor.objects.filter(state=state).values('user_id'))
+        | Q(author_id__in=Institution.objects.filter(state=state).values('user_id'))
+    )
+
+
+def _counterpart_type(post):
+    if post.post_type == Post.PostType.REQUEST:
+        return Post.PostType.OFFER
+    return Post.PostType.REQUEST
+
+
+def update_matches_for(post):
+    """
+    Recalcula las coincidencias de un post: inserta/actualiza los pares con
+    los candidatos actuales y borra los que ya no aplican.
+    """
+    is_request = post.post_type == Post.PostType.REQUEST
+    side, other = ('request', 'offer') if is_request else ('offer', 'request')
+
+    if post.status not in OPEN_STATUSES:
+        PostMatch.objects.filter(request=post).delete()
+        PostMatch.objects.filter(offer=post).delete()
+        return
+
+    post = Post.objects.select_related(*PROFILE_RELATIONS).get(pk=post.pk)
+    valid = (
+        Post.objects.filter(
+            category_id=post.category_id,
+            post_type=_counterpart_type(post),
+            status__in=OPEN_STATUSES,
+        )
+        .exclude(author_id=post.author_id)
+    )
+    limit = _candidate_limit()
+    prefilter = [valid.order_by('-created_at').values_list('pk', flat=True)[:limit]]
+    state = _author_state(post)
+    if state:
+        prefilter.append(
+            valid.filter(_same_state(state)).order_by('-created_at').values_list('pk', flat=True)[:limit]
+        )
+    candidate_ids = {pk for ids in prefilter for pk in ids}
+
+    def pair(candidate):
+        request, offer = (post, candidate) if is_request else (candidate, post)
+        return PostMatch(request=request, offer=offer, score=score_pair(request, offer))
+
+    ranked = sorted(
+        (pair(candidate) for candidate in
+         valid.filter(pk__in=candidate_ids).select_related(*PROFILE_RELATIONS)),
+        key=lambda match: (match.score, getattr(match, other).created_at),
+        reverse=True,
+    )[:limit]
+    # Más los pares ya existentes que siguen siendo válidos (insertados desde
+    # el otro lado) para actualizar su puntaje
+    existing = set(
+        PostMatch.objects.filter(**{side: post}).values_list(f'{other}_id', flat=True)
+    ) - {getattr(match, f'{other}_id') for match in ranked}
+    matches = ranked + [
+        pair(candidate)
+        for candidate in valid.filter(pk__in=existing).select_related(*PROFILE_RELATIONS)
+    ]
+
+    with transaction.atomic():
+        # Por si el post cambió de tipo (sólo instituciones pueden elegirlo)
+        PostMatch.objects.filter(**{other: post}).delete()
+        PostMatch.objects.filter(**{side: post}).exclude(
+            **{f'{other}__in': valid}
+        ).delete()
+        PostMatch.objects.bulk_create(
+            matches,
+            update_conflicts=True,
+            unique_fields=['request', 'offer'],
+            update_fields=['score', 'updated_at'],
+        )
+
+
+def rescore_matches_for(post):
+    """
+    Tras un compromiso (sólo cambian quantity_committed/status): actualiza
+    el puntaje de los pares existentes del post, sin buscar candidatos.
+    """
+    if post.status not in OPEN_STATUSES:
+        PostMatch.objects.filter(Q(request=post) | Q(offer=post)).delete()
+        return
+
+    matches = list(
+        PostMatch.objects.filter(Q(request=post) | Q(offer=post)).select_related(
+            *(f'request__{relation}' for relation in PROFILE_RELATIONS),
+            *(f'offer__{relation}' for relation in PROFILE_RELATIONS),
+        )
+    )
+    now = timezone.now()
+    for match in matches:
+        match.score = score_pair(match.request, match.offer)
+        match.updated_at = now
+    PostMatch.objects.bulk_update(matches, ['score', 'updated_at'])
+
+
+def best_matches(post, limit=20):
+    """Mejores coincidencias de un post (búsqueda por índice sobre PostMatch)."""
+    if post.post_type == Post.PostType.REQUEST:
+        queryset = PostMatch.objects.filter(request=post).select_related(
+            'offer__author', 'offer__category'
+        )
+        related = 'offer'
+    else:
+        queryset = PostMatch.objects.filter(offer=post).select_related(
+            'request__author', 'request__category'
+        )
+        related = 'request'
+
+    return [
+        (getattr(match, related), match.score)
+        for match in queryset.order_by('-score', '-updated_at')[:limit]
+    ]
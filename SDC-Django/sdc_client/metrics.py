@@ -0,0 +1,204 @@
+# SDC-Django/sdc_client/metrics.py
+
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+# --- Métricas por petición (Server-Timing + histogramas Prometheus) ---
+#
+# RequestTimingMiddleware abre un RequestTimings por petición en un
+# ContextVar; el execute_wrapper de cada conexión (ver signals.py) y el
+# backend de plantillas (template_backends.py) le suman tiempo. Al terminar,
+# la petición se agrega a histogramas en memoria del proceso.
+#
+# Con varios workers, cada proceso vuelca su copia a un archivo JSON en
+# METRICS_DIR cada METRICS_FLUSH_INTERVAL segundos y /metrics suma todos los
+# archivos, así que cualquier worker responde con el total. Sin METRICS_DIR
+# cada proceso sólo reporta lo suyo.
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+HISTOGRAMS = {
+    'sdc_request_duration_seconds': ('Latencia total de la petición por vista.', DURATION_BUCKETS),
+    'sdc_request_db_seconds': ('Tiempo en la BBDD por petición.', DURATION_BUCKETS),
+    'sdc_request_template_seconds': ('Tiempo de render de plantillas por petición.', DURATION_BUCKETS),
+    'sdc_request_queries': ('Queries SQL por petición.', QUERY_BUCKETS),
+}
+
+
+class RequestTimings:
+    __slots__ = ('request', 'queries', 'db_time', 'template_time')
+
+    def __init__(self, request=None):
+        self.request = request
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+
+
+_current = ContextVar('sdc_request_timings', default=None)
+
+
+def start_request(request=None):
+    """Abre las mediciones de una petición. Devuelve (timings, token)."""
+    timings = RequestTimings(request)
+    return timings, _current.set(timings)
+
+
+def current_request():
+    """La petición en curso en este contexto (o None fuera de una petición)."""
+    timings = _current.get()
+    return timings.request if timings is not None else None
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    """execute_wrapper: mide las queries que ocurren dentro de una petición."""
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.db_time += time.perf_counter() - start
+
+
+def record_template(duration):
+    timings = _current.get()
+    if timings is not None:
+        timings.template_time += duration
+
+
+# --- Histogramas del proceso ---
+
+class _ProcessStore:
+    """
+    Histogramas de este proceso: {métrica: {vista: [conteos..., +Inf, suma]}}.
+    Los conteos no son acumulados; render_prometheus los acumula al exportar.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        # También se llama tras un fork: el hijo no debe reportar lo del padre
+        self.pid = os.getpid()
+        self.ident = f'{self.pid}-{uuid.uuid4().hex[:8]}'
+        self.data = {name: {} for name in HISTOGRAMS}
+        self.last_flush = time.monotonic()
+
+    def check_fork(self):
+        if self.pid != os.getpid():
+            self.reset()
+
+    def observe(self, name, view, value):
+        buckets = HISTOGRAMS[name][1]
+        series = self.data[name].get(view)
+        if series is None:
+            series = self.data[name][view] = [0] * (len(buckets) + 1) + [0.0]
+        series[bisect_left(buckets, value)] += 1
+        series[-1] += value
+
+
+_store = _ProcessStore()
+
+
+def observe_request(view, duration, timings):
+    with _store.lock:
+        _store.check_fork()
+        _store.observe('sdc_request_duration_seconds', view, duration)
+        _store.observe('sdc_request_db_seconds', view, timings.db_time)
+        _store.observe('sdc_request_template_seconds', view, timings.template_time)
+        _store.observe('sdc_request_queries', view, timings.queries)
+        due = time.monotonic() - _store.last_flush >= getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)
+    if due:
+        flush()
+
+
+def _snapshot():
+    with _store.lock:
+        _store.check_fork()
+        _store.last_flush = time.monotonic()
+        data = {
+            name: {view: list(series) for view, series in views.items()}
+            for name, views in _store.data.items()
+        }
+        return _store.ident, data
+
+
+def flush():
+    """Vuelca los histogramas del proceso a METRICS_DIR (si está configurado)."""
+    directory = getattr(settings, 'METRICS_DIR', None)
+    ident, data = _snapshot()
+    if not directory:
+        return data
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'sdc-{ident}.json')
+    # Escritura atómica: quien lea nunca ve un archivo a medias
+    tmp_path = f'{path}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as handle:
+        json.dump(data, handle)
+    os.replace(tmp_path, path)
+    return data
+
+
+def collect():
+    """Histogramas sumados de todos los procesos que escriben en METRICS_DIR."""
+    own = flush()
+    directory = getattr(settings, 'METRICS_DIR', None)
+    if not directory:
+        return own
+
+    merged = {name: {} for name in HISTOGRAMS}
+    for path in glob.glob(os.path.join(directory, 'sdc-*.json')):
+        try:
+            with open(path, encoding='utf-8') as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            continue
+        for name, views in data.items():
+            if name not in merged:
+                continue
+            for view, series in views.items():
+                total = merged[name].setdefault(view, [0] * len(series))
+                for i, value in enumerate(series):
+                    total[i] += value
+    return merged
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus(data):
+    """Formato de texto de Prometheus (version 0.0.4)."""
+    lines = []
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for view, series in sorted(data.get(name, {}).items()):
+            label = f'view="{_escape(view)}"'
+            cumulative = 0
+            for bound, count in zip(buckets, series):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{label},le="{bound}"}} {cumulative}')
+            cumulative += series[len(buckets)]
+            lines.append(f'{name}_bucket{{{label},le="+Inf"}} {cumulative}')
+            lines.append(f'{name}_sum{{{label}}} {series[-1]}')
+            lines.append(f'{name}_count{{{label}}} {cumulative}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,104 @@
+# SDC-Django/sdc_client/middleware.py
+
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.urls import reverse
+
+from . import metrics
+
+
+# --- Medición por petición ---
+
+class RequestTimingMiddleware:
+    """
+    Mide latencia total, queries, tiempo de BBDD y de plantillas de cada
+    petición. Los agrega a los histogramas de /metrics y, si
+    REQUEST_TIMING_HEADER está activo, los envía en 'Server-Timing'.
+    Debe ir primero en MIDDLEWARE para incluir al resto de middleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        start = time.perf_counter()
+        timings, token = metrics.start_request(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        return self.finish(request, response, timings, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        timings, token = metrics.start_request(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        return self.finish(request, response, timings, time.perf_counter() - start)
+
+    def finish(self, request, response, timings, duration):
+        # Etiqueta por nombre de ruta: cardinalidad acotada (no por URL)
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name if match else '') or '<unresolved>'
+        if match is None and request.path.startswith(settings.STATIC_URL):
+            # Servido por WhiteNoise antes de resolver la URL
+            view = '<static>'
+        metrics.observe_request(view, duration, timings)
+
+        if getattr(settings, 'REQUEST_TIMING_HEADER', False):
+            response['Server-Timing'] = (
+                f'db;dur={timings.db_time * 1000:.1f};desc="{timings.queries} queries", '
+                f'tpl;dur={timings.template_time * 1000:.1f}, '
+                f'total;dur={duration * 1000:.1f}'
+            )
+        return response
+
+
+# --- Sesiones: modo API sin estado (API_STATELESS) ---
+
+# Rutas de API que sí pueden abrir sesión: el login de la página web
+SESSION_API_VIEWS = ('api_login', 'api_login_async')
+
+
+class StatelessAPISessionMiddleware(SessionMiddleware):
+    """
+    SessionMiddleware que, con API_STATELESS=True, no lee ni escribe la
+    sesión en las rutas api/ (se autentican con JWT): request.session es
+    una sesión vacía que nunca toca la BBDD ni envía cookie. Sin el modo
+    sin estado se comporta igual que SessionMiddleware.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        # Se resuelven una vez al cargar el middleware, no en cada petición
+        self.session_paths = frozenset(reverse(name) for name in SESSION_API_VIEWS)
+
+    def is_stateless(self, request):
+        if not getattr(settings, 'API_STATELESS', False):
+            return False
+        path = request.path_info
+        return path.startswith('/api/') and path not in self.session_paths
+
+    def process_request(self, request):
+        if self.is_stateless(request):
+            request.session = self.SessionStore(None)
+            request.stateless_session = True
+            return
+        super().process_request(request)
+
+    def process_response(self, request, response):
+        if getattr(request, 'stateless_session', False):
+            return response
+        return super().process_response(request, response)
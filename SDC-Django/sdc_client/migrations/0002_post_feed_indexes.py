@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sdc_client', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('status', 'ACTIVE')), fields=['post_type', '-created_at', '-id'], name='post_active_type_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('status', 'ACTIVE')), fields=['-created_at', '-id'], name='post_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', 'post_type', '-created_at', '-id'], name='post_author_type_created_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:34
+
+from django.db import migrations, models
+
+
+def backfill_roles(apps, schema_editor):
+    """Asigna el rol a los usuarios que ya tenían perfil."""
+    CustomUser = apps.get_model('sdc_client', 'CustomUser')
+    # El nombre del rol coincide con el de la relación inversa del perfil
+    for role in ('donee', 'donor', 'institution'):
+        CustomUser.objects.filter(**{f'{role}__isnull': False}).update(role=role)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sdc_client', '0002_post_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='role',
+            field=models.CharField(blank=True, choices=[('donee', 'Donatario'), ('donor', 'Donador'), ('institution', 'Institución')], default='', max_length=20),
+        ),
+        migrations.RunPython(backfill_roles, migrations.RunPython.noop),
+    ]
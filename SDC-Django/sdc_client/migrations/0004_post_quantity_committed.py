@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:36
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_quantity_committed(apps, schema_editor):
+    """Calcula por única vez la cantidad comprometida de los posts existentes."""
+    Post = apps.get_model('sdc_client', 'Post')
+    Transaction = apps.get_model('sdc_client', 'Transaction')
+    totals = (
+        Transaction.objects.exclude(status='REJECTED')
+        .values('post_id')
+        .annotate(total=Sum('quantity_committed'))
+    )
+    for row in totals.iterator():
+        Post.objects.filter(pk=row['post_id']).update(quantity_committed=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sdc_client', '0003_customuser_role'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='quantity_committed',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.RunPython(backfill_quantity_committed, migrations.RunPython.noop),
+    ]
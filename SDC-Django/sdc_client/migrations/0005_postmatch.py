@@ -0,0 +1,48 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sdc_client', '0004_post_quantity_committed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveSmallIntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['category', 'post_type', '-created_at'], name='post_category_type_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='postmatch',
+            name='offer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='request_matches', to='sdc_client.post'),
+        ),
+        migrations.AddField(
+            model_name='postmatch',
+            name='request',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offer_matches', to='sdc_client.post'),
+        ),
+        migrations.AddIndex(
+            model_name='postmatch',
+            index=models.Index(fields=['request', '-score'], name='match_request_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postmatch',
+            index=models.Index(fields=['offer', '-score'], name='match_offer_score_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='postmatch',
+            constraint=models.UniqueConstraint(fields=('request', 'offer'), name='unique_post_match'),
+        ),
+    ]
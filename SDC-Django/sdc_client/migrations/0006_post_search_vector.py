@@ -0,0 +1,62 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:38
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# El trigger y el índice GIN sólo existen en PostgreSQL; en SQLite (pruebas
+# locales) la columna queda vacía y search.py usa la búsqueda de respaldo.
+
+CREATE_SEARCH_SQL = """
+CREATE FUNCTION sdc_post_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('spanish', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('spanish', coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER sdc_post_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description ON sdc_client_post
+    FOR EACH ROW EXECUTE FUNCTION sdc_post_search_vector_update();
+
+UPDATE sdc_client_post SET
+    search_vector =
+        setweight(to_tsvector('spanish', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('spanish', coalesce(description, '')), 'B');
+
+CREATE INDEX post_search_vector_gin ON sdc_client_post USING gin (search_vector);
+"""
+
+DROP_SEARCH_SQL = """
+DROP INDEX IF EXISTS post_search_vector_gin;
+DROP TRIGGER IF EXISTS sdc_post_search_vector_trigger ON sdc_client_post;
+DROP FUNCTION IF EXISTS sdc_post_search_vector_update();
+"""
+
+
+def create_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_SEARCH_SQL)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SEARCH_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sdc_client', '0005_postmatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def _state_of(prefix):
+    return Coalesce(
+        f'{prefix}donee__state', f'{prefix}donor__state', f'{prefix}institution__state',
+        Value(''),
+    )
+
+
+def backfill_rollups(apps, schema_editor):
+    """Carga inicial de los rollups (igual que reports.rebuild_rollups)."""
+    Post = apps.get_model('sdc_client', 'Post')
+    Transaction = apps.get_model('sdc_client', 'Transaction')
+    PostDailyStats = apps.get_model('sdc_client', 'PostDailyStats')
+    TransactionDailyStats = apps.get_model('sdc_client', 'TransactionDailyStats')
+
+    post_rows = (
+        Post.objects
+        .annotate(day=TruncDate('created_at'), state=_state_of('author__'))
+        .values('day', 'category_id', 'state', 'post_type', 'status')
+        .annotate(n=Count('id'), total=Sum('quantity'), committed=Sum('quantity_committed'))
+        .order_by()
+    )
+    PostDailyStats.objects.bulk_create((
+        PostDailyStats(
+            day=row['day'], category_id=row['category_id'], state=row['state'],
+            post_type=row['post_type'], status=row['status'], posts=row['n'],
+            quantity=row['total'], quantity_committed=row['committed'],
+        )
+        for row in post_rows.iterator()
+    ), batch_size=1000)
+
+    transaction_rows = (
+        Transaction.objects
+        .annotate(
+            day=TruncDate('created_at'), category=F('post__category_id'),
+            kind=F('post__post_type'), state=_state_of('post__author__'),
+        )
+        .values('day', 'category', 'state', 'kind', 'status')
+        .annotate(n=Count('id'), committed=Sum('quantity_committed'))
+        .order_by()
+    )
+    TransactionDailyStats.objects.bulk_create((
+        TransactionDailyStats(
+            day=row['day'], category_id=row['category'], state=row['state'],
+            post_type=row['kind'], status=row['status'], transactions=row['n'],
+            quantity_committed=row['committed'],
+        )
+        for row in transaction_rows.iterator()
+    ), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sdc_client', '0006_post_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('state', models.CharField(max_length=255)),
+                ('post_type', models.CharField(choices=[('REQUEST', 'Solicitud'), ('OFFER', 'Oferta')], max_length=10)),
+                ('status', models.CharField(choices=[('ACTIVE', 'Activa'), ('IN_PROGRESS', 'En Progreso'), ('COMPLETED', 'Completada'), ('CANCELLED', 'Cancelada')], max_length=20)),
+                ('posts', models.IntegerField(default=0)),
+                ('quantity', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('quantity_committed', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='sdc_client.category')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'category', 'state', 'post_type', 'status'), name='unique_post_daily_stats')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TransactionDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('state', models.CharField(max_length=255)),
+                ('post_type', models.CharField(choices=[('REQUEST', 'Solicitud'), ('OFFER', 'Oferta')], max_length=10)),
+                ('status', models.CharField(choices=[('PENDING', 'Pendiente'), ('APPROVED', 'Aprobada'), ('REJECTED', 'Rechazada'), ('COMPLETED', 'Completada')], max_length=20)),
+                ('transactions', models.IntegerField(default=0)),
+                ('quantity_committed', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='sdc_client.category')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'category', 'state', 'post_type', 'status'), name='unique_transaction_daily_stats')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
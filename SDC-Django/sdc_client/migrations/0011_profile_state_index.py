@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sdc_client', '0010_revoked_token'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='donee',
+            name='state',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='donor',
+            name='state',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='institution',
+            name='state',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+    ]
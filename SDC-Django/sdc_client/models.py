@@ -1,4 +1,5 @@
 from django.db import models
+from django.contrib.postgres.search import SearchVectorField
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.utils import timezone
 from django.conf import settings
@@ -60,6 +61,11 @@ class Status(models.Model):
 # --- Modelo para usuario ---
 
 class CustomUser(AbstractBaseUser, PermissionsMixin):
+    class Role(models.TextChoices):
+        DONEE = 'donee', 'Donatario'
+        DONOR = 'donor', 'Donador'
+        INSTITUTION = 'institution', 'Institución'
+
     email = models.EmailField(max_length=255, unique=True)
     password = models.CharField(max_length=255)
     creation_date = models.DateTimeField(default=timezone.now)
@@ -67,6 +73,10 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     
     status = models.ForeignKey(Status, on_delete=models.PROTECT)
 
+    # Rol desnormalizado: se sincroniza al crear/borrar el perfil (ver signals.py)
+    # para no consultar donee/donor/institution cada vez que se necesita.
+    role = models.CharField(max_length=20, choices=Role.choices, blank=True, default='')
+
     # Campos requeridos por Django Admin
     is_staff = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
@@ -93,7 +103,8 @@ class Donee(models.Model):
     second_surname = models.CharField(max_length=255)
     curp = models.CharField(max_length=18, unique=True)
     city = models.CharField(max_length=255)
-    state = models.CharField(max_length=255)
+    # Índice: candidatos del mismo estado en matching.py
+    state = models.CharField(max_length=255, db_index=True)
     
     user = models.OneToOneField(CustomUser, on_delete=models.CASCADE)
 
@@ -108,7 +119,8 @@ class Donor(models.Model):
     second_surname = models.CharField(max_length=255)
     curp = models.CharField(max_length=18, unique=True)
     city = models.CharField(max_length=255)
-    state = models.CharField(max_length=255)
+    # Índice: candidatos del mismo estado en matching.py
+    state = models.CharField(max_length=255, db_index=True)
     
     user = models.OneToOneField(CustomUser, on_delete=models.CASCADE)
 
@@ -120,7 +132,8 @@ class Institution(models.Model):
     name = models.CharField(max_length=255, unique=True)
     rfc = models.CharField(max_length=13, unique=True)
     city = models.CharField(max_length=255)
-    state = models.CharField(max_length=255)
+    # Índice: candidatos del mismo estado en matching.py
+    state = models.CharField(max_length=255, db_index=True)
     address = models.CharField(max_length=255)
     
     user = models.OneToOneField(CustomUser, on_delete=models.CASCADE)
@@ -143,6 +156,22 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+class PostQuerySet(models.QuerySet):
+    # Columnas que muestran las tarjetas de los feeds (updated_at: llave de card_cache.py)
+    CARD_FIELDS = (
+        'id', 'title', 'description', 'quantity', 'quantity_committed', 'post_type', 'status',
+        'is_campaign', 'created_at', 'updated_at', 'author__email', 'author__role',
+        'category__name',
+    )
+
+    def for_cards(self):
+        """
+        Trae autor y categoría en el mismo JOIN y sólo las columnas que usan
+        las tarjetas, para evitar una query extra por cada post renderizado.
+        """
+        return self.select_related('author', 'category').only(*self.CARD_FIELDS)
+
+
 class Post(models.Model):
     """
     La publicación central (Solicitud o Donación).
@@ -174,6 +203,13 @@ class Post(models.Model):
         decimal_places=2, 
         default=1.0
     )
+    # Suma desnormalizada de Transaction.quantity_committed (ver commitments.py)
+    # para que los feeds no tengan que calcular SUM() sobre las transacciones.
+    quantity_committed = models.DecimalField(
+        max_digits=10, 
+        decimal_places=2, 
+        default=0
+    )
     
     # --- Campos de Lógica ---
     post_type = models.CharField(
@@ -195,9 +231,83 @@ class Post(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Vector de búsqueda (título + descripción, configuración 'spanish').
+    # En PostgreSQL lo mantiene un trigger y tiene índice GIN (migración 0006).
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = PostQuerySet.as_manager()
+
+    class Meta:
+        # Índices para la paginación por cursor de los feeds (created_at, id)
+        indexes = [
+            # donee_feed / donor_feed: posts ACTIVOS de un tipo
+            models.Index(
+                fields=['post_type', '-created_at', '-id'],
+                condition=models.Q(status='ACTIVE'),
+                name='post_active_type_created_idx',
+            ),
+            # institution_feed: todos los posts ACTIVOS
+            models.Index(
+                fields=['-created_at', '-id'],
+                condition=models.Q(status='ACTIVE'),
+                name='post_active_created_idx',
+            ),
+            # "Mis publicaciones" de cada feed
+            models.Index(
+                fields=['author', 'post_type', '-created_at', '-id'],
+                name='post_author_type_created_idx',
+            ),
+            # Candidatos del motor de coincidencias (matching.py)
+            models.Index(
+                fields=['category', 'post_type', '-created_at'],
+                name='post_category_type_created_idx',
+            ),
+            # Caducidad y archivado por lotes (lifecycle.py)
+            models.Index(
+                fields=['status', 'updated_at', 'id'],
+                name='post_status_updated_idx',
+            ),
+        ]
+
     def __str__(self):
         return f"[{self.get_post_type_display()}] {self.title} por {self.author.email}"
 
+    @property
+    def remaining_quantity(self):
+        return self.quantity - self.quantity_committed
+
+
+class PostMatch(models.Model):
+    """
+    Coincidencia precalculada entre una Solicitud y una Oferta.
+    Se mantiene de forma incremental al guardar posts (ver matching.py).
+    """
+    request = models.ForeignKey(
+        Post, 
+        on_delete=models.CASCADE, 
+        related_name='offer_matches'
+    )
+    offer = models.ForeignKey(
+        Post, 
+        on_delete=models.CASCADE, 
+        related_name='request_matches'
+    )
+    score = models.PositiveSmallIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['request', 'offer'], name='unique_post_match'),
+        ]
+        indexes = [
+            # "Mejores coincidencias" para cada lado: una sola búsqueda por índice
+            models.Index(fields=['request', '-score'], name='match_request_score_idx'),
+            models.Index(fields=['offer', '-score'], name='match_offer_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.request_id} <-> {self.offer_id} ({self.score})"
+
 
 class Transaction(models.Model):
     """
@@ -229,4 +339,253 @@ class Transaction(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"{self.participant.email} -> {self.post.title}"
\ No newline at end of file
+        return f"{self.participant.email} -> {self.post.title}"
+
+# --- Archivo histórico (ver lifecycle.py) ---
+#
+# Publicaciones COMPLETADAS/CANCELADAS fuera del periodo de retención y sus
+# transacciones. Conservan el id original; los feeds nunca leen estas
+# tablas, el historial ("Mis publicaciones" archivadas) y los rollups sí.
+
+class ArchivedPost(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='archived_posts'
+    )
+    title = models.CharField(max_length=255)
+    description = models.TextField()
+    category = models.ForeignKey(Category, on_delete=models.PROTECT, related_name='+')
+    quantity = models.DecimalField(max_digits=10, decimal_places=2)
+    quantity_committed = models.DecimalField(max_digits=10, decimal_places=2)
+    post_type = models.CharField(max_length=10, choices=Post.PostType.choices)
+    status = models.CharField(max_length=20, choices=Post.PostStatus.choices)
+    is_campaign = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    # Mismas tarjetas (for_cards) que los posts vigentes
+    objects = PostQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['author', 'post_type', '-created_at', '-id'],
+                name='archived_author_created_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"[Archivada] {self.title}"
+
+    @property
+    def remaining_quantity(self):
+        return self.quantity - self.quantity_committed
+
+
+class ArchivedTransaction(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='transactions'
+    )
+    participant = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='archived_interactions'
+    )
+    quantity_committed = models.DecimalField(max_digits=10, decimal_places=2)
+    status = models.CharField(max_length=20, choices=Transaction.TransactionStatus.choices)
+    created_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"[Archivada] {self.participant_id} -> {self.post_id}"
+
+# --- Rollups para Reportes y Gráficas (ver reports.py) ---
+
+class PostDailyStats(models.Model):
+    """
+    Publicaciones por día de creación x categoría x estado del autor x tipo x
+    estatus. Se actualiza al guardar/borrar posts; los reportes sólo leen aquí.
+    """
+    day = models.DateField()
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='+')
+    state = models.CharField(max_length=255)
+    post_type = models.CharField(max_length=10, choices=Post.PostType.choices)
+    status = models.CharField(max_length=20, choices=Post.PostStatus.choices)
+    posts = models.IntegerField(default=0)
+    quantity = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    quantity_committed = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'category', 'state', 'post_type', 'status'],
+                name='unique_post_daily_stats',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.post_type}/{self.status}: {self.posts}"
+
+
+class TransactionDailyStats(models.Model):
+    """
+    Compromisos por día x categoría x estado del autor del post x tipo de post
+    x estatus de la transacción.
+    """
+    day = models.DateField()
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='+')
+    state = models.CharField(max_length=255)
+    post_type = models.CharField(max_length=10, choices=Post.PostType.choices)
+    status = models.CharField(max_length=20, choices=Transaction.TransactionStatus.choices)
+    transactions = models.IntegerField(default=0)
+    quantity_committed = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'category', 'state', 'post_type', 'status'],
+                name='unique_transaction_daily_stats',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.post_type}/{self.status}: {self.transactions}"
+
+
+# --- Almacenes e inventario (ver inventory.py) ---
+
+class Warehouse(models.Model):
+    """
+    Almacén físico donde se reciben y entregan donaciones. Lo registra un
+    administrador y puede operarlo una Institución.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    city = models.CharField(max_length=255)
+    state = models.CharField(max_length=255)
+    address = models.CharField(max_length=255)
+    institution = models.ForeignKey(
+        Institution,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='warehouses'
+    )
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return self.name
+
+
+class StockMovement(models.Model):
+    """
+    Libro de movimientos (sólo se agregan filas, nunca se editan ni borran).
+    'quantity' lleva signo: positivo entra al almacén, negativo sale.
+    """
+    class MovementKind(models.TextChoices):
+        RECEIPT = 'RECEIPT', 'Entrada'
+        DISPATCH = 'DISPATCH', 'Salida'
+        ADJUSTMENT = 'ADJUSTMENT', 'Ajuste'
+
+    warehouse = models.ForeignKey(
+        Warehouse,
+        on_delete=models.PROTECT,
+        related_name='movements'
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.PROTECT,
+        related_name='+'
+    )
+    kind = models.CharField(max_length=10, choices=MovementKind.choices)
+    quantity = models.DecimalField(max_digits=12, decimal_places=2)
+    # Compromiso que originó la entrada/salida (opcional)
+    transaction = models.ForeignKey(
+        Transaction,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='stock_movements'
+    )
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    note = models.CharField(max_length=255, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Historial de un producto en un almacén (y la conciliación)
+            models.Index(fields=['warehouse', 'category', '-id'], name='movement_wh_category_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('Los movimientos de inventario no se modifican; registra un ajuste.')
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError('Los movimientos de inventario no se borran; registra un ajuste.')
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.quantity} de {self.category_id} en {self.warehouse_id}"
+
+
+class WarehouseStock(models.Model):
+    """
+    Existencia actual por almacén x categoría: la suma de StockMovement
+    materializada. Se actualiza en la misma transacción que cada movimiento,
+    así que leer el inventario nunca recorre el historial.
+    """
+    warehouse = models.ForeignKey(
+        Warehouse,
+        on_delete=models.CASCADE,
+        related_name='stock'
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.PROTECT,
+        related_name='+'
+    )
+    quantity = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # Último movimiento aplicado (la conciliación lo usa como referencia)
+    last_movement = models.ForeignKey(
+        StockMovement,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['warehouse', 'category'], name='unique_warehouse_stock'),
+            models.CheckConstraint(
+                condition=models.Q(quantity__gte=0), name='warehouse_stock_non_negative',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.warehouse_id}/{self.category_id}: {self.quantity}"
+
+
+class RevokedToken(models.Model):
+    """
+    Refresh token rotado o revocado (sólo su jti y su expiración). Las filas
+    vencidas se borran solas desde token_revocation.py.
+    """
+    jti = models.CharField(max_length=64, primary_key=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.jti
@@ -0,0 +1,138 @@
+# SDC-Django/sdc_client/pagination.py
+
+import base64
+import binascii
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db.models import Q
+
+
+# --- Paginación por cursor (keyset) sobre (created_at, id) ---
+
+def get_page_size():
+    return getattr(settings, 'FEED_PAGE_SIZE', 20)
+
+
+def _encode(raw):
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _decode(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    return base64.urlsafe_b64decode(padded.encode()).decode().rsplit('|', 1)
+
+
+def encode_cursor(post):
+    """Codifica la posición (created_at, id) de un post en un cursor opaco."""
+    return _encode(f"{post.created_at.isoformat()}|{post.pk}")
+
+
+def decode_cursor(cursor):
+    """
+    Decodifica un cursor a la tupla (created_at, id).
+    Devuelve None si el cursor no es válido (se sirve la primera página).
+    """
+    if not cursor:
+        return None
+    try:
+        created_at, pk = _decode(cursor)
+        created_at = datetime.fromisoformat(created_at)
+        # Los cursores propios siempre llevan zona horaria; uno sin ella no
+        # se puede comparar con created_at
+        if created_at.tzinfo is None:
+            return None
+        return created_at, int(pk)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        return None
+
+
+def _cursor_queryset(queryset, cursor):
+    queryset = queryset.order_by('-created_at', '-id')
+    position = decode_cursor(cursor)
+    if position is not None:
+        created_at, pk = position
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        )
+    return queryset
+
+
+def _split_page(posts, page_size, encode):
+    # Se pidió un elemento extra para saber si existe una página siguiente
+    next_cursor = None
+    if len(posts) > page_size:
+        posts = posts[:page_size]
+        next_cursor = encode(posts[-1])
+    return posts, next_cursor
+
+
+def paginate_by_cursor(queryset, cursor=None, page_size=None):
+    """
+    Devuelve (posts, next_cursor) para el queryset dado.
+
+    El orden es siempre '-created_at', '-id', que coincide con los índices
+    de Post, por lo que cada página es un recorrido acotado del índice sin
+    importar cuántos posts existan (a diferencia de OFFSET).
+    """
+    page_size = page_size or get_page_size()
+    queryset = _cursor_queryset(queryset, cursor)
+    return _split_page(list(queryset[:page_size + 1]), page_size, encode_cursor)
+
+
+async def apaginate_by_cursor(queryset, cursor=None, page_size=None):
+    """Versión async de paginate_by_cursor (ORM async)."""
+    page_size = page_size or get_page_size()
+    queryset = _cursor_queryset(queryset, cursor)
+    posts = [post async for post in queryset[:page_size + 1]]
+    return _split_page(posts, page_size, encode_cursor)
+
+
+# --- Paginación por cursor sobre (rank, id) para resultados de búsqueda ---
+#
+# 'rank' es un Decimal (numeric en la BBDD, ver search.py): el cursor guarda
+# su texto exacto, así que los empates en el límite de página se respetan.
+
+def encode_rank_cursor(post):
+    return _encode(f"{post.rank}|{post.pk}")
+
+
+def decode_rank_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        rank, pk = _decode(cursor)
+        rank = Decimal(rank)
+        if not rank.is_finite():
+            return None
+        return rank, int(pk)
+    except (ValueError, InvalidOperation, binascii.Error, UnicodeDecodeError):
+        return None
+
+
+def _rank_queryset(queryset, cursor):
+    queryset = queryset.order_by('-rank', '-id')
+    position = decode_rank_cursor(cursor)
+    if position is not None:
+        rank, pk = position
+        queryset = queryset.filter(Q(rank__lt=rank) | Q(rank=rank, id__lt=pk))
+    return queryset
+
+
+def paginate_by_rank(queryset, cursor=None, page_size=None):
+    """
+    Igual que paginate_by_cursor pero ordenando por relevancia: el queryset
+    debe estar anotado con 'rank' (ver search.py).
+    """
+    page_size = page_size or get_page_size()
+    queryset = _rank_queryset(queryset, cursor)
+    return _split_page(list(queryset[:page_size + 1]), page_size, encode_rank_cursor)
+
+
+async def apaginate_by_rank(queryset, cursor=None, page_size=None):
+    """Versión async de paginate_by_rank."""
+    page_size = page_size or get_page_size()
+    queryset = _rank_queryset(queryset, cursor)
+    posts = [post async for post in queryset[:page_size + 1]]
+    return _split_page(posts, page_size, encode_rank_cursor)
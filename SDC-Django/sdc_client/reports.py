@@ -0,0 +1,361 @@
+# SDC-Django/sdc_client/reports.py
+
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import chain
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import (
+    ArchivedPost, ArchivedTransaction, CustomUser, Post, PostDailyStats, Transaction,
+    TransactionDailyStats,
+)
+
+
+# --- Rollups incrementales para Reportes y Gráficas ---
+#
+# PostDailyStats y TransactionDailyStats guardan conteos y sumas por
+# (día, categoría, estado, tipo, estatus). Cada cambio de un Post o una
+# Transaction resta su contribución anterior y suma la nueva justo después
+# del guardado, en la misma transacción si la hay (ver signals.py). Así los
+# reportes sólo agregan las filas del rango pedido, sin importar el tamaño
+# del historial.
+# queryset.update() y bulk_create no disparan señales: tras cambios masivos
+# se corre rebuild_report_rollups (o posts_status_changed, como lifecycle.py).
+# Archivar un post no cambia sus rollups: el historial sigue en los reportes.
+
+MAX_REPORT_DAYS = 366
+DEFAULT_REPORT_DAYS = 30
+
+POST_FIELDS = ('created_at', 'category_id', 'author_id', 'post_type', 'status',
+               'quantity', 'quantity_committed')
+
+
+def _state_of(prefix=''):
+    """Estado del perfil del usuario (Donatario, Donador o Institución)."""
+    return Coalesce(
+        f'{prefix}donee__state', f'{prefix}donor__state', f'{prefix}institution__state',
+        Value(''),
+    )
+
+
+def _author_state(author_id):
+    return CustomUser.objects.filter(pk=author_id).values_list(_state_of(), flat=True).first() or ''
+
+
+def _decimal(value):
+    # El default de Post.quantity es un float (1.0)
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def _apply(model, key, deltas):
+    """
+    Suma 'deltas' a la fila 'key' del rollup, creándola si no existe. Es un
+    solo INSERT ... ON CONFLICT DO UPDATE (PostgreSQL y SQLite), sin carreras
+    entre dos transacciones que crean la misma fila.
+    """
+    if not any(deltas.values()):
+        return
+    meta = model._meta
+    quote = connection.ops.quote_name
+    table = quote(meta.db_table)
+    key_columns = [quote(meta.get_field(name).column) for name in key]
+    delta_columns = [quote(meta.get_field(name).column) for name in deltas]
+    columns = key_columns + delta_columns
+    sql = (
+        f'INSERT INTO {table} ({", ".join(columns)}) '
+        f'VALUES ({", ".join(["%s"] * len(columns))}) '
+        f'ON CONFLICT ({", ".join(key_columns)}) DO UPDATE SET '
+        + ', '.join(f'{column} = {table}.{column} + EXCLUDED.{column}' for column in delta_columns)
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*key.values(), *deltas.values()])
+
+
+def _move(model, old, new):
+    """Resta la contribución 'old' y suma 'new'; cada una es (llave, valores) o None."""
+    if old and new and old[0] == new[0]:
+        _apply(model, new[0], {field: new[1][field] - old[1][field] for field in new[1]})
+        return
+    if old:
+        _apply(model, old[0], {field: -value for field, value in old[1].items()})
+    if new:
+        _apply(model, new[0], new[1])
+
+
+# --- Publicaciones ---
+
+def _post_entry(data):
+    key = {
+        'day': timezone.localdate(data['created_at']),
+        'category_id': data['category_id'],
+        'state': data['state'],
+        'post_type': data['post_type'],
+        'status': data['status'],
+    }
+    values = {
+        'posts': 1,
+        'quantity': _decimal(data['quantity']),
+        'quantity_committed': _decimal(data['quantity_committed']),
+    }
+    return key, values
+
+
+def _stored_post(pk):
+    return Post.objects.filter(pk=pk).values(*POST_FIELDS, state=_state_of('author__')).first()
+
+
+def post_before_save(post):
+    """pre_save: guarda en la instancia lo que el post aporta hoy a los rollups."""
+    post._report_old = None if post._state.adding else _stored_post(post.pk)
+
+
+def post_after_save(post, update_fields=None):
+    old = getattr(post, '_report_old', None)
+    deferred = post.get_deferred_fields()
+
+    data = {}
+    for attname in POST_FIELDS:
+        name = Post._meta.get_field(attname).name
+        not_saved = attname in deferred or (update_fields is not None and name not in update_fields)
+        data[attname] = old[attname] if old and not_saved else getattr(post, attname)
+
+    if old and old['author_id'] == data['author_id']:
+        data['state'] = old['state']
+    else:
+        data['state'] = _author_state(data['author_id'])
+
+    _move(PostDailyStats, _post_entry(old) if old else None, _post_entry(data))
+    post._report_old = None
+
+
+def post_before_delete(post):
+    old = _stored_post(post.pk)
+    if old:
+        _move(PostDailyStats, _post_entry(old), None)
+
+
+# --- Transacciones ---
+
+def _transaction_entry(data):
+    key = {
+        'day': timezone.localdate(data['created_at']),
+        'category_id': data['category_id'],
+        'state': data['state'],
+        'post_type': data['post_type'],
+        'status': data['status'],
+    }
+    values = {
+        'transactions': 1,
+        'quantity_committed': _decimal(data['quantity_committed']),
+    }
+    return key, values
+
+
+def _stored_transaction(pk):
+    return Transaction.objects.filter(pk=pk).values(
+        'created_at', 'status', 'quantity_committed', 'post_id',
+        category_id=F('post__category_id'),
+        post_type=F('post__post_type'),
+        state=_state_of('post__author__'),
+    ).first()
+
+
+def transaction_before_save(instance):
+    instance._report_old = None if instance._state.adding else _stored_transaction(instance.pk)
+
+
+def transaction_after_save(instance):
+    old = getattr(instance, '_report_old', None)
+    data = {
+        'created_at': instance.created_at,
+        'status': instance.status,
+        'quantity_committed': instance.quantity_committed,
+    }
+    if old and old['post_id'] == instance.post_id:
+        data.update({key: old[key] for key in ('category_id', 'post_type', 'state')})
+    else:
+        data.update(Post.objects.filter(pk=instance.post_id).values(
+            'category_id', 'post_type', state=_state_of('author__'),
+        ).first())
+
+    _move(TransactionDailyStats, _transaction_entry(old) if old else None, _transaction_entry(data))
+    instance._report_old = None
+
+
+def transaction_before_delete(instance):
+    old = _stored_transaction(instance.pk)
+    if old:
+        _move(TransactionDailyStats, _transaction_entry(old), None)
+
+
+def posts_status_changed(queryset, new_status):
+    """
+    Mueve a 'new_status' la contribución de los posts de 'queryset' antes de
+    un queryset.update(status=...). Una fila por grupo, no por post.
+    """
+    rows = (
+        queryset
+        .annotate(day=TruncDate('created_at'), state=_state_of('author__'))
+        .values('day', 'category_id', 'state', 'post_type', 'status')
+        .annotate(
+            total_posts=Count('id'),
+            total_quantity=Sum('quantity'),
+            total_committed=Sum('quantity_committed'),
+        )
+        .order_by()
+    )
+    for row in rows:
+        key = {field: row[field] for field in ('day', 'category_id', 'state', 'post_type', 'status')}
+        values = {
+            'posts': row['total_posts'],
+            'quantity': row['total_quantity'],
+            'quantity_committed': row['total_committed'],
+        }
+        _move(PostDailyStats, (key, values), ({**key, 'status': new_status}, values))
+
+
+# --- Reconstrucción completa ---
+
+def _post_rows(model):
+    return (
+        model.objects
+        .annotate(day=TruncDate('created_at'), state=_state_of('author__'))
+        .values('day', 'category_id', 'state', 'post_type', 'status')
+        .annotate(
+            total_posts=Count('id'),
+            total_quantity=Sum('quantity'),
+            total_committed=Sum('quantity_committed'),
+        )
+        .order_by()
+    )
+
+
+def _transaction_rows(model):
+    return (
+        model.objects
+        .annotate(
+            day=TruncDate('created_at'),
+            category=F('post__category_id'),
+            kind=F('post__post_type'),
+            state=_state_of('post__author__'),
+        )
+        .values('day', 'category', 'state', 'kind', 'status')
+        .annotate(total_transactions=Count('id'), total_committed=Sum('quantity_committed'))
+        .order_by()
+    )
+
+
+def _merge(rows, key_fields, total_fields):
+    # Vigentes y archivadas pueden caer en el mismo grupo
+    merged = {}
+    for row in rows:
+        key = tuple(row[field] for field in key_fields)
+        totals = merged.setdefault(key, [0] * len(total_fields))
+        for i, field in enumerate(total_fields):
+            totals[i] += row[field]
+    return merged.items()
+
+
+def rebuild_rollups():
+    """Recalcula ambos rollups desde Post y Transaction (y sus archivos)."""
+    post_rows = _merge(
+        chain(_post_rows(Post).iterator(), _post_rows(ArchivedPost).iterator()),
+        ('day', 'category_id', 'state', 'post_type', 'status'),
+        ('total_posts', 'total_quantity', 'total_committed'),
+    )
+    transaction_rows = _merge(
+        chain(
+            _transaction_rows(Transaction).iterator(),
+            _transaction_rows(ArchivedTransaction).iterator(),
+        ),
+        ('day', 'category', 'state', 'kind', 'status'),
+        ('total_transactions', 'total_committed'),
+    )
+
+    with transaction.atomic():
+        PostDailyStats.objects.all().delete()
+        TransactionDailyStats.objects.all().delete()
+        PostDailyStats.objects.bulk_create((
+            PostDailyStats(
+                day=day, category_id=category_id, state=state, post_type=post_type,
+                status=status, posts=posts, quantity=quantity, quantity_committed=committed,
+            )
+            for (day, category_id, state, post_type, status), (posts, quantity, committed) in post_rows
+        ), batch_size=1000)
+        TransactionDailyStats.objects.bulk_create((
+            TransactionDailyStats(
+                day=day, category_id=category_id, state=state, post_type=post_type,
+                status=status, transactions=count, quantity_committed=committed,
+            )
+            for (day, category_id, state, post_type, status), (count, committed) in transaction_rows
+        ), batch_size=1000)
+
+    return PostDailyStats.objects.count(), TransactionDailyStats.objects.count()
+
+
+# --- Lectura de reportes ---
+
+def _first_day(end, days):
+    """Primer día de un rango de 'days' días que termina en 'end' (sin pasar de date.min)."""
+    return end - timedelta(days=min(days - 1, (end - date.min).days))
+
+
+def parse_report_range(start=None, end=None):
+    """
+    (desde, hasta) a partir de fechas ISO opcionales. Por defecto los últimos
+    DEFAULT_REPORT_DAYS días; nunca más de MAX_REPORT_DAYS. Lanza ValueError
+    si una fecha no es válida.
+    """
+    end = date.fromisoformat(end) if end else timezone.localdate()
+    start = date.fromisoformat(start) if start else _first_day(end, DEFAULT_REPORT_DAYS)
+    if start > end:
+        start, end = end, start
+    return max(start, _first_day(end, MAX_REPORT_DAYS)), end
+
+
+def _grouped(queryset, fields, **totals):
+    return list(queryset.values(*fields).annotate(**totals).order_by(*fields))
+
+
+def build_report(start, end, state=None, category_id=None):
+    """Agregados del rango, leyendo sólo los rollups."""
+    posts = PostDailyStats.objects.filter(day__range=(start, end))
+    transactions = TransactionDailyStats.objects.filter(day__range=(start, end))
+    if state:
+        posts = posts.filter(state=state)
+        transactions = transactions.filter(state=state)
+    if category_id:
+        posts = posts.filter(category_id=category_id)
+        transactions = transactions.filter(category_id=category_id)
+
+    post_totals = {
+        'total_posts': Sum('posts'),
+        'total_quantity': Sum('quantity'),
+        'total_committed': Sum('quantity_committed'),
+    }
+    transaction_totals = {
+        'total_transactions': Sum('transactions'),
+        'total_committed': Sum('quantity_committed'),
+    }
+    return {
+        'from': start,
+        'to': end,
+        'posts': {
+            'totals': posts.aggregate(**post_totals),
+            'by_type_status': _grouped(posts, ['post_type', 'status'], **post_totals),
+            'by_category': _grouped(posts, ['category__name'], **post_totals),
+            'by_state': _grouped(posts, ['state'], **post_totals),
+            'daily': _grouped(posts, ['day', 'post_type'], **post_totals),
+        },
+        'transactions': {
+            'totals': transactions.aggregate(**transaction_totals),
+            'by_status': _grouped(transactions, ['status'], **transaction_totals),
+            'by_category': _grouped(transactions, ['category__name'], **transaction_totals),
+            'by_state': _grouped(transactions, ['state'], **transaction_totals),
+            'daily': _grouped(transactions, ['day'], **transaction_totals),
+        },
+    }
@@ -0,0 +1,46 @@
+# SDC-Django/sdc_client/search.py
+
+from decimal import Decimal
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import Case, DecimalField, F, Q, Value, When
+from django.db.models.functions import Cast
+
+
+# --- Búsqueda de texto completo sobre Post (título y descripción) ---
+
+SEARCH_CONFIG = 'spanish'
+# SearchRank es 'real' (float4): su texto no es su valor exacto y el cursor
+# de paginación no lo encontraría al compararlo. Se redondea a un numeric
+# exacto, que es lo que se ordena, se compara y se guarda en el cursor.
+RANK_FIELD = DecimalField(max_digits=12, decimal_places=6)
+
+
+def search_posts(queryset, query):
+    """
+    Filtra 'queryset' por el texto 'query' y lo anota con 'rank' (relevancia).
+
+    En PostgreSQL usa el vector almacenado 'search_vector' (índice GIN,
+    configuración en español). En otros motores (SQLite en pruebas locales)
+    cae a icontains por término, con un rank simple: título > descripción.
+    """
+    query = (query or '').strip()
+    if not query:
+        return queryset.none()
+
+    if connection.vendor == 'postgresql':
+        search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type='websearch')
+        return queryset.filter(search_vector=search_query).annotate(
+            rank=Cast(SearchRank(F('search_vector'), search_query), RANK_FIELD)
+        )
+
+    for term in query.split():
+        queryset = queryset.filter(Q(title__icontains=term) | Q(description__icontains=term))
+    return queryset.annotate(
+        rank=Case(
+            When(title__icontains=query, then=Value(Decimal('1'))),
+            default=Value(Decimal('0.5')),
+            output_field=RANK_FIELD,
+        )
+    )
@@ -0,0 +1,103 @@
+# SDC-Django/sdc_client/serializers.py
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from .authentication import get_cached_user
+from . import token_revocation
+
+
+# --- Serialización compacta de tarjetas de publicación ---
+#
+# Los posts llegan de Post.objects.for_cards() (autor y categoría ya unidos),
+# así que los resúmenes embebidos no hacen queries extra. En lugar de un
+# ModelSerializer (un Field por atributo, con su to_representation) cada
+# campo es una función simple y sólo se ejecutan las pedidas en '?fields='.
+
+CARD_FIELD_GETTERS = {
+    'id': lambda post: post.id,
+    'title': lambda post: post.title,
+    'description': lambda post: post.description,
+    'post_type': lambda post: post.post_type,
+    'status': lambda post: post.status,
+    'is_campaign': lambda post: post.is_campaign,
+    'quantity': lambda post: str(post.quantity),
+    'quantity_committed': lambda post: str(post.quantity_committed),
+    'remaining_quantity': lambda post: str(post.remaining_quantity),
+    'created_at': lambda post: post.created_at.isoformat(),
+    'author': lambda post: {
+        'id': post.author_id,
+        'email': post.author.email,
+        'role': post.author.role,
+    },
+    'category': lambda post: {
+        'id': post.category_id,
+        'name': post.category.name,
+    },
+}
+
+
+def parse_fields(value):
+    """
+    Convierte '?fields=id,title' en la lista de campos a serializar.
+    Sin parámetro se devuelven todos; un campo desconocido es un error 400.
+    """
+    if not value:
+        return list(CARD_FIELD_GETTERS)
+
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in CARD_FIELD_GETTERS]
+    if unknown:
+        raise serializers.ValidationError({
+            'fields': f'Campos desconocidos: {", ".join(unknown)}.'
+        })
+    return fields
+
+
+class PostCardSerializer(serializers.BaseSerializer):
+    """Serializador de sólo lectura para las tarjetas de los feeds."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        names = fields if fields is not None else list(CARD_FIELD_GETTERS)
+        self.getters = [(name, CARD_FIELD_GETTERS[name]) for name in names]
+
+    def to_representation(self, post):
+        return {name: getter(post) for name, getter in self.getters}
+
+
+# --- Rotación de refresh tokens ---
+
+class RotatingTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    TokenRefreshSerializer con la revocación de token_revocation.py en lugar
+    de la app token_blacklist, y el usuario leído de la caché de la API.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+
+        user = get_cached_user(refresh.payload.get(api_settings.USER_ID_CLAIM))
+        if not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                self.error_messages['no_active_account'], 'no_active_account',
+            )
+
+        rotate = api_settings.ROTATE_REFRESH_TOKENS
+        if rotate and api_settings.BLACKLIST_AFTER_ROTATION:
+            # Revocar es también la revisión: falla si el token ya se usó
+            if not token_revocation.revoke(refresh):
+                raise TokenError(_('Token is blacklisted'))
+        elif token_revocation.is_revoked(refresh):
+            raise TokenError(_('Token is blacklisted'))
+
+        data = {'access': str(refresh.access_token)}
+        if rotate:
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+        return data
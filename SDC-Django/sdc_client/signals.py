@@ -0,0 +1,161 @@
+# SDC-Django/sdc_client/signals.py
+
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete, pre_save, pre_delete
+from django.dispatch import receiver
+
+from .models import Category, CustomUser, Donee, Donor, Institution, Post, Transaction
+from .feed_cache import invalidate_feeds
+from .authentication import invalidate_user
+from .commitments import commitment_after_save, commitment_before_save
+from .matching import rescore_matches_for, update_matches_for
+from . import reports
+from .metrics import record_query
+from .slow_queries import capture_slow_query
+
+
+# --- Sincronización del rol desnormalizado en CustomUser ---
+
+PROFILE_ROLES = {
+    Donee: CustomUser.Role.DONEE,
+    Donor: CustomUser.Role.DONOR,
+    Institution: CustomUser.Role.INSTITUTION,
+}
+
+
+def _set_user_role(profile, role):
+    CustomUser.objects.filter(pk=profile.user_id).update(role=role)
+    invalidate_user(profile.user_id)
+    # Mantener coherente la instancia en memoria si ya estaba cargada
+    if type(profile).user.is_cached(profile):
+        profile.user.role = role
+
+
+@receiver(post_save, sender=Donee)
+@receiver(post_save, sender=Donor)
+@receiver(post_save, sender=Institution)
+def sync_role_on_profile_save(sender, instance, created, **kwargs):
+    if created:
+        _set_user_role(instance, PROFILE_ROLES[sender])
+
+
+@receiver(post_delete, sender=Donee)
+@receiver(post_delete, sender=Donor)
+@receiver(post_delete, sender=Institution)
+def clear_role_on_profile_delete(sender, instance, **kwargs):
+    _set_user_role(instance, '')
+
+
+# --- Invalidación del usuario en caché de la API (authentication.py) ---
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+# --- Invalidación de la caché de feeds ---
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_feed_cache(sender, instance, **kwargs):
+    invalidate_feeds(instance.post_type)
+
+
+def _invalidate_all_feeds():
+    for post_type in Post.PostType.values:
+        invalidate_feeds(post_type)
+
+
+# Las tarjetas muestran el correo del autor y el nombre de la categoría
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_feeds_on_category_change(sender, instance, **kwargs):
+    _invalidate_all_feeds()
+
+
+@receiver(post_save, sender=CustomUser)
+def invalidate_feeds_on_email_change(sender, instance, created, update_fields=None, **kwargs):
+    # update_last_login guarda sólo last_login: no toca los feeds
+    if not created and (update_fields is None or 'email' in update_fields):
+        _invalidate_all_feeds()
+
+
+# --- Coincidencias incrementales ---
+
+# Guardados que sólo mueven la cantidad comprometida (commit_to_post)
+RESCORE_ONLY_FIELDS = {'quantity_committed', 'status', 'updated_at'}
+
+
+@receiver(post_save, sender=Post)
+def update_post_matches(sender, instance, update_fields=None, **kwargs):
+    # Fuera de la transacción que guardó el post (p. ej. el bloqueo de commitments)
+    if update_fields is not None and set(update_fields) <= RESCORE_ONLY_FIELDS:
+        transaction.on_commit(lambda: rescore_matches_for(instance))
+    else:
+        transaction.on_commit(lambda: update_matches_for(instance))
+
+
+# --- Cantidad comprometida del post (ver commitments.py) ---
+
+@receiver(pre_save, sender=Transaction)
+def snapshot_commitment(sender, instance, raw=False, **kwargs):
+    if not raw:
+        commitment_before_save(instance)
+
+
+@receiver(post_save, sender=Transaction)
+def sync_post_quantity_committed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        commitment_after_save(instance)
+
+
+# --- Rollups de reportes (ver reports.py) ---
+
+@receiver(pre_save, sender=Post)
+def snapshot_post_report(sender, instance, raw=False, **kwargs):
+    if not raw:
+        reports.post_before_save(instance)
+
+
+@receiver(post_save, sender=Post)
+def update_post_report(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        reports.post_after_save(instance, update_fields)
+
+
+@receiver(pre_delete, sender=Post)
+def remove_post_report(sender, instance, **kwargs):
+    reports.post_before_delete(instance)
+
+
+@receiver(pre_save, sender=Transaction)
+def snapshot_transaction_report(sender, instance, raw=False, **kwargs):
+    if not raw:
+        reports.transaction_before_save(instance)
+
+
+@receiver(post_save, sender=Transaction)
+def update_transaction_report(sender, instance, raw=False, **kwargs):
+    if not raw:
+        reports.transaction_after_save(instance)
+
+
+@receiver(pre_delete, sender=Transaction)
+def remove_transaction_report(sender, instance, **kwargs):
+    reports.transaction_before_delete(instance)
+
+
+# --- Medición de queries por petición (ver metrics.py y slow_queries.py) ---
+
+@receiver(connection_created)
+def install_query_timing(sender, connection, **kwargs):
+    # connection_created se emite en cada reconexión del mismo wrapper
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+    # Opt-in: sin umbral configurado no se agrega ningún costo por query
+    if (getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', None) is not None
+            and capture_slow_query not in connection.execute_wrappers):
+        connection.execute_wrappers.append(capture_slow_query)
@@ -0,0 +1,204 @@
+# SDC-Django/sdc_client/slow_queries.py
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import current_request
+
+
+logger = logging.getLogger(__name__)
+
+
+# --- Captura de queries lentas (opt-in con SLOW_QUERY_THRESHOLD_MS) ---
+#
+# Un execute_wrapper (instalado en signals.py) mide cada query. Si supera el
+# umbral, en el hilo de la petición sólo se toman la vista y el frame de
+# origen; el EXPLAIN y la escritura al log ocurren en un hilo aparte con su
+# propia conexión, así que la petición no espera al plan. Cada huella
+# (fingerprint) se explica a lo más una vez por SLOW_QUERY_EXPLAIN_INTERVAL.
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sdc-explain')
+_pending = threading.BoundedSemaphore(20)
+_local = threading.local()
+# Huella -> último EXPLAIN; LRU acotado a SLOW_QUERY_EXPLAIN_MAX_FINGERPRINTS
+_explained_at = OrderedDict()
+_write_lock = threading.Lock()
+
+_PROJECT_DIR = str(settings.BASE_DIR)
+# Archivos de la instrumentación misma (los execute_wrapper), no son el origen
+_SKIP_FILES = {
+    os.path.abspath(__file__),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'metrics.py'),
+}
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_IN_LIST = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    """SQL sin literales ni listas IN variables: iguala queries de la misma forma."""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+def fingerprint(normalized):
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+
+def _origin_frame():
+    # El frame más interno que pertenece al proyecto (no a Django ni a la instrumentación)
+    for frame in reversed(traceback.extract_stack()):
+        filename = os.path.abspath(frame.filename)
+        if (filename.startswith(_PROJECT_DIR) and filename not in _SKIP_FILES
+                and 'site-packages' not in filename):
+            return f'{os.path.relpath(filename, _PROJECT_DIR)}:{frame.lineno} in {frame.name}'
+    return None
+
+
+def _safe_params(params):
+    if params is None:
+        return None
+    values = params.values() if isinstance(params, dict) else params
+    return [repr(value)[:200] for value in values]
+
+
+def capture_slow_query(execute, sql, params, many, context):
+    """execute_wrapper: registra las queries que superan el umbral."""
+    threshold = getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', None)
+    if threshold is None or getattr(_local, 'explaining', False):
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = (time.perf_counter() - start) * 1000
+        if duration >= threshold and not many:
+            _report(sql, params, duration, context['connection'].alias)
+
+
+def _report(sql, params, duration, alias):
+    request = current_request()
+    match = getattr(request, 'resolver_match', None) if request is not None else None
+    normalized = normalize_sql(sql)
+    record = {
+        'time': datetime.now(timezone.utc).isoformat(),
+        'duration_ms': round(duration, 3),
+        'fingerprint': fingerprint(normalized),
+        'normalized': normalized,
+        'sql': sql,
+        'params': _safe_params(params),
+        'view': match.view_name if match else None,
+        'path': request.path if request is not None else None,
+        'frame': _origin_frame(),
+        'alias': alias,
+        'plan': None,
+    }
+    logger.warning(
+        'Query lenta (%.1f ms) en %s: %s', duration, record['view'] or record['frame'], normalized,
+    )
+
+    # Sin lugar en la cola se registra sin plan: nunca se bloquea la petición
+    if not _pending.acquire(blocking=False):
+        _write_record(record)
+        return
+    try:
+        _executor.submit(_explain_and_write, record, sql, params)
+    except RuntimeError:
+        # El intérprete se está cerrando
+        _pending.release()
+
+
+def _explain_and_write(record, sql, params):
+    try:
+        record['plan'] = explain(record['fingerprint'], sql, params, record['alias'])
+        _write_record(record)
+    except Exception:
+        logger.exception('No se pudo registrar la query lenta %s', record['fingerprint'])
+    finally:
+        _pending.release()
+
+
+def _explain_prefix(vendor):
+    if vendor == 'postgresql':
+        return 'EXPLAIN (ANALYZE, BUFFERS) '
+    if vendor == 'sqlite':
+        return 'EXPLAIN QUERY PLAN '
+    return None
+
+
+def explain(query_fingerprint, sql, params, alias='default'):
+    """
+    Plan de la query en una conexión propia del hilo. Sólo se explican
+    SELECT sin bloqueo: EXPLAIN ANALYZE ejecuta la query de verdad.
+    """
+    statement = sql.lstrip().upper()
+    if not statement.startswith('SELECT') or ' FOR UPDATE' in statement:
+        return None
+
+    interval = getattr(settings, 'SLOW_QUERY_EXPLAIN_INTERVAL', 300)
+    last = _explained_at.get(query_fingerprint)
+    if last is not None and time.monotonic() - last < interval:
+        return None
+    _explained_at[query_fingerprint] = time.monotonic()
+    _explained_at.move_to_end(query_fingerprint)
+    while len(_explained_at) > getattr(settings, 'SLOW_QUERY_EXPLAIN_MAX_FINGERPRINTS', 1000):
+        _explained_at.popitem(last=False)
+
+    connection = connections[alias]
+    prefix = _explain_prefix(connection.vendor)
+    if prefix is None:
+        return None
+
+    _local.explaining = True
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                timeout = getattr(settings, 'SLOW_QUERY_EXPLAIN_TIMEOUT_MS', 5000)
+                cursor.execute('SET statement_timeout = %s', [timeout])
+            cursor.execute(prefix + sql, params)
+            return '\n'.join(' '.join(str(col) for col in row) for row in cursor.fetchall())
+    except Exception as e:
+        return f'EXPLAIN falló: {e}'
+    finally:
+        _local.explaining = False
+        connection.close()
+
+
+def _write_record(record):
+    path = getattr(settings, 'SLOW_QUERY_LOG', None)
+    if not path:
+        return
+    line = json.dumps(record, ensure_ascii=False, default=str) + '\n'
+    # Una sola escritura en modo append por registro: las líneas de varios
+    # procesos no se mezclan
+    with _write_lock, open(path, 'a', encoding='utf-8') as handle:
+        handle.write(line)
+
+
+def read_log(path):
+    """Registros del log JSONL (las líneas dañadas se ignoran)."""
+    with open(path, encoding='utf-8') as handle:
+        for line in handle:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
@@ -17,7 +17,8 @@ document.getElementById('login-form').addEventListener('submit', async function(
                     },
                     body: JSON.stringify({
                         email: email,
-                        password: password
+                        password: password,
+                        session: true // Las páginas HTML usan la sesión de Django
                     })
                 });
 
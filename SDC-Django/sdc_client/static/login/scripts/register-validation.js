@@ -18,6 +18,49 @@ document.addEventListener("DOMContentLoaded", () => {
         }
     }
 
+    // --- Disponibilidad (email, teléfono, CURP, RFC, nombre) ---
+    // Se consulta al servidor sólo con formato válido y tras una pausa al
+    // escribir; una consulta nueva cancela la anterior.
+    const TAKEN_MESSAGES = {
+        email: "Este correo ya está registrado.",
+        phone: "Este teléfono ya está registrado.",
+        curp: "Este CURP ya está registrado.",
+        rfc: "Este RFC ya está registrado.",
+        name: "Ya existe una institución con este nombre."
+    };
+    const AVAILABILITY_DELAY_MS = 400;
+
+    function watchAvailability(form, input, feedback, field, isValid) {
+        const url = form.dataset.availabilityUrl;
+        if (!url || !input) return;
+        let timer = null;
+        let controller = null;
+
+        input.addEventListener("input", () => {
+            clearTimeout(timer);
+            controller?.abort();
+            const value = input.value.trim();
+            if (!value || !isValid(value)) return;
+
+            timer = setTimeout(async () => {
+                controller = new AbortController();
+                try {
+                    const params = new URLSearchParams({ [field]: value });
+                    const response = await fetch(`${url}?${params}`, { signal: controller.signal });
+                    if (!response.ok) return; // 429 u otro error: se valida al enviar
+                    const data = await response.json();
+                    if (data.available[field] === false) {
+                        showFeedback(feedback, TAKEN_MESSAGES[field], false);
+                    } else if (!feedback.classList.contains("invalid")) {
+                        showFeedback(feedback, "Disponible.", true);
+                    }
+                } catch (error) {
+                    // Abortada o sin red: no se muestra nada
+                }
+            }, AVAILABILITY_DELAY_MS);
+        });
+    }
+
     // --- FORMULARIO PERSONA ---
     const formPerson = document.getElementById("form-person");
     if (formPerson) {
@@ -114,16 +157,23 @@ document.addEventListener("DOMContentLoaded", () => {
             showFeedback(confirmPasswordFeedback, valid || !confirmPassword.value ? "" : "Las contraseñas no coinciden.", valid);
         }
         confirmPassword?.addEventListener("input", validatePasswordMatch);
+
+        // Disponibilidad (después de las validaciones de formato)
+        watchAvailability(formPerson, email, emailFeedback, "email", (v) => REGEX.email.test(v));
+        watchAvailability(formPerson, phone, phoneFeedback, "phone", (v) => REGEX.onlyNumbers.test(v));
+        watchAvailability(formPerson, curp, curpFeedback, "curp", (v) => REGEX.curp.test(v.toUpperCase()));
     }
 
     // --- FORMULARIO INSTITUCIÓN ---
     const formInstitution = document.getElementById("form-institution");
     if (formInstitution) {
+        const name = document.getElementById("id_institution_name");
         const rfc = document.getElementById("id_institution_rfc");
         const email = document.getElementById("id_institution_email");
         const password = document.getElementById("id_institution_password");
         const confirmPassword = document.getElementById("id_confirm_institution_password");
 
+        const nameFeedback = document.getElementById("inst-name-feedback");
         const rfcFeedback = document.getElementById("rfc-feedback");
         const emailFeedback = document.getElementById("inst-email-feedback");
         const passwordFeedback = document.getElementById("inst-password-feedback");
@@ -178,5 +228,11 @@ document.addEventListener("DOMContentLoaded", () => {
             showFeedback(confirmPasswordFeedback, valid || !confirmPassword.value ? "" : "Las contraseñas no coinciden.", valid);
         }
         confirmPassword?.addEventListener("input", validatePasswordMatch);
+
+        // Disponibilidad (después de las validaciones de formato)
+        name?.addEventListener("input", () => showFeedback(nameFeedback, "", true));
+        watchAvailability(formInstitution, name, nameFeedback, "name", (v) => v.length > 0);
+        watchAvailability(formInstitution, rfc, rfcFeedback, "rfc", (v) => REGEX.rfc.test(v.toUpperCase()));
+        watchAvailability(formInstitution, email, emailFeedback, "email", (v) => REGEX.email.test(v));
     }
 });
\ No newline at end of file
@@ -0,0 +1,36 @@
+# SDC-Django/sdc_client/template_backends.py
+
+import time
+
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+from .metrics import record_template
+
+
+# --- Backend de plantillas con medición de tiempo de render ---
+#
+# Igual que DjangoTemplates, pero cada render de nivel superior (render(),
+# TemplateResponse) suma su duración a las métricas de la petición en curso.
+# Los {% include %} se renderizan dentro de ese mismo llamado.
+
+class TimedTemplate(Template):
+
+    def render(self, context=None, request=None):
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            record_template(time.perf_counter() - start)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
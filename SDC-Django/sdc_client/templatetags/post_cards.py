@@ -0,0 +1,13 @@
+# SDC-Django/sdc_client/templatetags/post_cards.py
+
+from django import template
+
+from ..card_cache import render_cards
+
+register = template.Library()
+
+
+@register.simple_tag
+def cached_cards(posts, template_name, **options):
+    """{% cached_cards posts 'posts/partials/feed_card.html' quantity_label='Ofrece' as cards %}"""
+    return render_cards(posts, template_name, **options)
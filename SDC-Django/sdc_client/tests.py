@@ -1,3 +1,1664 @@
-from django.test import TestCase
+import base64
+import csv
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.contrib.auth.hashers import make_password, get_hasher
+from django.template import engines
+from django.template.loaders.cached import Loader as CachedLoader
+from django.templatetags.static import static
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import path, reverse
+from django.utils import timezone
+
+from .models import (
+    Status, CustomUser, Donee, Donor, Institution, Category, Post, PostMatch, Transaction,
+    PostDailyStats, TransactionDailyStats, Warehouse, WarehouseStock, StockMovement,
+    ArchivedPost, ArchivedTransaction, RevokedToken,
+)
+from .pagination import encode_cursor, decode_cursor, paginate_by_cursor, paginate_by_rank
+from . import feed_cache
+from . import metrics
+from . import slow_queries
+from . import reports
+from . import inventory
+from . import card_cache
+from . import lifecycle
+from . import token_revocation
+from . import urls as sdc_urls
+from .commitments import commit_to_post, CommitmentError
+from .matching import best_matches
+from .search import search_posts
+from .benchmarks import SCENARIOS, compare_to_baseline
+from .throttles import LoginIPThrottle
+
+from rest_framework_simplejwt.tokens import RefreshToken
 
 # Create your tests here.
+
+
+# --- Utilidades de prueba ---
+
+class QueryBudgetMixin:
+    """
+    Aserciones de presupuesto de queries. Sirven para que CI falle cuando
+    una vista empieza a hacer queries proporcionales a los datos (N+1).
+    """
+
+    @contextmanager
+    def assertMaxQueries(self, budget):
+        """Falla si el bloque ejecuta más de 'budget' queries."""
+        with CaptureQueriesContext(connection) as ctx:
+            yield ctx
+        if len(ctx) > budget:
+            queries = '\n'.join(q['sql'] for q in ctx.captured_queries)
+            self.fail(f'{len(ctx)} queries, presupuesto {budget}:\n{queries}')
+
+    def assertQueriesConstant(self, action, grow):
+        """
+        Ejecuta 'action', luego 'grow' (que añade datos) y otra vez 'action'.
+        Falla si el número de queries cambió con el tamaño de los datos.
+        """
+        with CaptureQueriesContext(connection) as before:
+            action()
+        grow()
+        with CaptureQueriesContext(connection) as after:
+            action()
+        if len(before) != len(after):
+            queries = '\n'.join(q['sql'] for q in after.captured_queries)
+            self.fail(
+                f'El número de queries creció con los datos: '
+                f'{len(before)} -> {len(after)}:\n{queries}'
+            )
+
+
+class SDCTestCase(QueryBudgetMixin, TestCase):
+    """Datos base compartidos: un status, una categoría y un usuario por rol."""
+
+    password = 'Password123'
+
+    @classmethod
+    def setUpTestData(cls):
+        Status.objects.create(id=1, name='Activo', description='Usuario activo')
+        cls.category = Category.objects.create(name='Comida')
+
+        cls.donee_user = cls.make_user('donee@sdc.mx', '5500000001')
+        Donee.objects.create(
+            user=cls.donee_user, first_name='Ana', first_surname='López',
+            second_surname='Pérez', curp='LOPA900101MDFPRN01',
+            city='Tijuana', state='Baja California',
+        )
+        cls.donor_user = cls.make_user('donor@sdc.mx', '5500000002')
+        Donor.objects.create(
+            user=cls.donor_user, first_name='Luis', first_surname='García',
+            second_surname='Ruiz', curp='GARL900101HDFRZS02',
+            city='Tijuana', state='Baja California',
+        )
+        cls.institution_user = cls.make_user('inst@sdc.mx', 'ABC900101AB1')
+        Institution.objects.create(
+            user=cls.institution_user, name='Banco de Alimentos', rfc='ABC900101AB1',
+            city='Tijuana', state='Baja California', address='Av. Siempre Viva 1',
+        )
+
+    def setUp(self):
+        # La caché no participa del rollback de cada prueba
+        cache.clear()
+
+    @classmethod
+    def make_user(cls, email, phone):
+        return CustomUser.objects.create_user(email=email, phone=phone, password=cls.password)
+
+    @classmethod
+    def make_posts(cls, author, post_type, count, **extra):
+        extra.setdefault('category', cls.category)
+        return [
+            Post.objects.create(
+                author=author, title=f'Post {i}', description='Descripción',
+                post_type=post_type, **extra
+            )
+            for i in range(count)
+        ]
+
+
+# --- Paginación por cursor ---
+
+class CursorPaginationTests(SDCTestCase):
+
+    def test_cursor_roundtrip(self):
+        post = self.make_posts(self.donor_user, Post.PostType.OFFER, 1)[0]
+        self.assertEqual(decode_cursor(encode_cursor(post)), (post.created_at, post.pk))
+
+    def test_invalid_cursor_returns_first_page(self):
+        self.assertIsNone(decode_cursor('no-es-un-cursor'))
+
+    def test_naive_cursor_returns_first_page(self):
+        naive = base64.urlsafe_b64encode(b'2099-01-01T00:00:00|5').decode().rstrip('=')
+        self.assertIsNone(decode_cursor(naive))
+        self.make_posts(self.donor_user, Post.PostType.OFFER, 2)
+
+        self.client.force_login(self.donee_user)
+        response = self.client.get(reverse('donee_feed'), {'cursor': naive})
+        self.assertEqual(len(response.context['feed_posts']), 2)
+
+        token = RefreshToken.for_user(self.donee_user).access_token
+        response = self.client.get(
+            reverse('api_donee_feed'), {'cursor': naive}, HTTP_AUTHORIZATION=f'Bearer {token}',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 2)
+
+    def test_pages_cover_all_posts_without_duplicates(self):
+        posts = self.make_posts(self.donor_user, Post.PostType.OFFER, 7)
+        seen, cursor = [], None
+        while True:
+            page, cursor = paginate_by_cursor(Post.objects.all(), cursor, page_size=3)
+            seen.extend(p.pk for p in page)
+            if cursor is None:
+                break
+        self.assertEqual(seen, sorted((p.pk for p in posts), reverse=True))
+
+    def test_feed_is_paginated(self):
+        self.make_posts(self.donor_user, Post.PostType.OFFER, 5)
+        self.client.force_login(self.donee_user)
+        with self.settings(FEED_PAGE_SIZE=2):
+            response = self.client.get(reverse('donee_feed'))
+            self.assertEqual(len(response.context['feed_posts']), 2)
+            next_cursor = response.context['feed_next_cursor']
+            self.assertIsNotNone(next_cursor)
+
+            response = self.client.get(reverse('donee_feed'), {'cursor': next_cursor})
+            self.assertEqual(len(response.context['feed_posts']), 2)
+
+
+# --- Presupuesto de queries (N+1) ---
+
+class QueryBudgetTests(SDCTestCase):
+
+    def assertFeedQueriesConstant(self, user, url_name, post_type):
+        self.client.force_login(user)
+        author = self.institution_user if user != self.institution_user else self.donor_user
+        self.make_posts(author, post_type, 2)
+        self.make_posts(user, post_type, 2)
+        self.assertQueriesConstant(
+            lambda: self.client.get(reverse(url_name)),
+            lambda: (self.make_posts(author, post_type, 15),
+                     self.make_posts(user, post_type, 15)),
+        )
+
+    def test_donee_feed(self):
+        self.assertFeedQueriesConstant(self.donee_user, 'donee_feed', Post.PostType.OFFER)
+
+    def test_donor_feed(self):
+        self.assertFeedQueriesConstant(self.donor_user, 'donor_feed', Post.PostType.REQUEST)
+
+    def test_institution_feed(self):
+        self.assertFeedQueriesConstant(
+            self.institution_user, 'institution_feed', Post.PostType.REQUEST
+        )
+
+    def test_create_post(self):
+        self.client.force_login(self.donor_user)
+        data = {
+            'title': 'Cobijas', 'description': 'Cobijas nuevas',
+            'category': self.category.pk, 'quantity': '5',
+        }
+        self.assertQueriesConstant(
+            lambda: self.client.post(reverse('create_post'), data),
+            lambda: self.make_posts(self.donor_user, Post.PostType.OFFER, 15),
+        )
+
+    def test_login(self):
+        credentials = {'email': self.donor_user.email, 'password': self.password}
+        # Un cliente nuevo por intento: cada login parte sin sesión previa
+        self.assertQueriesConstant(
+            lambda: self.client_class().post(
+                reverse('api_login'), credentials, content_type='application/json'
+            ),
+            lambda: self.make_posts(self.donor_user, Post.PostType.OFFER, 15),
+        )
+
+    def test_feed_cards_do_not_query_relations(self):
+        self.make_posts(self.donor_user, Post.PostType.OFFER, 3)
+        posts = list(Post.objects.for_cards())
+        with self.assertMaxQueries(0):
+            for post in posts:
+                str(post)
+                post.category.name
+
+
+# --- Rol desnormalizado ---
+
+class UserRoleTests(SDCTestCase):
+
+    def test_role_synced_on_profile_create(self):
+        self.donee_user.refresh_from_db()
+        self.donor_user.refresh_from_db()
+        self.institution_user.refresh_from_db()
+        self.assertEqual(self.donee_user.role, CustomUser.Role.DONEE)
+        self.assertEqual(self.donor_user.role, CustomUser.Role.DONOR)
+        self.assertEqual(self.institution_user.role, CustomUser.Role.INSTITUTION)
+
+    def test_role_cleared_on_profile_delete(self):
+        Donor.objects.filter(user=self.donor_user).delete()
+        self.donor_user.refresh_from_db()
+        self.assertEqual(self.donor_user.role, '')
+
+    def test_login_reports_role(self):
+        response = self.client.post(
+            reverse('api_login'),
+            {'email': self.institution_user.email, 'password': self.password},
+            content_type='application/json',
+        )
+        user = response.json()['user']
+        self.assertEqual(user['user_type'], 'institution')
+        self.assertEqual(user['redirect_url'], '/institution_feed')
+
+    def test_institution_post_form_has_extra_fields(self):
+        self.institution_user.refresh_from_db()
+        self.client.force_login(self.institution_user)
+        with self.assertMaxQueries(4):
+            response = self.client.get(reverse('create_post'))
+        self.assertIn('post_type', response.context['form'].fields)
+
+
+# --- Caché de feeds ---
+
+class FeedCacheTests(SDCTestCase):
+
+    def test_window_is_served_from_cache(self):
+        self.make_posts(self.donor_user, Post.PostType.OFFER, 3)
+        feed_cache.get_feed_page(Post.PostType.OFFER, self.donee_user)
+        with self.assertMaxQueries(0):
+            posts, _ = feed_cache.get_feed_page(Post.PostType.OFFER, self.donee_user)
+        self.assertEqual(len(posts), 3)
+
+    def test_own_posts_are_excluded_in_memory(self):
+        self.make_posts(self.donor_user, Post.PostType.OFFER, 2)
+        posts, _ = feed_cache.get_feed_page(Post.PostType.OFFER, self.donor_user)
+        self.assertEqual(posts, [])
+
+    def test_post_save_invalidates(self):
+        self.make_posts(self.donor_user, Post.PostType.OFFER, 1)
+        feed_cache.get_feed_page(Post.PostType.OFFER, self.donee_user)
+        post = self.make_posts(self.donor_user, Post.PostType.OFFER, 1)[0]
+        posts, _ = feed_cache.get_feed_page(Post.PostType.OFFER, self.donee_user)
+        self.assertEqual(posts[0], post)
+
+        post.status = Post.PostStatus.CANCELLED
+        post.save()
+        posts, _ = feed_cache.get_feed_page(Post.PostType.OFFER, self.donee_user)
+        self.assertNotIn(post, posts)
+
+    def test_pages_beyond_window_fall_back_to_db(self):
+        posts = self.make_posts(self.donor_user, Post.PostType.OFFER, 6)
+        with self.settings(FEED_CACHE_WINDOW=3, FEED_PAGE_SIZE=2):
+            page, cursor = feed_cache.get_feed_page(Post.PostType.OFFER, self.donee_user)
+            seen = list(page)
+            while cursor:
+                page, cursor = feed_cache.get_feed_page(
+                    Post.PostType.OFFER, self.donee_user, cursor
+                )
+                seen.extend(page)
+        self.assertEqual(seen, posts[::-1])
+
+
+# --- Caché de tarjetas (fragmentos) ---
+
+class CardCacheTests(SDCTestCase):
+
+    def test_cached_template_loader(self):
+        loader = engines.all()[0].engine.template_loaders[0]
+        self.assertIsInstance(loader, CachedLoader)
+
+    def test_cards_are_cached_by_id_and_updated_at(self):
+        first, second = self.make_posts(self.donee_user, Post.PostType.REQUEST, 2)
+        self.client.force_login(self.donor_user)
+        self.assertContains(self.client.get(reverse('donor_feed')), 'Post 0')
+
+        # Sin cambiar updated_at la tarjeta sale de la caché
+        Post.objects.filter(pk=first.pk).update(title='Título nuevo')
+        response = self.client.get(reverse('donor_feed'))
+        self.assertNotContains(response, 'Título nuevo')
+        # El formulario (csrf_token) no forma parte del fragmento
+        self.assertContains(response, 'csrfmiddlewaretoken', count=2)
+
+        first.refresh_from_db()
+        first.save()
+        self.assertContains(self.client.get(reverse('donor_feed')), 'Título nuevo')
+
+    def test_author_and_category_changes_refresh_the_card(self):
+        post, = self.make_posts(self.donee_user, Post.PostType.REQUEST, 1)
+        self.client.force_login(self.donor_user)
+        self.assertContains(self.client.get(reverse('donor_feed')), self.donee_user.email)
+
+        self.donee_user.email = 'nuevo-correo@example.com'
+        self.donee_user.save()
+        post.category.name = 'Categoría renombrada'
+        post.category.save()
+
+        response = self.client.get(reverse('donor_feed'))
+        self.assertContains(response, 'nuevo-correo@example.com')
+        self.assertContains(response, 'Categoría renombrada')
+
+    def test_unchanged_cards_are_not_rendered_again(self):
+        # Campañas: siguen ACTIVAS (en el feed) tras un compromiso
+        posts = self.make_posts(self.donee_user, Post.PostType.REQUEST, 3, is_campaign=True)
+        self.client.force_login(self.donor_user)
+        self.client.get(reverse('donor_feed'))
+        commit_to_post(posts[0].pk, self.donor_user, Decimal('0.5'))
+
+        with mock.patch('sdc_client.card_cache.Context', wraps=card_cache.Context) as rendered:
+            self.client.get(reverse('donor_feed'))
+        self.assertEqual(rendered.call_count, 1)
+
+
+# --- Compromisos ---
+
+class CommitmentTests(SDCTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.post = self.make_posts(
+            self.donee_user, Post.PostType.REQUEST, 1, quantity=Decimal('10')
+        )[0]
+
+    def test_partial_commit_moves_to_in_progress(self):
+        commit_to_post(self.post.pk, self.donor_user, Decimal('4'))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.quantity_committed, Decimal('4'))
+        self.assertEqual(self.post.remaining_quantity, Decimal('6'))
+        self.assertEqual(self.post.status, Post.PostStatus.IN_PROGRESS)
+
+    def test_full_commit_completes_post(self):
+        commit_to_post(self.post.pk, self.donor_user, Decimal('4'))
+        commit_to_post(self.post.pk, self.institution_user, Decimal('6'))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.status, Post.PostStatus.COMPLETED)
+        self.assertEqual(self.post.transactions.count(), 2)
+
+    def test_over_commit_is_rejected(self):
+        with self.assertRaises(CommitmentError):
+            commit_to_post(self.post.pk, self.donor_user, Decimal('11'))
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_cannot_commit_to_own_post(self):
+        with self.assertRaises(CommitmentError):
+            commit_to_post(self.post.pk, self.donee_user, Decimal('1'))
+
+    def test_campaign_stays_active_until_filled(self):
+        self.post.is_campaign = True
+        self.post.save()
+        commit_to_post(self.post.pk, self.donor_user, Decimal('4'))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.status, Post.PostStatus.ACTIVE)
+
+    def test_commit_view(self):
+        self.client.force_login(self.donor_user)
+        response = self.client.post(
+            reverse('commit_post', args=[self.post.pk]), {'quantity_committed': '2.5'}
+        )
+        self.assertRedirects(response, '/donor_feed', fetch_redirect_response=False)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.quantity_committed, Decimal('2.5'))
+
+    def test_commit_view_accepts_minimum_quantity(self):
+        self.client.force_login(self.donor_user)
+        response = self.client.post(
+            reverse('commit_post', args=[self.post.pk]), {'quantity_committed': '0.01'}
+        )
+        self.assertRedirects(response, '/donor_feed', fetch_redirect_response=False)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.quantity_committed, Decimal('0.01'))
+
+
+    def test_rejecting_a_commitment_releases_its_quantity(self):
+        commit_to_post(self.post.pk, self.donor_user, Decimal('4'))
+        commitment = commit_to_post(self.post.pk, self.institution_user, Decimal('6'))
+
+        commitment.status = Transaction.TransactionStatus.REJECTED
+        commitment.save()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.quantity_committed, Decimal('4'))
+        self.assertEqual(self.post.status, Post.PostStatus.IN_PROGRESS)
+
+        commitment.status = Transaction.TransactionStatus.APPROVED
+        commitment.save()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.quantity_committed, Decimal('10'))
+        self.assertEqual(self.post.status, Post.PostStatus.COMPLETED)
+
+    def test_rejecting_the_only_commitment_reactivates_the_post(self):
+        commitment = commit_to_post(self.post.pk, self.donor_user, Decimal('4'))
+        commitment.status = Transaction.TransactionStatus.REJECTED
+        commitment.save(update_fields=['status'])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.quantity_committed, Decimal('0'))
+        self.assertEqual(self.post.status, Post.PostStatus.ACTIVE)
+
+    def test_rejection_does_not_reopen_cancelled_posts(self):
+        commitment = commit_to_post(self.post.pk, self.donor_user, Decimal('4'))
+        Post.objects.filter(pk=self.post.pk).update(status=Post.PostStatus.CANCELLED)
+        commitment.status = Transaction.TransactionStatus.REJECTED
+        commitment.save()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.quantity_committed, Decimal('0'))
+        self.assertEqual(self.post.status, Post.PostStatus.CANCELLED)
+
+
+# --- Coincidencias ---
+
+class MatchingTests(SDCTestCase):
+
+    def make_matched_posts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            request = self.make_posts(
+                self.donee_user, Post.PostType.REQUEST, 1, quantity=Decimal('10')
+            )[0]
+            near = self.make_posts(
+                self.donor_user, Post.PostType.OFFER, 1, quantity=Decimal('10')
+            )[0]
+            far = self.make_posts(
+                self.institution_user, Post.PostType.OFFER, 1, quantity=Decimal('1')
+            )[0]
+        return request, near, far
+
+    def test_matches_are_upserted_on_save(self):
+        request, near, far = self.make_matched_posts()
+        matches = best_matches(request)
+        self.assertEqual([post for post, _ in matches], [near, far])
+        self.assertEqual(matches[0][1], 100)
+        self.assertEqual(best_matches(near)[0][0], request)
+
+    def test_closed_post_drops_matches(self):
+        request, near, far = self.make_matched_posts()
+        with self.captureOnCommitCallbacks(execute=True):
+            near.status = Post.PostStatus.CANCELLED
+            near.save()
+        self.assertEqual([post for post, _ in best_matches(request)], [far])
+
+    def test_other_categories_do_not_match(self):
+        other = Category.objects.create(name='Ropa')
+        with self.captureOnCommitCallbacks(execute=True):
+            request = self.make_posts(self.donee_user, Post.PostType.REQUEST, 1)[0]
+            self.make_posts(self.donor_user, Post.PostType.OFFER, 1, category=other)
+        self.assertEqual(best_matches(request), [])
+
+    def make_far_donor(self):
+        user = self.make_user('lejos@sdc.mx', '5500000077')
+        Donor.objects.create(
+            user=user, first_name='Sara', first_surname='Vega', second_surname='Luna',
+            curp='VELS900101MDFGNR07', city='Guadalajara', state='Jalisco',
+        )
+        return user
+
+    @override_settings(MATCH_CANDIDATE_LIMIT=2)
+    def test_best_match_outside_newest_window_is_scored(self):
+        far_donor = self.make_far_donor()
+        with self.captureOnCommitCallbacks(execute=True):
+            # La mejor coincidencia es la oferta más antigua
+            best = self.make_posts(self.donor_user, Post.PostType.OFFER, 1, quantity=Decimal('10'))[0]
+            self.make_posts(far_donor, Post.PostType.OFFER, 3, quantity=Decimal('1'))
+            request = self.make_posts(
+                self.donee_user, Post.PostType.REQUEST, 1, quantity=Decimal('10')
+            )[0]
+        self.assertEqual(best_matches(request)[0], (best, 100))
+
+    @override_settings(MATCH_CANDIDATE_LIMIT=1)
+    def test_resave_keeps_pairs_found_by_the_other_side(self):
+        far_donor = self.make_far_donor()
+        with self.captureOnCommitCallbacks(execute=True):
+            request = self.make_posts(
+                self.donee_user, Post.PostType.REQUEST, 1, quantity=Decimal('10')
+            )[0]
+            far = self.make_posts(far_donor, Post.PostType.OFFER, 1, quantity=Decimal('1'))[0]
+            near = self.make_posts(self.donor_user, Post.PostType.OFFER, 1, quantity=Decimal('10'))[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            request.save()
+        self.assertEqual([post for post, _ in best_matches(request)], [near, far])
+
+    def test_commitment_only_rescores_existing_pairs(self):
+        request, near, far = self.make_matched_posts()
+        with self.captureOnCommitCallbacks(execute=True), \
+                mock.patch('sdc_client.signals.update_matches_for') as update:
+            commit_to_post(request.pk, self.institution_user, Decimal('5'))
+        update.assert_not_called()
+        scores = dict(best_matches(request))
+        # Restan 5 de 10: la oferta de 10 ya no ajusta perfecto
+        self.assertEqual(scores[near], 90)
+
+    @override_settings(MATCH_CANDIDATE_LIMIT=1)
+    def test_rebuild_covers_offers_outside_every_top_n(self):
+        far_donor = self.make_far_donor()
+        with self.captureOnCommitCallbacks(execute=True):
+            request = self.make_posts(
+                self.donee_user, Post.PostType.REQUEST, 1, quantity=Decimal('10')
+            )[0]
+            far = self.make_posts(far_donor, Post.PostType.OFFER, 1, quantity=Decimal('1'))[0]
+            near = self.make_posts(self.donor_user, Post.PostType.OFFER, 1, quantity=Decimal('10'))[0]
+        incremental = set(PostMatch.objects.values_list('request_id', 'offer_id'))
+        self.assertIn((request.pk, far.pk), incremental)
+
+        call_command('rebuild_matches', '--clear', stdout=io.StringIO())
+        self.assertEqual(set(PostMatch.objects.values_list('request_id', 'offer_id')), incremental)
+
+    def test_rebuild_command(self):
+        request, near, far = self.make_matched_posts()
+        PostMatch.objects.all().delete()
+        call_command('rebuild_matches', batch_size=1, stdout=io.StringIO())
+        self.assertEqual(PostMatch.objects.filter(request=request).count(), 2)
+
+    def test_matches_view_is_author_only(self):
+        request, near, far = self.make_matched_posts()
+        self.client.force_login(self.donor_user)
+        response = self.client.get(reverse('post_matches', args=[request.pk]))
+        self.assertEqual(response.status_code, 404)
+
+        self.client.force_login(self.donee_user)
+        response = self.client.get(reverse('post_matches', args=[request.pk]))
+        self.assertContains(response, near.title)
+
+
+# --- Búsqueda ---
+
+class SearchTests(SDCTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.blankets = Post.objects.create(
+            author=self.donor_user, title='Cobijas de invierno', description='Nuevas',
+            category=self.category, post_type=Post.PostType.OFFER,
+        )
+        self.food = Post.objects.create(
+            author=self.donor_user, title='Despensa', description='Incluye cobijas',
+            category=self.category, post_type=Post.PostType.OFFER,
+        )
+        self.make_posts(self.donor_user, Post.PostType.OFFER, 3)
+
+    def test_title_matches_rank_first(self):
+        results = list(search_posts(Post.objects.all(), 'cobijas').order_by('-rank', '-id'))
+        self.assertEqual(results, [self.blankets, self.food])
+
+    def test_feed_search_is_paginated(self):
+        self.client.force_login(self.donee_user)
+        with self.settings(FEED_PAGE_SIZE=1):
+            response = self.client.get(reverse('donee_feed'), {'q': 'cobijas'})
+            self.assertEqual(response.context['feed_posts'], [self.blankets])
+            response = self.client.get(reverse('donee_feed'), {
+                'q': 'cobijas', 'cursor': response.context['feed_next_cursor'],
+            })
+            self.assertEqual(response.context['feed_posts'], [self.food])
+            self.assertIsNone(response.context['feed_next_cursor'])
+
+    def test_api_search(self):
+        self.client.force_login(self.donee_user)
+        response = self.client.get(reverse('api_search_posts'), {'q': 'cobijas'})
+        self.assertEqual(response.status_code, 401)  # sólo JWT
+
+        token = self.client.post(
+            reverse('api_login'),
+            {'email': self.donee_user.email, 'password': self.password},
+            content_type='application/json',
+        ).json()['access']
+        response = self.client.get(
+            reverse('api_search_posts'), {'q': 'cobijas', 'type': 'OFFER'},
+            HTTP_AUTHORIZATION=f'Bearer {token}',
+        )
+        ids = [post['id'] for post in response.json()['results']]
+        self.assertEqual(ids, [self.blankets.pk, self.food.pk])
+
+    @skipUnless(connection.vendor == 'postgresql', 'SearchRank sólo existe en PostgreSQL')
+    def test_tied_ranks_across_page_boundary(self):
+        tied = [
+            Post.objects.create(
+                author=self.donor_user, title='Juguetes usados', description='Juguetes',
+                category=self.category, post_type=Post.PostType.OFFER,
+            )
+            for _ in range(5)
+        ]
+        queryset = search_posts(Post.objects.all(), 'juguetes')
+        seen, cursor = [], None
+        while True:
+            posts, cursor = paginate_by_rank(queryset, cursor, page_size=2)
+            seen.extend(post.pk for post in posts)
+            if cursor is None:
+                break
+        self.assertEqual(seen, sorted((post.pk for post in tied), reverse=True))
+
+
+# --- API de feeds ---
+
+class FeedAPITests(SDCTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.offers = self.make_posts(self.donor_user, Post.PostType.OFFER, 3)
+        self.make_posts(self.donee_user, Post.PostType.REQUEST, 2)
+
+    def api_get(self, url_name, user, **params):
+        token = RefreshToken.for_user(user).access_token
+        return self.client.get(
+            reverse(url_name), params, HTTP_AUTHORIZATION=f'Bearer {token}',
+        )
+
+    def test_requires_jwt(self):
+        self.client.force_login(self.donee_user)
+        self.assertEqual(self.client.get(reverse('api_donee_feed')).status_code, 401)
+
+    def test_feed_embeds_author_and_category(self):
+        data = self.api_get('api_donee_feed', self.donee_user).json()
+        self.assertEqual(len(data['results']), 3)
+        first = data['results'][0]
+        self.assertEqual(first['author'], {
+            'id': self.donor_user.pk,
+            'email': self.donor_user.email,
+            'role': CustomUser.Role.DONOR,
+        })
+        self.assertEqual(first['category'], {'id': self.category.pk, 'name': self.category.name})
+
+    def test_sparse_fields_and_cursor(self):
+        with self.settings(FEED_PAGE_SIZE=2):
+            data = self.api_get('api_donee_feed', self.donee_user, fields='id,title').json()
+            self.assertEqual(set(data['results'][0]), {'id', 'title'})
+            data = self.api_get(
+                'api_donee_feed', self.donee_user, fields='id', cursor=data['next_cursor'],
+            ).json()
+            self.assertEqual(len(data['results']), 1)
+            self.assertIsNone(data['next_cursor'])
+
+    def test_unknown_field_is_rejected(self):
+        response = self.api_get('api_donee_feed', self.donee_user, fields='id,password')
+        self.assertEqual(response.status_code, 400)
+
+    def test_my_posts(self):
+        data = self.api_get('api_my_posts', self.donor_user, type='OFFER').json()
+        self.assertEqual(len(data['results']), 3)
+        self.assertEqual(self.api_get('api_my_posts', self.donor_user, type='REQUEST').json()['results'], [])
+
+    def test_query_count_does_not_grow(self):
+        def fetch():
+            cache.clear()
+            for url_name in ('api_institution_feed', 'api_my_posts'):
+                self.assertEqual(self.api_get(url_name, self.institution_user).status_code, 200)
+
+        def grow():
+            self.make_posts(self.donor_user, Post.PostType.OFFER, 5)
+            self.make_posts(self.institution_user, Post.PostType.REQUEST, 5)
+
+        self.assertQueriesConstant(fetch, grow)
+
+
+# --- Conexiones a la BBDD ---
+
+class BenchDBConnectionsTests(SDCTestCase):
+
+    def test_reports_each_available_mode(self):
+        out = io.StringIO()
+        call_command('bench_db_connections', iterations=5, stdout=out)
+        output = out.getvalue()
+        self.assertIn('sin_persistencia: media', output)
+        self.assertIn('persistente: media', output)
+
+
+# --- Benchmarks ---
+
+class BenchHotPathsTests(SDCTestCase):
+
+    def run_bench(self, **options):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        output = os.path.join(directory.name, 'resultados.json')
+        call_command(
+            'bench_hot_paths', current_db=True, users=6, posts=12, transactions=5,
+            iterations=1, warmup=0, output=output, stdout=io.StringIO(), **options
+        )
+        with open(output, encoding='utf-8') as handle:
+            return output, json.load(handle)
+
+    def test_writes_results_for_every_scenario(self):
+        _, report = self.run_bench()
+        self.assertEqual(set(report['results']), set(SCENARIOS))
+        self.assertEqual(report['dataset']['posts'], 12)
+        self.assertEqual(Post.objects.filter(title__startswith='Publicación').count(), 12)
+        for metrics in report['results'].values():
+            self.assertGreater(metrics['throughput_rps'], 0)
+
+    def test_regressions_against_baseline(self):
+        baseline, report = self.run_bench(scenarios=['donee_feed'])
+        faster = {'results': {'donee_feed': {'p50_ms': 0.0001, 'p99_ms': 0.0001}}}
+        with open(baseline, 'w', encoding='utf-8') as handle:
+            json.dump(faster, handle)
+
+        self.assertEqual(
+            compare_to_baseline(report['results'], report['results'], 0.2), []
+        )
+        with self.assertRaises(CommandError):
+            self.run_bench(scenarios=['donee_feed'], baseline=baseline, fail_on_regression=True)
+
+
+# --- Métricas por petición ---
+
+class RequestMetricsTests(SDCTestCase):
+
+    @override_settings(REQUEST_TIMING_HEADER=False)
+    def test_server_timing_header_can_be_disabled(self):
+        self.client.force_login(self.donee_user)
+        self.assertNotIn('Server-Timing', self.client.get(reverse('donee_feed')))
+
+    @override_settings(REQUEST_TIMING_HEADER=True)
+    def test_server_timing_header(self):
+        self.make_posts(self.donor_user, Post.PostType.OFFER, 2)
+        self.client.force_login(self.donee_user)
+        header = self.client.get(reverse('donee_feed'))['Server-Timing']
+        self.assertRegex(header, r'^db;dur=[\d.]+;desc="[1-9]\d* queries", tpl;dur=[\d.]+, total;dur=')
+        self.assertNotIn('tpl;dur=0.0,', header)
+
+    def test_metrics_aggregates_worker_files(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        # Archivo de otro worker con una petición a donee_feed
+        other = {'sdc_request_queries': {'donee_feed': [0, 0, 1, 0, 0, 0, 0, 0, 4.0]}}
+        with open(os.path.join(directory.name, 'sdc-1-abc.json'), 'w') as handle:
+            json.dump(other, handle)
+
+        with self.settings(METRICS_DIR=directory.name, METRICS_TOKEN='secreto'):
+            self.client.force_login(self.donee_user)
+            self.client.get(reverse('donee_feed'))
+            body = self.client.get(
+                reverse('metrics'), HTTP_AUTHORIZATION='Bearer secreto'
+            ).content.decode()
+
+        self.assertIn('# TYPE sdc_request_duration_seconds histogram', body)
+        own = metrics._snapshot()[1]['sdc_request_queries']['donee_feed']
+        expected_count = sum(own[:-1]) + 1
+        self.assertIn(f'sdc_request_queries_count{{view="donee_feed"}} {expected_count}', body)
+        self.assertIn('sdc_request_queries_bucket{view="donee_feed",le="5"}', body)
+
+    def test_metrics_token(self):
+        with self.settings(METRICS_TOKEN='secreto'):
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 401)
+            response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secreto')
+            self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_metrics_without_token_is_staff_only(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+        self.client.force_login(self.donee_user)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+
+        CustomUser.objects.filter(pk=self.donee_user.pk).update(is_staff=True)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
+
+
+# --- Archivos estáticos (manifest + WhiteNoise) ---
+
+class StaticPipelineTests(SimpleTestCase):
+
+    def test_hashed_precompressed_and_immutable(self):
+        with tempfile.TemporaryDirectory() as root, override_settings(
+            STATIC_ROOT=root,
+            STORAGES={
+                'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+                'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+            },
+            WHITENOISE_USE_FINDERS=False,
+            WHITENOISE_AUTOREFRESH=False,
+        ):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            url = static('login/scripts/register-validation.js')
+            self.assertRegex(url, r'^/static/login/scripts/register-validation\.[0-9a-f]{12}\.js$')
+            hashed = os.path.join(root, url[len('/static/'):])
+            self.assertTrue(os.path.exists(hashed + '.gz'))
+            self.assertTrue(os.path.exists(hashed + '.br'))
+
+            # Cliente nuevo: WhiteNoise lee STATIC_ROOT al crear el middleware
+            response = Client().get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Encoding'], 'br')
+            self.assertIn('immutable', response['Cache-Control'])
+            response.close()
+
+            page = Client().get(reverse('register'))
+            self.assertContains(page, url)
+
+
+# --- Queries lentas ---
+
+class SlowQueryTests(SDCTestCase):
+
+    @override_settings(SLOW_QUERY_EXPLAIN_MAX_FINGERPRINTS=2)
+    def test_explained_fingerprints_are_bounded(self):
+        self.addCleanup(slow_queries._explained_at.clear)
+        for i in range(3):
+            slow_queries.explain(f'huella-{i}', 'SELECT 1', ())
+        self.assertEqual(list(slow_queries._explained_at), ['huella-1', 'huella-2'])
+
+    def test_normalize_sql(self):
+        self.assertEqual(
+            slow_queries.normalize_sql(
+                "SELECT * FROM t WHERE id IN (%s, %s,  %s) AND name = 'x' LIMIT 21"
+            ),
+            'SELECT * FROM t WHERE id IN (...) AND name = ? LIMIT ?',
+        )
+
+    def test_capture_and_report(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        log = os.path.join(directory.name, 'slow.jsonl')
+        slow_queries._explained_at.clear()
+        self.make_posts(self.donor_user, Post.PostType.OFFER, 2)
+        self.client.force_login(self.donee_user)
+
+        with self.settings(SLOW_QUERY_THRESHOLD_MS=0, SLOW_QUERY_LOG=log), \
+                connection.execute_wrapper(slow_queries.capture_slow_query), \
+                self.assertLogs('sdc_client.slow_queries', 'WARNING'):
+            self.client.get(reverse('donee_feed'))
+            # Esperar al hilo de EXPLAIN (un solo worker, en orden)
+            slow_queries._executor.submit(lambda: None).result()
+
+        records = list(slow_queries.read_log(log))
+        self.assertTrue(records)
+        self.assertEqual({record['view'] for record in records}, {'donee_feed'})
+        self.assertTrue(any(record['plan'] for record in records))
+        frames = {record['frame'] for record in records if record['frame']}
+        self.assertTrue(frames)
+        self.assertFalse(any('metrics.py' in frame for frame in frames))
+
+        out = io.StringIO()
+        call_command('slow_queries_report', log=log, top=3, plans=True, stdout=out)
+        self.assertIn('1. [', out.getvalue())
+        self.assertIn('Vistas: donee_feed', out.getvalue())
+
+
+# --- Reportes ---
+
+class ReportRollupTests(SDCTestCase):
+
+    def rollup_rows(self):
+        posts = {
+            (row.day, row.category_id, row.state, row.post_type, row.status):
+                (row.posts, row.quantity, row.quantity_committed)
+            for row in PostDailyStats.objects.exclude(posts=0)
+        }
+        transactions = {
+            (row.day, row.category_id, row.state, row.post_type, row.status):
+                (row.transactions, row.quantity_committed)
+            for row in TransactionDailyStats.objects.exclude(transactions=0)
+        }
+        return posts, transactions
+
+    def test_incremental_rollups_match_rebuild(self):
+        offer, other = self.make_posts(self.donor_user, Post.PostType.OFFER, 2, quantity=Decimal('10'))
+        self.make_posts(self.donee_user, Post.PostType.REQUEST, 1)
+        commit_to_post(offer.pk, self.donee_user, Decimal('4'))
+        commit_to_post(offer.pk, self.institution_user, Decimal('6'))  # completa el post
+        Transaction.objects.filter(post=offer).first().delete()
+        other.status = Post.PostStatus.CANCELLED
+        other.save()
+
+        incremental = self.rollup_rows()
+        reports.rebuild_rollups()
+        self.assertEqual(incremental, self.rollup_rows())
+
+        totals = PostDailyStats.objects.filter(status=Post.PostStatus.COMPLETED).get()
+        self.assertEqual((totals.posts, totals.quantity_committed), (1, Decimal('10')))
+
+    def test_api_summary(self):
+        self.make_posts(self.donor_user, Post.PostType.OFFER, 3, quantity=Decimal('2'))
+        token = RefreshToken.for_user(self.institution_user).access_token
+        response = self.client.get(
+            reverse('api_reports_summary'), HTTP_AUTHORIZATION=f'Bearer {token}',
+        )
+        data = response.json()
+        self.assertEqual(data['posts']['totals']['total_posts'], 3)
+        self.assertEqual(data['posts']['by_state'][0]['state'], 'Baja California')
+
+        token = RefreshToken.for_user(self.donee_user).access_token
+        response = self.client.get(
+            reverse('api_reports_summary'), HTTP_AUTHORIZATION=f'Bearer {token}',
+        )
+        self.assertEqual(response.status_code, 403)
+
+        token = RefreshToken.for_user(self.institution_user).access_token
+        response = self.client.get(
+            reverse('api_reports_summary'), {'from': 'ayer'}, HTTP_AUTHORIZATION=f'Bearer {token}',
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_out_of_range_filters(self):
+        token = RefreshToken.for_user(self.institution_user).access_token
+        get = lambda **params: self.client.get(
+            reverse('api_reports_summary'), params, HTTP_AUTHORIZATION=f'Bearer {token}',
+        )
+        self.assertEqual(get(category='99999999999999999999999').status_code, 400)
+        self.assertEqual(get(category='-1').status_code, 400)
+        # Rangos pegados a date.min se recortan en lugar de desbordar
+        self.assertEqual(get(to='0001-01-02').json()['from'], '0001-01-01')
+        self.assertEqual(get(**{'from': '0001-01-01', 'to': '0001-01-02'}).status_code, 200)
+
+        self.client.force_login(self.institution_user)
+        response = self.client.get(reverse('reports_dashboard'), {'category': '99999999999999999999999'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Filtros no válidos')
+
+    def test_dashboard_reads_only_rollups(self):
+        self.client.force_login(self.institution_user)
+
+        def load():
+            self.assertEqual(self.client.get(reverse('reports_dashboard')).status_code, 200)
+
+        def grow():
+            posts = self.make_posts(self.donor_user, Post.PostType.OFFER, 5)
+            commit_to_post(posts[0].pk, self.donee_user, Decimal('1'))
+
+        self.assertQueriesConstant(load, grow)
+
+
+# --- Ciclo de vida: caducidad y archivado ---
+
+class PostLifecycleTests(SDCTestCase):
+
+    def age(self, posts, days):
+        Post.objects.filter(pk__in=[p.pk for p in posts]).update(
+            updated_at=timezone.now() - timedelta(days=days)
+        )
+
+    def post_rollups(self):
+        return sorted(
+            PostDailyStats.objects.exclude(posts=0)
+            .values_list('category_id', 'state', 'post_type', 'status', 'posts', 'quantity_committed')
+        )
+
+    def test_expire_closes_stale_posts_in_batches(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            committed, abandoned, fresh = self.make_posts(
+                self.donee_user, Post.PostType.REQUEST, 3, quantity=Decimal('10')
+            )
+            offer = self.make_posts(self.donor_user, Post.PostType.OFFER, 1)[0]
+        commit_to_post(committed.pk, self.donor_user, Decimal('2'))
+        Post.objects.filter(pk=committed.pk).update(status=Post.PostStatus.ACTIVE)
+        reports.rebuild_rollups()
+        self.age([committed, abandoned, offer], 100)
+        self.assertTrue(PostMatch.objects.filter(request=abandoned).exists())
+
+        self.assertEqual(lifecycle.expire_stale_posts(stale_days=90, batch_size=1), 3)
+
+        statuses = dict(Post.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[committed.pk], Post.PostStatus.COMPLETED)
+        self.assertEqual(statuses[abandoned.pk], Post.PostStatus.CANCELLED)
+        self.assertEqual(statuses[fresh.pk], Post.PostStatus.ACTIVE)
+        # La oferta se cerró: ya no coincide ni con la solicitud vigente
+        self.assertFalse(PostMatch.objects.exists())
+
+        incremental = self.post_rollups()
+        reports.rebuild_rollups()
+        self.assertEqual(incremental, self.post_rollups())
+
+    def test_archive_moves_closed_posts_out_of_post(self):
+        old, recent = self.make_posts(
+            self.donee_user, Post.PostType.REQUEST, 2, quantity=Decimal('3')
+        )
+        kept = self.make_posts(self.donor_user, Post.PostType.OFFER, 1, quantity=Decimal('1'))[0]
+        commit_to_post(old.pk, self.donor_user, Decimal('3'))
+        commitment = commit_to_post(kept.pk, self.institution_user, Decimal('1'))
+        warehouse = Warehouse.objects.create(name='Centro', city='Tijuana', state='BC', address='1')
+        inventory.receive(warehouse.pk, Decimal('1'), commitment=commitment)
+        Post.objects.filter(pk=recent.pk).update(status=Post.PostStatus.CANCELLED)
+        self.age([old, kept], 200)
+        reports.rebuild_rollups()
+        before = self.post_rollups()
+
+        self.assertEqual(lifecycle.archive_closed_posts(retention_days=180), 1)
+
+        self.assertFalse(Post.objects.filter(pk=old.pk).exists())
+        self.assertEqual(Post.objects.filter(pk__in=[recent.pk, kept.pk]).count(), 2)
+        archived = ArchivedPost.objects.get(pk=old.pk)
+        self.assertEqual(archived.status, Post.PostStatus.COMPLETED)
+        self.assertEqual(ArchivedTransaction.objects.get().post_id, old.pk)
+
+        # Los reportes conservan el historial, también tras reconstruir
+        self.assertEqual(before, self.post_rollups())
+        reports.rebuild_rollups()
+        self.assertEqual(before, self.post_rollups())
+
+        token = RefreshToken.for_user(self.donee_user).access_token
+        response = self.client.get(
+            reverse('api_my_posts'), {'archived': '1'}, HTTP_AUTHORIZATION=f'Bearer {token}',
+        )
+        self.assertEqual([post['id'] for post in response.json()['results']], [old.pk])
+
+    def test_command_dry_run(self):
+        posts = self.make_posts(self.donee_user, Post.PostType.REQUEST, 2)
+        self.age(posts, 100)
+        out = io.StringIO()
+        call_command('post_lifecycle', '--dry-run', stdout=out)
+        self.assertIn('Por cerrar: 2', out.getvalue())
+        self.assertEqual(Post.objects.filter(status=Post.PostStatus.ACTIVE).count(), 2)
+
+        call_command('post_lifecycle', '--skip-archive', stdout=io.StringIO())
+        self.assertFalse(Post.objects.filter(status=Post.PostStatus.ACTIVE).exists())
+
+
+# --- Almacenes e inventario ---
+
+class InventoryTests(SDCTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.warehouse = Warehouse.objects.create(
+            name='Almacén Centro', city='Tijuana', state='Baja California',
+            address='Calle 1', institution=self.institution_user.institution,
+        )
+        self.other = Warehouse.objects.create(
+            name='Almacén Norte', city='Tijuana', state='Baja California', address='Calle 2',
+        )
+
+    def test_movements_update_stock_and_ledger(self):
+        inventory.receive(self.warehouse.pk, Decimal('10'), self.category.pk)
+        inventory.dispatch(self.warehouse.pk, Decimal('3'), self.category.pk)
+        inventory.adjust(self.warehouse.pk, self.category.pk, Decimal('-2'), note='Merma')
+        inventory.transfer(self.warehouse.pk, self.other.pk, self.category.pk, Decimal('4'))
+
+        self.assertEqual(inventory.stock_of(self.warehouse.pk, self.category.pk), Decimal('1'))
+        self.assertEqual(inventory.stock_of(self.other.pk, self.category.pk), Decimal('4'))
+        self.assertEqual(StockMovement.objects.count(), 5)
+        self.assertEqual(inventory.reconcile(), [])
+
+    def test_dispatch_cannot_leave_negative_stock(self):
+        inventory.receive(self.warehouse.pk, Decimal('2'), self.category.pk)
+        with self.assertRaises(inventory.InventoryError):
+            inventory.dispatch(self.warehouse.pk, Decimal('3'), self.category.pk)
+        with self.assertRaises(inventory.InventoryError):
+            inventory.transfer(self.warehouse.pk, self.other.pk, self.category.pk, Decimal('5'))
+        self.assertEqual(inventory.stock_of(self.warehouse.pk, self.category.pk), Decimal('2'))
+        self.assertEqual(StockMovement.objects.count(), 1)
+
+    def test_movement_linked_to_commitment(self):
+        post = self.make_posts(self.donor_user, Post.PostType.OFFER, 1, quantity=Decimal('5'))[0]
+        commitment = commit_to_post(post.pk, self.institution_user, Decimal('5'))
+        movement = inventory.receive(self.warehouse.pk, Decimal('5'), commitment=commitment)
+        self.assertEqual((movement.category_id, movement.transaction_id), (self.category.pk, commitment.pk))
+
+        other_category = Category.objects.create(name='Ropa')
+        with self.assertRaises(inventory.InventoryError):
+            inventory.receive(self.warehouse.pk, Decimal('1'), other_category.pk, commitment=commitment)
+
+    def test_ledger_is_append_only(self):
+        movement = inventory.receive(self.warehouse.pk, Decimal('1'), self.category.pk)
+        with self.assertRaises(ValueError):
+            movement.save()
+        with self.assertRaises(ValueError):
+            movement.delete()
+
+    def test_reconcile_command_reports_and_fixes(self):
+        inventory.receive(self.warehouse.pk, Decimal('7'), self.category.pk)
+        WarehouseStock.objects.update(quantity=Decimal('9'))
+
+        out = io.StringIO()
+        with self.assertRaises(CommandError):
+            call_command('reconcile_inventory', '--fail-on-mismatch', stdout=out)
+        self.assertIn('existencia 9', out.getvalue())
+
+        call_command('reconcile_inventory', '--fix', stdout=io.StringIO())
+        self.assertEqual(inventory.stock_of(self.warehouse.pk, self.category.pk), Decimal('7'))
+        self.assertEqual(inventory.reconcile(), [])
+
+    def test_stock_api_does_not_read_ledger(self):
+        token = RefreshToken.for_user(self.institution_user).access_token
+        url = reverse('api_warehouse_stock', args=[self.warehouse.pk])
+
+        def load():
+            response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {token}')
+            self.assertEqual(response.status_code, 200)
+
+        def grow():
+            for _ in range(5):
+                inventory.receive(self.warehouse.pk, Decimal('1'), self.category.pk)
+
+        load()  # El usuario del token queda en caché
+        self.assertQueriesConstant(load, grow)
+        with CaptureQueriesContext(connection) as ctx:
+            load()
+        self.assertFalse(any('stockmovement' in q['sql'] for q in ctx.captured_queries))
+
+        response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.json()['stock'][0]['quantity'], '5.00')
+
+        token = RefreshToken.for_user(self.donor_user).access_token
+        response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, 403)
+
+
+# --- Importación masiva ---
+
+class ImportProfilesTests(SDCTestCase):
+
+    CSV = (
+        'role,email,phone,password,first_name,first_surname,second_surname,curp,'
+        'city,state,name,rfc,address\n'
+        'donee,nueva@sdc.mx,5511111111,Password123,María,Soto,Díaz,SODM900101MDFTZR03,'
+        'Tijuana,Baja California,,,\n'
+        'institution,casa@sdc.mx,,,,,,,Tijuana,Baja California,Casa Hogar,CAH900101AB2,Calle 1\n'
+        'donor,donor@sdc.mx,5522222222,,Pedro,Paz,Luna,PAPL900101HDFZNS04,'
+        'Tijuana,Baja California,,,\n'
+        'donor,otro@sdc.mx,12AB,,Pedro,Paz,Luna,PAPL900101HDFZNS05,Tijuana,Baja California,,,\n'
+        'donee,repetida@sdc.mx,5533333333,,Rosa,Mar,Sol,SODM900101MDFTZR03,'
+        'Tijuana,Baja California,,,\n'
+    )
+
+    def run_import(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'perfiles.csv')
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(self.CSV)
+        call_command('import_profiles', path, workers=1, stdout=io.StringIO())
+        with open(f'{path}.errors.csv', encoding='utf-8') as handle:
+            return handle.read()
+
+    def test_import_creates_users_profiles_and_roles(self):
+        self.run_import()
+        donee = CustomUser.objects.get(email='nueva@sdc.mx')
+        self.assertEqual(donee.role, CustomUser.Role.DONEE)
+        self.assertTrue(donee.check_password('Password123'))
+        self.assertEqual(donee.donee.curp, 'SODM900101MDFTZR03')
+
+        institution = CustomUser.objects.get(email='casa@sdc.mx')
+        self.assertEqual(institution.role, CustomUser.Role.INSTITUTION)
+        self.assertFalse(institution.has_usable_password())
+
+    def test_invalid_and_duplicate_rows_are_reported(self):
+        report = self.run_import()
+        self.assertIn('4,donor@sdc.mx,Ya registrado: email.', report)
+        self.assertIn('5,otro@sdc.mx,El teléfono debe contener solo números.', report)
+        self.assertIn('6,repetida@sdc.mx,Ya registrado: curp.', report)
+        self.assertFalse(CustomUser.objects.filter(email='repetida@sdc.mx').exists())
+
+    def test_conflict_after_validation_reports_only_that_row(self):
+        from .management.commands.import_profiles import Command, clean_row
+
+        rows = list(csv.DictReader(io.StringIO(self.CSV)))
+        # Otro proceso registró el correo después de validar el lote
+        taken = dict(rows[2], email=self.donee_user.email, curp='PAPL900101HDFZNS06')
+        chunk = [(2, clean_row(rows[0])), (3, clean_row(rows[1])), (4, clean_row(taken))]
+        executor = mock.Mock(map=lambda func, items, chunksize: map(func, items))
+
+        created, errors = Command().import_chunk(chunk, executor)
+        self.assertEqual(created, 2)
+        self.assertEqual([(line, email) for line, email, _ in errors], [(4, self.donee_user.email)])
+        self.assertEqual(CustomUser.objects.filter(email__in=['nueva@sdc.mx', 'casa@sdc.mx']).count(), 2)
+
+
+# --- Login con hashing acotado ---
+
+class LoginExecutorTests(SDCTestCase):
+
+    def login(self, url_name='api_login'):
+        return self.client_class().post(
+            reverse(url_name),
+            {'email': self.donor_user.email, 'password': self.password},
+            content_type='application/json',
+        )
+
+    def test_excess_logins_are_shed_with_429(self):
+        with mock.patch('sdc_client.login_executor._slots', threading.BoundedSemaphore(1)) as slots:
+            slots.acquire()
+            response = self.login()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def test_outdated_hash_is_upgraded_on_login(self):
+        CustomUser.objects.filter(pk=self.donor_user.pk).update(
+            password=make_password(self.password, hasher='pbkdf2_sha1')
+        )
+        self.assertEqual(self.login().status_code, 200)
+        self.donor_user.refresh_from_db()
+        algorithm = self.donor_user.password.split('$', 1)[0]
+        self.assertEqual(algorithm, get_hasher().algorithm)
+
+
+class AsyncLoginTests(TransactionTestCase):
+    """El pool de login usa su propia conexión: los datos deben estar confirmados."""
+
+    def setUp(self):
+        Status.objects.create(id=1, name='Activo', description='Usuario activo')
+        user = CustomUser.objects.create_user(
+            email='async@sdc.mx', phone='5599999999', password='Password123'
+        )
+        Donor.objects.create(
+            user=user, first_name='Eva', first_surname='Ríos', second_surname='Mar',
+            curp='RIME900101MDFSRV06', city='Tijuana', state='Baja California',
+        )
+
+    def test_async_login(self):
+        response = self.client.post(
+            reverse('api_login_async'),
+            {'email': 'async@sdc.mx', 'password': 'Password123'},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['user']['redirect_url'], '/donor_feed')
+
+    def test_async_login_rejects_bad_credentials(self):
+        response = self.client.post(
+            reverse('api_login_async'),
+            {'email': 'async@sdc.mx', 'password': 'incorrecta'},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 401)
+
+
+# --- Throttling de login ---
+
+class LoginThrottleTests(SDCTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Reloj fijo al inicio de una ventana: las pruebas no dependen de
+        # cuánto tarda cada hash de contraseña
+        patcher = mock.patch('sdc_client.throttles.time')
+        self.clock = patcher.start().time
+        self.clock.return_value = 3_600_000.0
+        self.addCleanup(patcher.stop)
+
+    def attempt(self, email, url_name='api_login', **extra):
+        return self.client.post(
+            reverse(url_name), {'email': email, 'password': 'incorrecta'},
+            content_type='application/json', **extra
+        )
+
+    @mock.patch.dict('django.conf.settings.LOGIN_THROTTLE_BUCKETS', {'login_email': (3, 1)})
+    def test_email_bucket_rejects_before_hashing(self):
+        for _ in range(3):
+            self.assertEqual(self.attempt(self.donor_user.email).status_code, 401)
+        with self.assertMaxQueries(0), \
+                mock.patch('sdc_client.login_executor.authenticate') as authenticate:
+            response = self.attempt(self.donor_user.email)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(int(response['Retry-After']), 180)  # Ventana de 3 minutos
+        authenticate.assert_not_called()
+
+        # Otra cuenta desde la misma IP no se ve afectada
+        self.assertEqual(self.attempt(self.donee_user.email).status_code, 401)
+
+    @mock.patch.dict('django.conf.settings.LOGIN_THROTTLE_BUCKETS', {'login_ip': (2, 1)})
+    def test_ip_bucket(self):
+        self.attempt('a@sdc.mx')
+        self.attempt('b@sdc.mx')
+        self.assertEqual(self.attempt('c@sdc.mx').status_code, 429)
+        other_ip = self.attempt('c@sdc.mx', REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(other_ip.status_code, 401)
+
+    @mock.patch.dict('django.conf.settings.LOGIN_THROTTLE_BUCKETS', {'login_ip': (2, 1)})
+    def test_spoofed_forwarded_for_is_ignored(self):
+        for i in range(2):
+            self.attempt('a@sdc.mx', HTTP_X_FORWARDED_FOR=f'203.0.113.{i}')
+        response = self.attempt('a@sdc.mx', HTTP_X_FORWARDED_FOR='203.0.113.9')
+        self.assertEqual(response.status_code, 429)
+
+    @mock.patch.dict('django.conf.settings.LOGIN_THROTTLE_BUCKETS',
+                     {'login_ip': (1, 1), 'login_email': (2, 1)})
+    def test_blocked_ip_does_not_drain_email_bucket(self):
+        self.attempt(self.donor_user.email)
+        for url_name in ('api_login', 'api_login_async'):
+            for _ in range(3):
+                self.assertEqual(self.attempt(self.donor_user.email, url_name=url_name).status_code, 429)
+        # La cuenta sigue disponible desde otra IP
+        other_ip = self.attempt(self.donor_user.email, REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(other_ip.status_code, 401)
+
+    @mock.patch.dict('django.conf.settings.LOGIN_THROTTLE_BUCKETS', {'login_ip': (2, 1)})
+    def test_no_burst_across_window_boundary(self):
+        # Ventana de 120 s: dos intentos al final de una y uno al inicio de la siguiente
+        self.clock.return_value = 3_600_000.0 + 119
+        self.attempt('a@sdc.mx')
+        self.attempt('b@sdc.mx')
+        self.clock.return_value = 3_600_000.0 + 121
+        response = self.attempt('c@sdc.mx')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(int(response['Retry-After']), 59)  # Hasta t=180
+
+        # A mitad de la ventana siguiente, la anterior pesa la mitad: cabe uno
+        self.clock.return_value = 3_600_000.0 + 180
+        self.assertEqual(self.attempt('c@sdc.mx').status_code, 401)
+        self.assertEqual(self.attempt('d@sdc.mx').status_code, 429)
+
+    def test_parallel_attempts_share_the_counter(self):
+        with mock.patch.dict(settings.LOGIN_THROTTLE_BUCKETS, {'login_ip': (5, 1)}):
+            results = []
+
+            def attempt():
+                request = RequestFactory().post('/api/login/')
+                results.append(LoginIPThrottle().allow_request(request, None))
+
+            threads = [threading.Thread(target=attempt) for _ in range(20)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(results.count(True), 5)
+
+    @mock.patch.dict('django.conf.settings.LOGIN_THROTTLE_BUCKETS', {'login_ip': (5, 1)})
+    def test_cache_failure_fails_closed_for_login(self):
+        with mock.patch('django.core.cache.backends.locmem.LocMemCache.incr', side_effect=ConnectionError), \
+                self.assertLogs('sdc_client.throttles', 'ERROR'):
+            response = self.attempt(self.donor_user.email)
+        self.assertEqual(response.status_code, 429)
+
+    @mock.patch.dict('django.conf.settings.LOGIN_THROTTLE_BUCKETS', {'login_email': (1, 1)})
+    def test_async_login_is_throttled(self):
+        self.attempt(self.donor_user.email)
+        response = self.attempt(self.donor_user.email, url_name='api_login_async')
+        self.assertEqual(response.status_code, 429)
+
+
+# --- Disponibilidad en el registro ---
+
+class RegistrationAvailabilityTests(SDCTestCase):
+
+    def person_payload(self, **overrides):
+        payload = {
+            'person_first_name': 'Nueva', 'person_first_surname': 'Cuenta',
+            'person_second_surname': 'Prueba', 'person_curp': 'lopa900101mdfprn01',
+            'person_city': 'Tijuana', 'person_state': 'Baja California',
+            'person_email': 'nueva@sdc.mx', 'person_phone': '5500000009',
+            'person_password': 'Password123', 'confirm_person_password': 'Password123',
+            'user_type': 'donee',
+        }
+        payload.update(overrides)
+        return payload
+
+    def test_api_checks_all_fields_in_one_query_and_caches(self):
+        params = {
+            'email': 'DONOR@sdc.mx', 'phone': '5599999999', 'curp': 'lopa900101mdfprn01',
+            'rfc': 'ABC900101AB1', 'name': 'Otra institución',
+        }
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('api_register_availability'), params)
+        self.assertEqual(response.json()['available'], {
+            'email': True, 'phone': True, 'curp': False, 'rfc': False, 'name': True,
+        })
+        # 'DONOR@sdc.mx' no es el mismo email: sólo se normaliza el dominio
+        response = self.client.get(reverse('api_register_availability'), {'email': 'donor@SDC.MX'})
+        self.assertFalse(response.json()['available']['email'])
+
+        with self.assertNumQueries(0):
+            self.client.get(reverse('api_register_availability'), params)
+        self.assertEqual(self.client.get(reverse('api_register_availability')).status_code, 400)
+
+    def test_duplicate_is_rejected_before_hashing(self):
+        with mock.patch('sdc_client.models.CustomUserManager.create_user') as create_user:
+            response = self.client.post(reverse('register'), self.person_payload())
+        create_user.assert_not_called()
+        self.assertContains(response, 'Este CURP ya está registrado.')
+
+        response = self.client.post(reverse('register'), self.person_payload(
+            person_curp='nuev900101hdfxxx00', person_email='inst@sdc.mx', person_phone='5500000001',
+        ))
+        self.assertContains(response, 'Este correo ya está registrado.')
+        self.assertContains(response, 'Este teléfono ya está registrado.')
+
+    def test_registration_marks_cached_values_as_taken(self):
+        url = reverse('api_register_availability')
+        self.assertTrue(self.client.get(url, {'email': 'nueva@sdc.mx'}).json()['available']['email'])
+
+        response = self.client.post(reverse('register'), self.person_payload(
+            person_curp='nuev900101hdfxxx00',
+        ))
+        self.assertRedirects(response, reverse('auth'), fetch_redirect_response=False)
+        self.assertEqual(Donee.objects.get(user__email='nueva@sdc.mx').curp, 'NUEV900101HDFXXX00')
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'email': 'nueva@sdc.mx'})
+        self.assertFalse(response.json()['available']['email'])
+
+    @mock.patch.dict('django.conf.settings.LOGIN_THROTTLE_BUCKETS', {'availability_ip': (2, 1)})
+    def test_throttled(self):
+        self.enterContext(mock.patch('sdc_client.throttles.time')).time.return_value = 3_600_000.0
+        url = reverse('api_register_availability')
+        for _ in range(2):
+            self.assertEqual(self.client.get(url, {'email': 'a@sdc.mx'}).status_code, 200)
+        self.assertEqual(self.client.get(url, {'email': 'a@sdc.mx'}).status_code, 429)
+
+
+# --- Vistas async ---
+
+class AsyncURLConf:
+    """Las rutas de la app con las vistas async, como con ASYNC_VIEWS=True."""
+    urlpatterns = [
+        path(
+            str(pattern.pattern),
+            sdc_urls.ASYNC_VIEWS.get(pattern.name, pattern.callback),
+            name=pattern.name,
+        )
+        for pattern in sdc_urls.urlpatterns
+    ]
+
+
+@override_settings(ROOT_URLCONF=AsyncURLConf)
+class AsyncViewsTests(SDCTestCase):
+
+    def test_async_feeds_match_sync_context(self):
+        self.make_posts(self.donor_user, Post.PostType.OFFER, 3)
+        self.make_posts(self.donee_user, Post.PostType.REQUEST, 2)
+        self.client.force_login(self.donee_user)
+
+        response = self.client.get(reverse('donee_feed'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['feed_posts']), 3)
+        self.assertEqual(len(response.context['my_posts']), 2)
+
+        for user, url_name in ((self.donor_user, 'donor_feed'),
+                               (self.institution_user, 'institution_feed')):
+            self.client.force_login(user)
+            self.assertEqual(self.client.get(reverse(url_name)).status_code, 200)
+
+    def test_async_search(self):
+        Post.objects.create(
+            author=self.donor_user, title='Cobijas', description='Nuevas',
+            category=self.category, post_type=Post.PostType.OFFER,
+        )
+        self.make_posts(self.donor_user, Post.PostType.OFFER, 2)
+        self.client.force_login(self.donee_user)
+        response = self.client.get(reverse('donee_feed'), {'q': 'cobijas'})
+        self.assertEqual([p.title for p in response.context['feed_posts']], ['Cobijas'])
+
+    def test_async_create_post(self):
+        self.client.force_login(self.donor_user)
+        response = self.client.post(reverse('create_post'), {
+            'title': 'Cobijas', 'description': 'Nuevas',
+            'category': self.category.pk, 'quantity': '3',
+        })
+        self.assertRedirects(response, reverse('donor_feed'), fetch_redirect_response=False)
+        post = Post.objects.get(title='Cobijas')
+        self.assertEqual(post.post_type, Post.PostType.OFFER)
+
+    def test_async_feed_requires_login(self):
+        response = self.client.get(reverse('donee_feed'))
+        self.assertEqual(response.status_code, 302)
+
+
+# --- Modo API sin estado ---
+
+@override_settings(API_STATELESS=True, SESSION_ENGINE='django.contrib.sessions.backends.db')
+class StatelessAPITests(SDCTestCase):
+
+    def login(self, **extra):
+        return self.client.post(
+            reverse('api_login'),
+            {'email': self.donor_user.email, 'password': self.password, **extra},
+            content_type='application/json',
+        )
+
+    def session_queries(self, context):
+        return [q['sql'] for q in context.captured_queries if 'django_session' in q['sql']]
+
+    def test_api_login_issues_tokens_only(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.login()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.json())
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.assertEqual(self.session_queries(context), [])
+        self.donor_user.refresh_from_db()
+        self.assertIsNotNone(self.donor_user.last_login)
+
+    def test_web_login_still_opens_a_session(self):
+        response = self.login(session=True)
+        self.assertIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.assertEqual(self.client.get(reverse('donor_feed')).status_code, 200)
+
+    def test_api_routes_skip_the_session(self):
+        self.client.force_login(self.donor_user)
+        token = RefreshToken.for_user(self.donor_user).access_token
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                reverse('api_my_posts'), HTTP_AUTHORIZATION=f'Bearer {token}',
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.session_queries(context), [])
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_signed_cookie_sessions_need_no_rows(self):
+        response = self.login(session=True)
+        self.assertIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.assertFalse(Session.objects.exists())
+        self.assertEqual(self.client.get(reverse('donor_feed')).status_code, 200)
+
+
+# --- Usuario de la API en caché ---
+
+@override_settings(DEBUG=True)
+class CachedJWTUserTests(SDCTestCase):
+
+    def setUp(self):
+        super().setUp()
+        token = RefreshToken.for_user(self.donor_user).access_token
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+    def get(self):
+        return self.client.get(reverse('api_my_posts'), **self.auth)
+
+    def user_queries(self, context):
+        table = CustomUser._meta.db_table
+        return [q['sql'] for q in context.captured_queries if f'FROM "{table}"' in q['sql']]
+
+    def test_authenticated_calls_skip_the_user_query(self):
+        self.assertEqual(self.get().status_code, 200)
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.get().status_code, 200)
+        self.assertEqual(self.user_queries(context), [])
+
+    def test_deactivation_invalidates_the_cache(self):
+        self.assertEqual(self.get().status_code, 200)
+        self.donor_user.is_active = False
+        self.donor_user.save()
+        self.assertEqual(self.get().status_code, 401)
+
+    def test_role_change_invalidates_the_cache(self):
+        from .authentication import get_cached_user
+
+        self.assertEqual(get_cached_user(self.donor_user.pk).role, CustomUser.Role.DONOR)
+        Donor.objects.filter(user=self.donor_user).delete()
+        self.assertEqual(get_cached_user(self.donor_user.pk).role, '')
+
+    def test_other_fields_load_on_demand(self):
+        from .authentication import get_cached_user
+
+        user = get_cached_user(self.donor_user.pk)
+        self.assertIn('password', user.get_deferred_fields())
+        self.assertEqual(user.password, self.donor_user.password)
+
+    @override_settings(DEBUG=False)
+    def test_process_local_cache_falls_back_to_the_db(self):
+        self.assertEqual(self.get().status_code, 200)
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.get().status_code, 200)
+        self.assertEqual(len(self.user_queries(context)), 1)
+
+    def test_process_local_cache_check(self):
+        from .checks import check_shared_caches
+
+        self.assertEqual(check_shared_caches(None), [])
+        with override_settings(DEBUG=False):
+            self.assertEqual([w.id for w in check_shared_caches(None)], ['sdc_client.W001'])
+
+
+# --- Rotación y revocación de refresh tokens ---
+
+class RefreshRotationTests(SDCTestCase):
+
+    def setUp(self):
+        super().setUp()
+        token_revocation._revoked.clear()
+        self.addCleanup(token_revocation._revoked.clear)
+        self.refresh = str(RefreshToken.for_user(self.donor_user))
+
+    def post(self, url_name, refresh):
+        return self.client.post(reverse(url_name), {'refresh': refresh}, content_type='application/json')
+
+    def test_refresh_rotates_and_old_token_is_rejected(self):
+        response = self.post('token_refresh', self.refresh)
+        self.assertEqual(response.status_code, 200)
+        rotated = response.json()['refresh']
+        self.assertNotEqual(rotated, self.refresh)
+
+        self.assertEqual(self.post('token_refresh', self.refresh).status_code, 401)
+        self.assertEqual(self.post('token_refresh', rotated).status_code, 200)
+
+    def test_reuse_is_caught_by_the_persistent_store(self):
+        self.assertEqual(self.post('token_refresh', self.refresh).status_code, 200)
+        # Otro worker: no tiene el jti en memoria
+        token_revocation._revoked.clear()
+        self.assertEqual(self.post('token_refresh', self.refresh).status_code, 401)
+
+    @override_settings(DEBUG=True)  # Caché local admitida sólo en desarrollo
+    def test_refresh_reads_neither_user_nor_revocations(self):
+        self.post('token_refresh', self.refresh)  # Usuario en caché
+        refresh = str(RefreshToken.for_user(self.donor_user))
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.post('token_refresh', refresh).status_code, 200)
+        selects = [q['sql'] for q in context.captured_queries if q['sql'].startswith('SELECT')]
+        self.assertEqual(selects, [])
+
+    def test_revoke_endpoint(self):
+        self.assertEqual(self.post('token_revoke', self.refresh).status_code, 200)
+        self.assertEqual(self.post('token_refresh', self.refresh).status_code, 401)
+        self.assertEqual(self.post('token_revoke', 'no-es-un-token').status_code, 401)
+
+    def test_inactive_user_cannot_refresh(self):
+        CustomUser.objects.filter(pk=self.donor_user.pk).update(is_active=False)
+        self.assertEqual(self.post('token_refresh', self.refresh).status_code, 401)
+
+    def test_expired_revocations_are_pruned(self):
+        RevokedToken.objects.create(jti='vencido', expires_at=timezone.now() - timedelta(minutes=1))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.post('token_refresh', self.refresh).status_code, 200)
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)),
+                         [RefreshToken(self.refresh)['jti']])
+
+    @override_settings(TOKEN_REVOCATION_MEMORY_MAX=2)
+    def test_memory_set_is_bounded(self):
+        revoked = token_revocation._RevokedSet()
+        now = time.time()
+        revoked.add('vencido', now - 1)
+        revoked.add('a', now + 60)
+        revoked.add('b', now + 60)
+        revoked.add('c', now + 60)
+        self.assertEqual(len(revoked), 2)
+        self.assertNotIn('a', revoked)
+        self.assertIn('c', revoked)
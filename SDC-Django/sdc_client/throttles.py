@@ -0,0 +1,175 @@
+# SDC-Django/sdc_client/throttles.py
+
+import hashlib
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+
+logger = logging.getLogger(__name__)
+
+
+# --- Throttling de login con ventana deslizante ---
+#
+# Cada llave (IP o email) admite 'capacidad' intentos en cualquier lapso de
+# capacidad / intentos por minuto minutos (lo que tardaría en rellenarse una
+# cubeta de esa capacidad). Sin intentos disponibles se responde 429 antes
+# de tocar la BBDD o calcular un hash de contraseña.
+# Se cuentan los intentos de la ventana actual y de la anterior, y la
+# anterior pesa según cuánto de ella sigue dentro del lapso: no hay ráfaga
+# de 2x capacidad en el cambio de ventana. Los contadores viven en la caché
+# de Django (compartida entre workers) y se modifican sólo con cache.add,
+# incr y decr, que son atómicos: intentos en paralelo no leen todos el mismo
+# saldo. Si la caché falla se registra y los throttles de login rechazan
+# (fail_closed); los demás dejan pasar.
+
+
+class WindowThrottle(BaseThrottle):
+    # Llave en settings.LOGIN_THROTTLE_BUCKETS
+    scope = None
+    # Sin caché, ¿se rechaza la petición?
+    fail_closed = True
+
+    def __init__(self):
+        self.wait_time = None
+
+    def get_bucket(self):
+        """(capacidad, intentos por minuto); (None, None) desactiva el throttle."""
+        buckets = getattr(settings, 'LOGIN_THROTTLE_BUCKETS', {})
+        return buckets.get(self.scope, (None, None))
+
+    def get_cache_key(self, request):
+        raise NotImplementedError('.get_cache_key() must be overridden')
+
+    def _cache(self):
+        return caches[getattr(settings, 'LOGIN_THROTTLE_CACHE_ALIAS', 'default')]
+
+    def _count(self, cache, key, timeout):
+        cache.add(key, 0, timeout)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # La llave expiró entre add e incr
+            cache.add(key, 0, timeout)
+            return cache.incr(key)
+
+    def allow_request(self, request, view):
+        capacity, per_minute = self.get_bucket()
+        key = self.get_cache_key(request)
+        if not capacity or key is None:
+            return True
+
+        window = max(1, round(capacity * 60 / per_minute))
+        now = time.time()
+        index, offset = divmod(now, window)
+        current_key = f'{key}:{int(index)}'
+        try:
+            cache = self._cache()
+            # Dos ventanas de vida: la actual sirve luego como 'anterior'
+            count = self._count(cache, current_key, 2 * window + 1)
+            previous = cache.get(f'{key}:{int(index) - 1}', 0)
+            weight = 1 - offset / window
+            if previous * weight + count <= capacity:
+                return True
+            # Un intento rechazado no consume capacidad
+            cache.decr(current_key)
+        except Exception:
+            logger.exception('Caché de throttling no disponible (%s)', self.scope)
+            if not self.fail_closed:
+                return True
+            self.wait_time = window
+            return False
+
+        self.wait_time = self._wait(capacity, window, offset, count, previous)
+        return False
+
+    @staticmethod
+    def _wait(capacity, window, offset, count, previous):
+        """Segundos hasta que el intento rechazado cabría."""
+        if count > capacity or not previous:
+            # Sólo cabe cuando la ventana actual pase a ser la anterior
+            return window - offset
+        # previous * (1 - t / window) + count <= capacity
+        ready_at = (1 - (capacity - count) / previous) * window
+        return max(1, ready_at - offset)
+
+    def wait(self):
+        return self.wait_time
+
+
+class LoginIPThrottle(WindowThrottle):
+    scope = 'login_ip'
+
+    def get_cache_key(self, request):
+        return f'throttle:{self.scope}:{self.get_ident(request)}'
+
+
+class LoginEmailThrottle(WindowThrottle):
+    """Limita los intentos contra una misma cuenta aunque cambie la IP."""
+    scope = 'login_email'
+
+    def get_email(self, request):
+        data = getattr(request, 'data', None)
+        if data is None:
+            # Vistas que no son de DRF (p. ej. el login async)
+            try:
+                data = json.loads(request.body or b'{}')
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                return None
+        email = data.get('email') if hasattr(data, 'get') else None
+        return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+    def get_cache_key(self, request):
+        email = self.get_email(request)
+        if email is None:
+            return None
+        digest = hashlib.sha256(email.encode()).hexdigest()
+        return f'throttle:{self.scope}:{digest}'
+
+
+class LoginThrottle(BaseThrottle):
+    """
+    IP primero; el contador del email sólo avanza si la IP pasa. Así una IP
+    bloqueada no puede agotar los intentos de la cuenta de otra persona.
+    """
+
+    def __init__(self):
+        self.wait_time = None
+
+    def allow_request(self, request, view):
+        for throttle_class in (LoginIPThrottle, LoginEmailThrottle):
+            throttle = throttle_class()
+            if not throttle.allow_request(request, view):
+                self.wait_time = throttle.wait()
+                return False
+        return True
+
+    def wait(self):
+        return self.wait_time
+
+
+LOGIN_THROTTLES = (LoginThrottle,)
+
+
+class AvailabilityIPThrottle(WindowThrottle):
+    """Consultas de disponibilidad del registro: evita enumerar cuentas en masa."""
+    scope = 'availability_ip'
+    fail_closed = False
+
+    def get_cache_key(self, request):
+        return f'throttle:{self.scope}:{self.get_ident(request)}'
+
+
+def check_login_throttles(request):
+    """
+    Para vistas que no son de DRF: devuelve los segundos de espera si algún
+    throttle rechaza la petición, o None si puede continuar.
+    """
+    throttle = LoginThrottle()
+    if not throttle.allow_request(request, None):
+        return throttle.wait()
+    return None
@@ -0,0 +1,111 @@
+# SDC-Django/sdc_client/token_revocation.py
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import RevokedToken
+
+
+# --- Revocación de refresh tokens (rotación en api/token/refresh/) ---
+#
+# Cada refresh token usado para rotar se revoca con un INSERT de su jti en
+# RevokedToken: la llave primaria hace que, entre todos los workers, sólo
+# una petición gane con el mismo token; la otra recibe 401. Cada proceso
+# guarda además los jti que ya vio revocados en un OrderedDict (jti ->
+# expiración) para rechazarlos sin ir a la BBDD. Ambos se podan por
+# expiración: el dict al agregar, la tabla a lo sumo una vez cada
+# TOKEN_REVOCATION_PRUNE_INTERVAL segundos entre todos los workers.
+
+PRUNE_LOCK_KEY = 'token-revocation:prune'
+
+
+class _RevokedSet:
+    """jti revocados en memoria del proceso, en orden de inserción."""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, jti):
+        expires = self._entries.get(jti)
+        return expires is not None and expires > time.time()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, jti, expires):
+        limit = getattr(settings, 'TOKEN_REVOCATION_MEMORY_MAX', 100000)
+        now = time.time()
+        with self._lock:
+            self._entries[jti] = expires
+            # Todos los refresh duran lo mismo: los primeros vencen primero.
+            # Sacar uno vigente por el límite es seguro, la BBDD lo tiene
+            while self._entries:
+                first_expires = next(iter(self._entries.values()))
+                if first_expires > now and len(self._entries) <= limit:
+                    break
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_revoked = _RevokedSet()
+
+
+def _claims(token):
+    return token[api_settings.JTI_CLAIM], token['exp']
+
+
+def is_revoked(token):
+    """¿El refresh token ya fue rotado o revocado? (búsqueda por llave primaria)"""
+    jti, expires = _claims(token)
+    if jti in _revoked:
+        return True
+    if RevokedToken.objects.filter(pk=jti).exists():
+        _revoked.add(jti, expires)
+        return True
+    return False
+
+
+def revoke(token):
+    """
+    Revoca el refresh token. Devuelve False si ya estaba revocado: al rotar,
+    eso significa que el token se está reutilizando.
+    """
+    jti, expires = _claims(token)
+    if jti in _revoked:
+        return False
+    try:
+        with transaction.atomic():
+            RevokedToken.objects.create(
+                jti=jti, expires_at=datetime.fromtimestamp(expires, tz=dt_timezone.utc),
+            )
+    except IntegrityError:
+        _revoked.add(jti, expires)
+        return False
+    _revoked.add(jti, expires)
+    _maybe_prune()
+    return True
+
+
+def prune():
+    """Borra las revocaciones de tokens ya vencidos. Devuelve cuántas."""
+    deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
+
+
+def _maybe_prune():
+    interval = getattr(settings, 'TOKEN_REVOCATION_PRUNE_INTERVAL', 3600)
+    # cache.add sólo tiene éxito en un worker por intervalo
+    if cache.add(PRUNE_LOCK_KEY, 1, interval):
+        transaction.on_commit(prune)
@@ -1,5 +1,6 @@
 # SDC-Django/sdc_client/urls.py
 
+from django.conf import settings
 from django.urls import path
 from . import views
 
@@ -9,6 +10,18 @@ from rest_framework_simplejwt.views import (
     TokenRefreshView,
 )
 
+# Versiones async de las vistas de posts. Se usan con ASYNC_VIEWS=True, es decir,
+# cuando el sitio corre bajo ASGI (uvicorn); con WSGI conviene dejar las síncronas.
+ASYNC_VIEWS = {
+    'create_post': views.async_create_post,
+    'donee_feed': views.async_donee_feed,
+    'donor_feed': views.async_donor_feed,
+    'institution_feed': views.async_institution_feed,
+}
+
+def _view(name, sync_view):
+    return ASYNC_VIEWS[name] if settings.ASYNC_VIEWS else sync_view
+
 urlpatterns = [
     # Vistas de páginas
     path('', views.home, name='home'),
@@ -17,16 +30,53 @@ urlpatterns = [
     path('auth/', views.auth, name='auth'), # Página de 'auth' (formulario)
     
     # Feeds (requerirán protección JWT en el futuro)
-    path('create_post/', views.create_post, name='create_post'),
-    path('donee_feed', views.donee_feed, name='donee_feed'),
-    path('donor_feed', views.donor_feed, name='donor_feed'),
-    path('institution_feed', views.institution_feed, name='institution_feed'),
+    path('create_post/', _view('create_post', views.create_post), name='create_post'),
+    path('donee_feed', _view('donee_feed', views.donee_feed), name='donee_feed'),
+    path('donor_feed', _view('donor_feed', views.donor_feed), name='donor_feed'),
+    path('institution_feed', _view('institution_feed', views.institution_feed), name='institution_feed'),
+
+    # Mejores coincidencias (Solicitud <-> Oferta) de una publicación propia
+    path('posts/<int:post_id>/matches/', views.post_matches, name='post_matches'),
+
+    # Compromisos (Transaction) sobre una publicación
+    path('posts/<int:post_id>/commit/', views.commit_post, name='commit_post'),
+
+    # Reportes y Gráficas (instituciones y staff)
+    path('reports/', views.reports_dashboard, name='reports_dashboard'),
+
+    # --- API Endpoints de Publicaciones ---
+
+    # Búsqueda de texto completo (ordenada por relevancia)
+    path('api/posts/search/', views.api_search_posts, name='api_search_posts'),
+
+    # Feeds en JSON (cursor y '?fields=') y publicaciones propias
+    path('api/feeds/donee/', views.api_donee_feed, name='api_donee_feed'),
+    path('api/feeds/donor/', views.api_donor_feed, name='api_donor_feed'),
+    path('api/feeds/institution/', views.api_institution_feed, name='api_institution_feed'),
+    path('api/posts/mine/', views.api_my_posts, name='api_my_posts'),
+
+    # Agregados para reportes (leen los rollups diarios)
+    path('api/reports/summary/', views.api_reports_summary, name='api_reports_summary'),
+
+    # Existencias actuales de un almacén
+    path('api/warehouses/<int:warehouse_id>/stock/', views.api_warehouse_stock, name='api_warehouse_stock'),
 
     # --- API Endpoints para Autenticación ---
+
+    # Disponibilidad de email/teléfono/CURP/RFC para el registro
+    path('api/register/availability/', views.api_register_availability, name='api_register_availability'),
     
     # Endpoint login
     path('api/login/', views.api_login_view, name='api_login'), 
+
+    # Login async (ASGI): verifica la contraseña fuera del event loop
+    path('api/login/async/', views.api_login_async_view, name='api_login_async'),
     
     # Endpoints de Simple JWT (para refrescar tokens)
+    # Rota el refresh token (ver RotatingTokenRefreshSerializer)
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/token/revoke/', views.api_token_revoke, name='token_revoke'),
+
+    # Histogramas por vista para Prometheus
+    path('metrics', views.metrics_view, name='metrics'),
 ]
\ No newline at end of file
@@ -1,24 +1,60 @@
 # SDC-Django/sdc_client/views.py
 
-from django.shortcuts import render, redirect
+from django.conf import settings
+from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.db import transaction # Para asegurar que User y Perfil se creen juntos
-from django.contrib.auth import authenticate, login # Para Login
+from django.contrib.auth import login # Para Login
+from django.contrib.auth.signals import user_logged_in
 from django.contrib.auth.decorators import login_required # Decorador para proteger vistas
-from django.http import JsonResponse
+from django.core.exceptions import PermissionDenied
+from django.views.decorators.http import require_POST
+from django.views.decorators.csrf import csrf_exempt
+from django.http import HttpResponse, JsonResponse
+from django.utils.crypto import constant_time_compare
+from asgiref.sync import sync_to_async
+import asyncio
 import json
+import math
 
 # --- FORMULARIOS ---
-from .forms import PersonRegistrationForm, InstitutionRegistrationForm, PostForm
+from .forms import PersonRegistrationForm, InstitutionRegistrationForm, PostForm, CommitmentForm
 # --- MODELOS ---
-from .models import CustomUser, Donee, Donor, Institution, Post, Category
+from .models import (
+    ArchivedPost, CustomUser, Donee, Donor, Institution, Post, Category, Warehouse,
+)
+# --- PAGINACIÓN ---
+from .pagination import (
+    paginate_by_cursor, paginate_by_rank, apaginate_by_cursor, apaginate_by_rank,
+)
+from .search import search_posts
+from .serializers import PostCardSerializer, parse_fields
+from . import metrics
+from . import feed_cache
+from .commitments import commit_to_post, CommitmentError
+from .matching import best_matches
+from .reports import build_report, parse_report_range
+from .inventory import current_stock
+from .login_executor import authenticate_bounded, aauthenticate_bounded, LoginOverloaded
+from .throttles import LOGIN_THROTTLES, AvailabilityIPThrottle, check_login_throttles
+from . import availability
+from . import token_revocation
 
 # Importaciones para JWT y Vistas de API (para el login)
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import RefreshToken
 
 
+# URL del feed de cada rol (CustomUser.role)
+ROLE_REDIRECTS = {
+    CustomUser.Role.DONOR: '/donor_feed',
+    CustomUser.Role.DONEE: '/donee_feed',
+    CustomUser.Role.INSTITUTION: '/institution_feed',
+}
+
+
 # --- Vistas de Páginas (Frontend) ---
 
 def home(request):
@@ -39,29 +75,13 @@ def create_post(request):
         if form.is_valid():
             post = form.save(commit=False)
             post.author = request.user
-            redirect_url = 'home' 
 
-            try:
-                if hasattr(request.user, 'donee'):
-                    # REGLA: Donatario.
-                    post.post_type = Post.PostType.REQUEST
-                    post.is_campaign = False 
-                    redirect_url = 'donee_feed'
-
-                elif hasattr(request.user, 'donor'):
-                    # REGLA: Donador.
-                    post.post_type = Post.PostType.OFFER
-                    post.is_campaign = False
-                    redirect_url = 'donor_feed'
-
-                elif hasattr(request.user, 'institution'):
-                    # REGLA: Institución.
-                    redirect_url = 'institution_feed'
-                
-                else:
-                    messages.error(request, 'Error: Tu perfil de usuario no está completo.')
-                    return redirect('home')
+            redirect_url = _apply_role_rules(post, request.user.role)
+            if redirect_url is None:
+                messages.error(request, 'Error: Tu perfil de usuario no está completo.')
+                return redirect('home')
 
+            try:
                 post.save() # Guardar el objeto 'post' en la BBDD
                 messages.success(request, '¡Publicación creada con éxito!')
                 return redirect(redirect_url) 
@@ -77,23 +97,40 @@ def create_post(request):
     }
     return render(request, 'posts/create_post.html', context)
 
+
+def _apply_role_rules(post, role):
+    """
+    Aplica las reglas de publicación del rol y devuelve el feed al que
+    redirigir, o None si el usuario no tiene perfil.
+    """
+    if role == CustomUser.Role.DONEE:
+        # REGLA: Donatario.
+        post.post_type = Post.PostType.REQUEST
+        post.is_campaign = False 
+        return 'donee_feed'
+
+    elif role == CustomUser.Role.DONOR:
+        # REGLA: Donador.
+        post.post_type = Post.PostType.OFFER
+        post.is_campaign = False
+        return 'donor_feed'
+
+    elif role == CustomUser.Role.INSTITUTION:
+        # REGLA: Institución (elige tipo y campaña en el formulario).
+        return 'institution_feed'
+
+    return None
+
 @login_required
 def donee_feed(request):
     my_requests = Post.objects.filter(
         author=request.user, 
         post_type=Post.PostType.REQUEST
-    ).order_by('-created_at')
+    )
     
-    available_offers = Post.objects.filter(
-        post_type=Post.PostType.OFFER, 
-        status=Post.PostStatus.ACTIVE
-    ).exclude(author=request.user).order_by('-created_at')
-
-    context = {
-        'my_posts': my_requests,
-        'feed_posts': available_offers,
-        'feed_title': 'Ofertas Disponibles'
-    }
+    # Ofertas activas de otros usuarios (servidas desde la caché compartida)
+    context = _feed_context(request, my_requests, Post.PostType.OFFER)
+    context['feed_title'] = 'Ofertas Disponibles'
     return render(request, 'posts/donee_feed.html', context)
 
 
@@ -102,35 +139,272 @@ def donor_feed(request):
     my_offers = Post.objects.filter(
         author=request.user, 
         post_type=Post.PostType.OFFER
-    ).order_by('-created_at')
+    )
 
-    available_requests = Post.objects.filter(
-        post_type=Post.PostType.REQUEST, 
-        status=Post.PostStatus.ACTIVE
-    ).exclude(author=request.user).order_by('-created_at')
-
-    context = {
-        'my_posts': my_offers,
-        'feed_posts': available_requests,
-        'feed_title': 'Solicitudes de Ayuda'
-    }
+    # Solicitudes activas de otros usuarios
+    context = _feed_context(request, my_offers, Post.PostType.REQUEST)
+    context['feed_title'] = 'Solicitudes de Ayuda'
     return render(request, 'posts/donor_feed.html', context)
 
 
 @login_required
 def institution_feed(request):
-    my_posts = Post.objects.filter(author=request.user).order_by('-created_at')
+    my_posts = Post.objects.filter(author=request.user)
     
-    all_other_posts = Post.objects.filter(
-        status=Post.PostStatus.ACTIVE
-    ).exclude(author=request.user).order_by('-created_at')
+    # Todos los posts activos de otros usuarios
+    context = _feed_context(request, my_posts, feed_cache.ALL_TYPES)
+    context['feed_title'] = 'Actividad de la Comunidad'
+    return render(request, 'posts/institution_feed.html', context)
 
-    context = {
+
+def _feed_context(request, my_queryset, feed_post_type):
+    """
+    Pagina por cursor las dos listas de un feed.
+    '?my_cursor=' avanza en las publicaciones propias y '?cursor=' en el feed.
+    """
+    my_cursor, feed_cursor, query = _feed_params(request)
+
+    my_page = paginate_by_cursor(my_queryset.for_cards(), my_cursor)
+
+    if query:
+        # Búsqueda: ordenada por relevancia, fuera de la caché compartida
+        results = _feed_search(feed_post_type, request.user, query)
+        feed_page = paginate_by_rank(results, feed_cursor)
+    else:
+        feed_page = feed_cache.get_feed_page(feed_post_type, request.user, feed_cursor)
+
+    return _build_feed_context(my_page, feed_page, my_cursor, feed_cursor, query)
+
+
+def _feed_params(request):
+    return (
+        request.GET.get('my_cursor', ''),
+        request.GET.get('cursor', ''),
+        request.GET.get('q', '').strip(),
+    )
+
+
+def _feed_search(feed_post_type, user, query):
+    return search_posts(
+        feed_cache.active_posts(feed_post_type).exclude(author=user), query
+    ).for_cards()
+
+
+def _build_feed_context(my_page, feed_page, my_cursor, feed_cursor, query):
+    my_posts, my_next_cursor = my_page
+    feed_posts, feed_next_cursor = feed_page
+    return {
         'my_posts': my_posts,
-        'feed_posts': all_other_posts,
-        'feed_title': 'Actividad de la Comunidad'
+        'feed_posts': feed_posts,
+        'my_cursor': my_cursor,
+        'feed_cursor': feed_cursor,
+        'my_next_cursor': my_next_cursor,
+        'feed_next_cursor': feed_next_cursor,
+        'query': query,
     }
-    return render(request, 'posts/institution_feed.html', context)
+
+
+# --- Vistas async (despliegue ASGI con ASYNC_VIEWS=True, ver README) ---
+#
+# Mismo comportamiento que las vistas síncronas, pero con el ORM async: la
+# página de "mis publicaciones" y la del feed se piden a la vez con
+# asyncio.gather y el event loop queda libre mientras esperan a la BBDD.
+# El render de la plantilla (mensajes/sesión) sigue siendo síncrono.
+
+@login_required
+async def async_create_post(request):
+    user = await request.auser()
+
+    if request.method == 'POST':
+        form = PostForm(request.POST, user=user)
+
+        # La validación de 'category' consulta la BBDD (ModelChoiceField)
+        if await sync_to_async(form.is_valid)():
+            post = form.save(commit=False)
+            post.author = user
+
+            redirect_url = _apply_role_rules(post, user.role)
+            if redirect_url is None:
+                messages.error(request, 'Error: Tu perfil de usuario no está completo.')
+                return redirect('home')
+
+            try:
+                await post.asave()
+                messages.success(request, '¡Publicación creada con éxito!')
+                return redirect(redirect_url)
+
+            except Exception as e:
+                form.add_error(None, f"Error al procesar el tipo de usuario: {e}")
+
+    else:
+        form = PostForm(user=user)
+
+    return await sync_to_async(render)(request, 'posts/create_post.html', {'form': form})
+
+
+@login_required
+async def async_donee_feed(request):
+    user = await request.auser()
+    my_requests = Post.objects.filter(author=user, post_type=Post.PostType.REQUEST)
+
+    context = await _afeed_context(request, user, my_requests, Post.PostType.OFFER)
+    context['feed_title'] = 'Ofertas Disponibles'
+    return await sync_to_async(render)(request, 'posts/donee_feed.html', context)
+
+
+@login_required
+async def async_donor_feed(request):
+    user = await request.auser()
+    my_offers = Post.objects.filter(author=user, post_type=Post.PostType.OFFER)
+
+    context = await _afeed_context(request, user, my_offers, Post.PostType.REQUEST)
+    context['feed_title'] = 'Solicitudes de Ayuda'
+    return await sync_to_async(render)(request, 'posts/donor_feed.html', context)
+
+
+@login_required
+async def async_institution_feed(request):
+    user = await request.auser()
+    my_posts = Post.objects.filter(author=user)
+
+    context = await _afeed_context(request, user, my_posts, feed_cache.ALL_TYPES)
+    context['feed_title'] = 'Actividad de la Comunidad'
+    return await sync_to_async(render)(request, 'posts/institution_feed.html', context)
+
+
+async def _afeed_context(request, user, my_queryset, feed_post_type):
+    """Versión async de _feed_context: ambas listas se consultan en paralelo."""
+    my_cursor, feed_cursor, query = _feed_params(request)
+
+    if query:
+        feed_coroutine = apaginate_by_rank(
+            _feed_search(feed_post_type, user, query), feed_cursor
+        )
+    else:
+        feed_coroutine = feed_cache.aget_feed_page(feed_post_type, user, feed_cursor)
+
+    my_page, feed_page = await asyncio.gather(
+        apaginate_by_cursor(my_queryset.for_cards(), my_cursor),
+        feed_coroutine,
+    )
+    return _build_feed_context(my_page, feed_page, my_cursor, feed_cursor, query)
+
+# --- Coincidencias de una publicación ---
+
+@login_required
+def post_matches(request, post_id):
+    # Sólo el autor puede ver las coincidencias de su publicación
+    post = get_object_or_404(Post, pk=post_id, author=request.user)
+
+    context = {
+        'post': post,
+        'matches': best_matches(post),
+        'back_url': ROLE_REDIRECTS.get(request.user.role, '/'),
+    }
+    return render(request, 'posts/post_matches.html', context)
+
+# --- Compromisos sobre publicaciones ---
+
+@login_required
+@require_POST
+def commit_post(request, post_id):
+    form = CommitmentForm(request.POST)
+
+    if form.is_valid():
+        try:
+            commit_to_post(post_id, request.user, form.cleaned_data['quantity_committed'])
+            messages.success(request, '¡Gracias! Tu compromiso fue registrado.')
+        except CommitmentError as e:
+            messages.error(request, str(e))
+    else:
+        messages.error(request, 'Ingresa una cantidad válida.')
+
+    return redirect(ROLE_REDIRECTS.get(request.user.role, 'home'))
+
+# --- Reportes y Gráficas (sólo leen los rollups de reports.py) ---
+
+def _can_view_reports(user):
+    return user.is_staff or user.role == CustomUser.Role.INSTITUTION
+
+
+MAX_CATEGORY_ID = 2 ** 63 - 1
+
+
+def _report_filters(params):
+    """(desde, hasta, estado, categoría) de la query string; ValueError si no son válidos."""
+    start, end = parse_report_range(params.get('from'), params.get('to'))
+    category = params.get('category')
+    category = int(category) if category else None
+    # Fuera del rango de la llave (bigint) la BBDD fallaría al comparar
+    if category is not None and not 0 < category <= MAX_CATEGORY_ID:
+        raise ValueError('Categoría fuera de rango')
+    return start, end, params.get('state') or None, category
+
+
+@login_required
+def reports_dashboard(request):
+    if not _can_view_reports(request.user):
+        raise PermissionDenied
+
+    try:
+        start, end, state, category = _report_filters(request.GET)
+    except ValueError:
+        messages.error(request, 'Filtros no válidos (las fechas van como AAAA-MM-DD).')
+        (start, end), state, category = parse_report_range(), None, None
+
+    report = build_report(start, end, state, category)
+    context = {
+        'report': report,
+        'categories': Category.objects.order_by('name'),
+        'selected_state': state or '',
+        'selected_category': category,
+        # Máximos para escalar las barras de las gráficas
+        'max_category_posts': max(
+            (row['total_posts'] for row in report['posts']['by_category']), default=0
+        ),
+        'max_daily_transactions': max(
+            (row['total_transactions'] for row in report['transactions']['daily']), default=0
+        ),
+        'back_url': ROLE_REDIRECTS.get(request.user.role, '/'),
+    }
+    return render(request, 'reports/dashboard.html', context)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_reports_summary(request):
+    """
+    Agregados de publicaciones y transacciones. Parámetros opcionales:
+    from/to (AAAA-MM-DD, máx. un año), state y category (id).
+    """
+    if not _can_view_reports(request.user):
+        return JsonResponse({'error': 'No autorizado'}, status=403)
+
+    try:
+        start, end, state, category = _report_filters(request.query_params)
+    except ValueError:
+        return JsonResponse({'error': 'Filtros no válidos (fechas AAAA-MM-DD)'}, status=400)
+
+    return JsonResponse(build_report(start, end, state, category))
+
+# --- Inventario de almacenes (lee WarehouseStock, nunca el historial) ---
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_warehouse_stock(request, warehouse_id):
+    """Existencias actuales por categoría. Staff o la institución que opera el almacén."""
+    warehouse = get_object_or_404(
+        Warehouse.objects.select_related('institution').only('id', 'name', 'institution__user_id'),
+        pk=warehouse_id,
+    )
+    operator = warehouse.institution.user_id if warehouse.institution else None
+    if not (request.user.is_staff or operator == request.user.pk):
+        return JsonResponse({'error': 'No autorizado'}, status=403)
+
+    return JsonResponse({
+        'warehouse': {'id': warehouse.pk, 'name': warehouse.name},
+        'stock': current_stock(warehouse.pk),
+    })
 
 # --- Lógica de Registro (Backend) ---
 
@@ -174,6 +448,10 @@ def register(request):
                             Donor.objects.create(**profile_data)
                             redirect_url = 'donor_feed'
 
+                    availability.mark_taken({
+                        'email': data['person_email'], 'phone': data['person_phone'],
+                        'curp': data['person_curp'],
+                    })
                     messages.success(request, '¡Registro exitoso! Por favor, inicia sesión.')
                     return redirect('auth') # Redirigir a la página de login
 
@@ -206,6 +484,10 @@ def register(request):
                             address=data['institution_address']
                         )
                     
+                    availability.mark_taken({
+                        'email': data['institution_email'], 'rfc': data['institution_rfc'],
+                        'name': data['institution_name'],
+                    })
                     messages.success(request, '¡Registro de institución exitoso! Por favor, inicia sesión.')
                     return redirect('auth') # Redirigir a la página de login
 
@@ -220,10 +502,32 @@ def register(request):
     return render(request, 'login/register.html', context)
 
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@throttle_classes([AvailabilityIPThrottle])
+def api_register_availability(request):
+    """
+    Disponibilidad de los datos únicos del registro mientras se escriben:
+    ?email=&phone=&curp=&rfc=&name= -> {"available": {"email": true, ...}}.
+    """
+    values = {
+        field: request.query_params[field]
+        for field in availability.FIELDS
+        if request.query_params.get(field, '').strip()
+    }
+    if not values:
+        return JsonResponse({'error': 'Indica al menos un campo'}, status=400)
+    if any(len(value) > availability.FIELD_MAX_LENGTH for value in values.values()):
+        return JsonResponse({'error': 'Valor demasiado largo'}, status=400)
+
+    return JsonResponse({'available': availability.check(values)})
+
+
 # --- Lógica de Login (Backend) con JWT ---
 
 @api_view(['POST']) 
 @permission_classes([AllowAny]) 
+@throttle_classes(LOGIN_THROTTLES) # Se evalúan antes de la vista: sin hash ni queries
 def api_login_view(request):
     
     email = request.data.get('email')
@@ -232,104 +536,238 @@ def api_login_view(request):
     if not email or not password:
         return JsonResponse({'error': 'Email y contraseña requeridos'}, status=400)
 
-    # Autenticar al usuario
-    user = authenticate(request, email=email, password=password)
+    # Autenticar al usuario (con límite de logins simultáneos)
+    try:
+        user = authenticate_bounded(request, email=email, password=password)
+    except LoginOverloaded:
+        return _login_overloaded_response()
 
     if user is not None:
-        # Crear la sesión en el servidor para Django
-        login(request, user) 
-        
-        # Generar los tokens JWT
-        refresh = RefreshToken.for_user(user)
-        
-        # Determinar el tipo de usuario y la URL de redirección
-        user_type = 'unknown'
-        redirect_url = '/'
-        
-        if hasattr(user, 'donor'):
-            user_type = 'donor'
-            redirect_url = '/donor_feed'
-        elif hasattr(user, 'donee'):
-            user_type = 'donee'
-            redirect_url = '/donee_feed'
-        elif hasattr(user, 'institution'):
-            user_type = 'institution'
-            redirect_url = '/institution_feed'
-        
-        # Devolver la respuesta JSON al frontend
-        return JsonResponse({
-            'message': 'Login exitoso',
-            'refresh': str(refresh),
-            'access': str(refresh.access_token),
-            'user': {
-                'id': user.id,
-                'email': user.email,
-                'user_type': user_type,
-                'redirect_url': redirect_url
-            }
-        }, status=200)
+        return _login_success_response(request, user, bool(request.data.get('session')))
     else:
         # Autenticación fallida
         return JsonResponse({'error': 'Credenciales inválidas'}, status=401)
-    
-@api_view(['POST']) 
-@permission_classes([AllowAny]) 
-def api_login_view(request):
-    
-    email = request.data.get('email')
-    password = request.data.get('password')
+
+
+@csrf_exempt
+@require_POST
+async def api_login_async_view(request):
+    """
+    Versión async de api_login_view para el despliegue ASGI (sdc/asgi.py).
+    El hashing corre en el pool acotado de login_executor, así que el event
+    loop sigue atendiendo otras peticiones mientras se verifica la contraseña.
+    """
+    wait = check_login_throttles(request)
+    if wait is not None:
+        return _login_throttled_response(wait)
+
+    try:
+        data = json.loads(request.body or b'{}')
+    except json.JSONDecodeError:
+        data = {}
+    email = data.get('email')
+    password = data.get('password')
 
     if not email or not password:
         return JsonResponse({'error': 'Email y contraseña requeridos'}, status=400)
 
-    user = authenticate(request, email=email, password=password)
+    try:
+        user = await aauthenticate_bounded(request, email=email, password=password)
+    except LoginOverloaded:
+        return _login_overloaded_response()
 
     if user is not None:
-        login(request, user)
-        
-        refresh = RefreshToken.for_user(user)
-        
-        user_type = 'unknown'
-        redirect_url = '/'
+        return await sync_to_async(_login_success_response)(
+            request, user, bool(data.get('session'))
+        )
+    else:
+        return JsonResponse({'error': 'Credenciales inválidas'}, status=401)
 
-        try:
-            # Intenta acceder al perfil de Donador.
-            if user.donor:
-                user_type = 'donor'
-                redirect_url = '/donor_feed'
-        except Donor.DoesNotExist:
-            # Si da error, no es un Donador. Sigue al siguiente.
-            try:
-                # Intenta acceder al perfil de Donatario.
-                if user.donee:
-                    user_type = 'donee'
-                    redirect_url = '/donee_feed'
-            except Donee.DoesNotExist:
-                # Si da error, no es Donatario. Sigue al siguiente.
-                try:
-                    # Intenta acceder al perfil de Institución.
-                    if user.institution:
-                        user_type = 'institution'
-                        redirect_url = '/institution_feed'
-                except Institution.DoesNotExist:
-                    # Si da error, no es ninguno.
-                    pass
-        except Exception as e:
-            # Captura cualquier otro error (ej. si olvidaste importar un modelo)
-            return JsonResponse({'error': f'Error de servidor inesperado: {e}'}, status=500)
-        
-        # 4. Devuelve la respuesta exitosa
-        return JsonResponse({
-            'message': 'Login exitoso',
-            'refresh': str(refresh),
-            'access': str(refresh.access_token),
-            'user': {
-                'id': user.id,
-                'email': user.email,
-                'user_type': user_type,
-                'redirect_url': redirect_url
-            }
-        }, status=200)
+
+def _login_throttled_response(wait):
+    response = JsonResponse(
+        {'error': 'Demasiados intentos de inicio de sesión. Inténtalo más tarde.'}, status=429
+    )
+    response['Retry-After'] = str(math.ceil(wait))
+    return response
+
+
+def _login_overloaded_response():
+    response = JsonResponse(
+        {'error': 'Demasiados inicios de sesión en curso. Inténtalo de nuevo.'}, status=429
+    )
+    response['Retry-After'] = '1'
+    return response
+
+
+def _login_success_response(request, user, wants_session=False):
+    if not settings.API_STATELESS or wants_session:
+        # Crear la sesión en el servidor para Django (páginas HTML)
+        login(request, user)
     else:
-        # Autenticación fallida (contraseña incorrecta)
-        return JsonResponse({'error': 'Credenciales inválidas'}, status=401)
\ No newline at end of file
+        # Modo sin estado: sólo tokens, sin fila ni cookie de sesión. La
+        # señal mantiene last_login como con login()
+        user_logged_in.send(sender=user.__class__, request=request, user=user)
+    
+    # Generar los tokens JWT
+    refresh = RefreshToken.for_user(user)
+    
+    # El rol viene en la misma fila del usuario: sin queries extra por perfil
+    user_type = user.role or 'unknown'
+    redirect_url = ROLE_REDIRECTS.get(user.role, '/')
+    
+    # Devolver la respuesta JSON al frontend
+    return JsonResponse({
+        'message': 'Login exitoso',
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+        'user': {
+            'id': user.id,
+            'email': user.email,
+            'user_type': user_type,
+            'redirect_url': redirect_url
+        }
+    }, status=200)
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def api_token_revoke(request):
+    """Cierre de sesión de la API: revoca el refresh token recibido."""
+    try:
+        refresh = RefreshToken(request.data.get('refresh', ''))
+    except TokenError:
+        return JsonResponse({'error': 'Token inválido o expirado'}, status=401)
+    token_revocation.revoke(refresh)
+    return JsonResponse({'message': 'Token revocado'})
+
+
+# --- API de búsqueda de publicaciones ---
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_search_posts(request):
+    """
+    Busca en los posts ACTIVOS de otros usuarios.
+    Parámetros: q (texto), type (OFFER/REQUEST, opcional) y cursor.
+    """
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return JsonResponse({'error': 'El parámetro q es requerido'}, status=400)
+
+    post_type = request.query_params.get('type', feed_cache.ALL_TYPES)
+    if post_type not in Post.PostType.values:
+        post_type = feed_cache.ALL_TYPES
+
+    results = search_posts(
+        feed_cache.active_posts(post_type).exclude(author=request.user), query
+    )
+    posts, next_cursor = paginate_by_rank(
+        results.for_cards(), request.query_params.get('cursor')
+    )
+
+    return JsonResponse({
+        'results': [
+            {
+                'id': post.id,
+                'title': post.title,
+                'description': post.description,
+                'post_type': post.post_type,
+                'is_campaign': post.is_campaign,
+                'quantity': str(post.quantity),
+                'remaining_quantity': str(post.remaining_quantity),
+                'category': post.category.name,
+                'author': post.author.email,
+                'created_at': post.created_at.isoformat(),
+                'rank': float(post.rank),
+            }
+            for post in posts
+        ],
+        'next_cursor': next_cursor,
+    })
+
+
+# --- API de feeds (JSON) ---
+#
+# Mismas listas que los feeds HTML, para el cliente móvil. '?cursor=' avanza
+# la página y '?fields=id,title,author' limita los campos de cada post.
+
+def _api_page_response(page, fields):
+    posts, next_cursor = page
+    return JsonResponse({
+        'results': PostCardSerializer(posts, many=True, fields=fields).data,
+        'next_cursor': next_cursor,
+    })
+
+
+def _api_feed_response(request, feed_post_type):
+    fields = parse_fields(request.query_params.get('fields'))
+    # Igual que en el HTML, se sirve desde la ventana compartida en caché
+    page = feed_cache.get_feed_page(
+        feed_post_type, request.user, request.query_params.get('cursor')
+    )
+    return _api_page_response(page, fields)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_donee_feed(request):
+    """Ofertas activas de otros usuarios."""
+    return _api_feed_response(request, Post.PostType.OFFER)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_donor_feed(request):
+    """Solicitudes activas de otros usuarios."""
+    return _api_feed_response(request, Post.PostType.REQUEST)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_institution_feed(request):
+    """Todas las publicaciones activas de otros usuarios."""
+    return _api_feed_response(request, feed_cache.ALL_TYPES)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_my_posts(request):
+    """
+    Publicaciones propias (cualquier estado). '?type=' filtra OFFER/REQUEST y
+    '?archived=1' lista las ya archivadas (ver lifecycle.py).
+    """
+    fields = parse_fields(request.query_params.get('fields'))
+    model = ArchivedPost if request.query_params.get('archived') == '1' else Post
+    my_posts = model.objects.filter(author=request.user)
+
+    post_type = request.query_params.get('type')
+    if post_type in Post.PostType.values:
+        my_posts = my_posts.filter(post_type=post_type)
+
+    page = paginate_by_cursor(my_posts.for_cards(), request.query_params.get('cursor'))
+    return _api_page_response(page, fields)
+
+
+# --- Métricas (Prometheus) ---
+
+def metrics_view(request):
+    """
+    Histogramas por vista en formato de texto de Prometheus, sumando todos
+    los workers que comparten METRICS_DIR. Con METRICS_TOKEN configurado
+    se exige 'Authorization: Bearer <token>'; sin él sólo el staff con
+    sesión lo ve y para los demás no existe (404).
+    """
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token:
+        if not constant_time_compare(
+            request.headers.get('Authorization', ''), f'Bearer {token}'
+        ):
+            return HttpResponse(status=401)
+    elif not request.user.is_staff:
+        return HttpResponse(status=404)
+
+    return HttpResponse(
+        metrics.render_prometheus(metrics.collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )